@@ -0,0 +1,370 @@
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from deck_index import UNNAMED_ARCHETYPE, DeckDelta, DeckIndex
+
+NUM_HASHES = 128  # Funções de hash do MinHash
+HASH_PRIME = (1 << 31) - 1  # Primo de Mersenne; com a, b e as chaves < 2^31 o produto cabe em int64
+CLUSTER_BANDS = 32  # LSH das listas: 32 bandas x 4 linhas (listas com Jaccard >~ 0.5 colidem)
+CLUSTER_ROWS = 4
+RETRIEVAL_ROWS = 1  # LSH da consulta: bandas de 1 linha, pois as cartas vistas são um subconjunto pequeno do deck
+CORE_FREQUENCY = 0.5  # Carta presente em pelo menos metade das listas do cluster é do núcleo
+MIN_CARD_FREQUENCY = 0.2  # Cartas mais raras que isso (techs) ficam fora da assinatura
+SKETCH_BLOCK = 4096  # Listas por bloco no cálculo dos sketches (limita a memória temporária)
+SEED = 0
+
+
+def card_key(card_id):
+    """Inteiro de 31 bits estável para um ID de carta (dbfId ou cardId)."""
+    return zlib.crc32(str(card_id).encode("utf-8")) & 0x7FFFFFFF
+
+
+class MinHasher:
+    """Família de hashes universais (a*x + b) mod p, avaliados em lote com NumPy."""
+    def __init__(self, num_hashes=NUM_HASHES, seed=SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, HASH_PRIME, size=num_hashes, dtype=np.int64)
+        self.b = rng.integers(0, HASH_PRIME, size=num_hashes, dtype=np.int64)
+        self._cache = {}
+
+    def card_hashes(self, card_id):
+        hashes = self._cache.get(card_id)
+        if hashes is None:
+            hashes = (self.a * card_key(card_id) + self.b) % HASH_PRIME
+            self._cache[card_id] = hashes
+        return hashes
+
+    def sketches(self, card_lists):
+        """
+        MinHash de cada lista: matriz (listas, hashes). As listas viram uma
+        matriz de índices de carta completada com uma carta sentinela (hash
+        máximo), e o mínimo é acumulado coluna a coluna, em blocos de listas.
+        """
+        unique = {}
+        encoded = [[unique.setdefault(card, len(unique)) for card in cards] for cards in card_lists]
+        sentinel = len(unique)
+        keys = np.array([card_key(card) for card in unique], dtype=np.int64)
+        table = np.vstack(((keys[:, None] * self.a[None, :] + self.b[None, :]) % HASH_PRIME,
+                           np.full((1, len(self.a)), HASH_PRIME, dtype=np.int64)))
+        sketches = np.empty((len(card_lists), len(self.a)), dtype=np.int64)
+        for first in range(0, len(encoded), SKETCH_BLOCK):
+            block = encoded[first:first + SKETCH_BLOCK]
+            width = max(1, max(map(len, block)))
+            cards = np.full((len(block), width), sentinel, dtype=np.int64)
+            for i, row in enumerate(block):
+                cards[i, :len(row)] = row
+            result = sketches[first:first + len(block)]
+            np.take(table, cards[:, 0], axis=0, out=result)
+            for column in range(1, width):
+                np.minimum(result, table[cards[:, column]], out=result)
+        return sketches
+
+
+class ArchetypeSignature:
+    """Cluster de listas quase iguais de um arquétipo: núcleo, pesos por carta e MinHash."""
+    def __init__(self, archetype, card_lists, hasher):
+        self.archetype = archetype
+        self.size = len(card_lists)
+        counts = Counter(card for cards in card_lists for card in cards)
+        self.weights = {card: count / self.size for card, count in counts.items()
+                        if count / self.size >= MIN_CARD_FREQUENCY}
+        self.core = frozenset(card for card, weight in self.weights.items() if weight >= CORE_FREQUENCY)
+        self.cards = frozenset(self.weights)
+        self.sketch = hasher.sketches([sorted(self.cards)])[0]
+
+
+def cluster_deck_lists(meta_decks, hasher):
+    """
+    Agrupa as listas de cada arquétipo em clusters de quase-duplicatas.
+
+    Listas do mesmo arquétipo que colidem em alguma banda do LSH ficam no
+    mesmo cluster (componentes conexas, por propagação do menor rótulo com
+    NumPy); cada cluster vira uma assinatura.
+    """
+    card_lists = [deck.get("card_ids", []) for deck in meta_decks]
+    archetypes = [deck.get("archetype", UNNAMED_ARCHETYPE) for deck in meta_decks]
+    if not meta_decks:
+        return []
+    _, archetype_ids = np.unique(archetypes, return_inverse=True)
+    sketches = hasher.sketches(card_lists)
+    # Chave de cada banda: as linhas da banda e o arquétipo combinados num uint64
+    mixers = np.random.default_rng(SEED).integers(1, 1 << 62, size=CLUSTER_ROWS + 1, dtype=np.int64).astype(np.uint64)
+    band_groups = []
+    for band in range(CLUSTER_BANDS):
+        rows = sketches[:, band * CLUSTER_ROWS:(band + 1) * CLUSTER_ROWS].astype(np.uint64)
+        keys = rows @ mixers[:-1] + archetype_ids.astype(np.uint64) * mixers[-1]
+        _, groups = np.unique(keys, return_inverse=True)
+        band_groups.append(groups)
+
+    labels = np.arange(len(meta_decks))
+    while True:
+        previous = labels
+        for groups in band_groups:
+            smallest = np.full(groups.max() + 1, len(meta_decks))
+            np.minimum.at(smallest, groups, labels)
+            labels = smallest[groups]
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            break
+
+    clusters = defaultdict(list)
+    for i, label in enumerate(labels.tolist()):
+        clusters[label].append(i)
+    return [ArchetypeSignature(archetypes[members[0]], [card_lists[i] for i in members], hasher)
+            for members in clusters.values()]
+
+
+class SignatureDelta(DeckDelta):
+    """Diferença da base com as assinaturas já recalculadas para os arquétipos afetados."""
+    def __init__(self, old_decks, new_decks, hasher):
+        super().__init__(old_decks, new_decks)
+        archetypes = self.archetypes()
+        affected = [deck for deck in new_decks if deck.get("archetype", UNNAMED_ARCHETYPE) in archetypes]
+        self.signatures = cluster_deck_lists(affected, hasher) if self else []
+
+
+class ArchetypeSignatureIndex:
+    """
+    Índice de assinaturas de arquétipo com recuperação por LSH.
+
+    Mesma interface do `DeckIndex` (`new_scorer`, `archetypes`, `card_sets`, `postings`, `card_weights`,
+    `prepare_update`/`apply_update`), mas cada posição é uma assinatura
+    (cluster de listas), não uma lista. Numa recarga da base só os
+    arquétipos afetados são reagrupados; as assinaturas antigas deles deixam
+    a posição vazia (None), reaproveitada pelas novas.
+    """
+    def __init__(self, meta_decks, hasher=None):
+        self.hasher = hasher or MinHasher()
+        self.decks = meta_decks
+        self.signatures = []
+        self.archetypes = []
+        self.card_sets = []
+        self.by_archetype = defaultdict(list)
+        self.postings = {}  # Carta -> posições das assinaturas que a contêm
+        self._free = []
+        self.bands = NUM_HASHES // RETRIEVAL_ROWS
+        self.tables = [defaultdict(list) for _ in range(self.bands)]
+        for signature in cluster_deck_lists(meta_decks, self.hasher):
+            self._insert(signature)
+
+    def _insert(self, signature):
+        if self._free:
+            position = self._free.pop()
+            self.signatures[position] = signature
+            self.archetypes[position] = signature.archetype
+            self.card_sets[position] = signature.cards
+        else:
+            position = len(self.signatures)
+            self.signatures.append(signature)
+            self.archetypes.append(signature.archetype)
+            self.card_sets.append(signature.cards)
+        self.by_archetype[signature.archetype].append(position)
+        for band, key in enumerate(self._band_keys(signature.sketch)):
+            self.tables[band][key].append(position)
+        for card_id in signature.weights:
+            self.postings.setdefault(card_id, []).append(position)
+        return position
+
+    def _remove(self, position):
+        for band, key in enumerate(self._band_keys(self.signatures[position].sketch)):
+            bucket = self.tables[band][key]
+            bucket.remove(position)
+            if not bucket:
+                del self.tables[band][key]
+        for card_id in self.signatures[position].weights:
+            positions = self.postings[card_id]
+            positions.remove(position)
+            if not positions:
+                del self.postings[card_id]
+        self.signatures[position] = None
+        self.card_sets[position] = frozenset()
+        self._free.append(position)
+
+    def prepare_update(self, new_decks):
+        """Calcula a diferença e reagrupa os arquétipos afetados, sem alterar o índice (pode rodar em outra thread)."""
+        return SignatureDelta(self.decks, new_decks, self.hasher)
+
+    def apply_update(self, delta):
+        """Troca as assinaturas dos arquétipos afetados. Retorna as posições alteradas, para `rescore`."""
+        touched = set()
+        for archetype in delta.archetypes():
+            for position in self.by_archetype.pop(archetype, []):
+                self._remove(position)
+                touched.add(position)
+        for signature in delta.signatures:
+            touched.add(self._insert(signature))
+        self.decks = delta.decks
+        return touched
+
+    def _band_key(self, sketch, band):
+        if RETRIEVAL_ROWS == 1:
+            return int(sketch[band])
+        return sketch[band * RETRIEVAL_ROWS:(band + 1) * RETRIEVAL_ROWS].tobytes()
+
+    def _band_keys(self, sketch):
+        return [self._band_key(sketch, band) for band in range(self.bands)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def card_weights(self, position):
+        """(carta, frequência no cluster) das cartas da assinatura."""
+        signature = self.signatures[position]
+        return signature.weights.items() if signature else ()
+
+    def candidates(self, sketch, bands=None):
+        """Assinaturas que colidem com o sketch da consulta em alguma das bandas (padrão: todas)."""
+        found = set()
+        values = sketch.tolist() if RETRIEVAL_ROWS == 1 else None
+        for band in range(self.bands) if bands is None else bands:
+            key = values[band] if values is not None else self._band_key(sketch, band)
+            bucket = self.tables[band].get(key)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def new_scorer(self):
+        return SignatureScorer(self)
+
+
+class SignatureScorer:
+    """
+    Pontuação incremental sobre as assinaturas, com a interface do `DeckScorer`.
+
+    A cada carta o sketch das cartas vistas é atualizado (mínimo elemento a
+    elemento) e as novas candidatas do LSH entram no conjunto de candidatas,
+    que só cresce durante a partida. Só as candidatas são pontuadas: soma dos
+    pesos (frequência no cluster) das cartas vistas. `top` informa o número
+    de cartas correspondentes, como o `DeckScorer`, ordenando pela soma dos pesos.
+    """
+    def __init__(self, index):
+        self.index = index
+        self.seen_cards = set()
+        self.candidates = set()
+        self._sketch = np.full(NUM_HASHES, HASH_PRIME, dtype=np.int64)
+
+    def add_card(self, card_id):
+        if card_id in self.seen_cards:
+            return False
+        self.seen_cards.add(card_id)
+        hashes = self.index.hasher.card_hashes(card_id)
+        changed = np.flatnonzero(hashes < self._sketch)
+        if changed.size:
+            np.minimum(self._sketch, hashes, out=self._sketch)
+            # Só as bandas cujo mínimo mudou podem trazer novas candidatas
+            bands = np.unique(changed // RETRIEVAL_ROWS).tolist()
+            self.candidates |= self.index.candidates(self._sketch, bands)
+        return True
+
+    def top(self, k=2):
+        signatures = self.index.signatures
+        seen = self.seen_cards
+        ranked = []
+        for position in self.candidates:
+            weights = signatures[position].weights
+            matches = [weights[card] for card in seen if card in weights]
+            if matches:
+                ranked.append((-sum(matches), -len(matches), position))
+        ranked.sort()
+        return [(self.index.archetypes[position], -count, position) for _, count, position in ranked[:k]]
+
+    def rescore(self, positions):
+        """Após uma recarga da base: descarta as candidatas alteradas e consulta o LSH de novo com as cartas já vistas."""
+        self.candidates -= positions
+        if self.seen_cards:
+            self.candidates |= self.index.candidates(self._sketch)
+
+    def matching_cards(self, position):
+        return self.seen_cards & self.index.card_sets[position]
+
+
+def synthesize_deck_lists(meta_decks, count, max_swaps=5, seed=SEED):
+    """Variações das listas da base (troca de até `max_swaps` cartas), simulando milhares de listas coletadas."""
+    rng = random.Random(seed)
+    pool = sorted({card for deck in meta_decks for card in deck["card_ids"]})
+    variants = []
+    for _ in range(count):
+        base = rng.choice(meta_decks)
+        cards = list(base["card_ids"])
+        for _ in range(rng.randint(0, max_swaps)):
+            cards[rng.randrange(len(cards))] = rng.choice(pool)
+        variants.append({"archetype": base["archetype"], "card_ids": list(dict.fromkeys(cards))})
+    return variants
+
+
+def validate(meta_decks, queries=500, max_plays=12, seed=SEED):
+    """
+    Compara as assinaturas com a varredura exaustiva (DeckScorer sobre todas
+    as listas) jogada a jogada: concordância do arquétipo mais provável e
+    tempo por jogada.
+    """
+    rng = random.Random(seed + 1)
+    start = time.perf_counter()
+    exact_index = DeckIndex(meta_decks)
+    exact_build = time.perf_counter() - start
+    start = time.perf_counter()
+    signature_index = ArchetypeSignatureIndex(meta_decks)
+    signature_build = time.perf_counter() - start
+    print(f"{len(meta_decks)} listas -> {len(signature_index)} assinaturas "
+          f"({len(set(signature_index.archetypes))} arquétipos). "
+          f"Construção: exata {exact_build * 1000:.0f} ms, assinaturas {signature_build * 1000:.0f} ms.")
+
+    agree = plays = 0
+    exact_time = signature_time = 0.0
+    agreement_by_plays = defaultdict(lambda: [0, 0])
+    for _ in range(queries):
+        deck = rng.choice(meta_decks)
+        cards = rng.sample(deck["card_ids"], min(max_plays, len(deck["card_ids"])))
+        exact, approx = exact_index.new_scorer(), signature_index.new_scorer()
+        for number, card in enumerate(cards, 1):
+            # Mede o que o tracker faz a cada carta: add_card + top(2)
+            t0 = time.perf_counter()
+            exact.add_card(card)
+            exact.top(2)
+            t1 = time.perf_counter()
+            approx.add_card(card)
+            approx_ranking = approx.top(2)
+            t2 = time.perf_counter()
+            exact_time += t1 - t0
+            signature_time += t2 - t1
+            # Empates na varredura exata: qualquer arquétipo com a melhor pontuação conta como acerto
+            best_score = max(exact.scores)
+            best = {exact_index.archetypes[i] for i, score in enumerate(exact.scores) if score == best_score}
+            hit = bool(approx_ranking) and approx_ranking[0][0] in best
+            agree += hit
+            plays += 1
+            agreement_by_plays[number][0] += hit
+            agreement_by_plays[number][1] += 1
+
+    print(f"Concordância com a varredura exaustiva: {agree / plays:.1%} de {plays} jogadas")
+    print("  por nº de cartas vistas: " + ", ".join(
+        f"{number}: {hits / total:.0%}" for number, (hits, total) in sorted(agreement_by_plays.items())))
+    print(f"Tempo por jogada: exaustiva {exact_time / plays * 1e6:.1f} µs, "
+          f"assinaturas {signature_time / plays * 1e6:.1f} µs")
+    return agree / plays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assinaturas MinHash/LSH dos arquétipos da base de decks.")
+    parser.add_argument("decks", nargs="?", default="meta_decks2.json")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Valida com N listas geradas a partir da base")
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    with open(args.decks, "r", encoding="utf-8") as f:
+        meta_decks = json.load(f)
+    if args.synthetic:
+        meta_decks = synthesize_deck_lists(meta_decks, args.synthetic)
+    agreement = validate(meta_decks, args.queries)
+    sys.exit(0 if agreement > 0.9 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import glob
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import event_bus
+from game_tracker import GameTracker, load_shared_state
+from log_index import find_game_offsets
+
+META_DECKS_DB_PATH = "meta_decks.json"
+
+
+def find_log_files(target):
+    """Aceita um diretório (todos os *.log dentro dele, recursivamente) ou um glob."""
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "**", "*.log")
+    else:
+        pattern = target
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def split_games(log_path):
+    """Retorna as tarefas (arquivo, nº da partida, início, fim) de um log, cortado nas partidas."""
+    size = os.path.getsize(log_path)
+    if not size:
+        return []
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        offsets = find_game_offsets(data)
+    ends = offsets[1:] + [size]
+    return [(log_path, number, start, end) for number, (start, end) in enumerate(zip(offsets, ends))]
+
+
+def analyze_game(lines, cards, deck_index):
+    """Reproduz uma partida e retorna o registro com as cartas do oponente e o arquétipo previsto."""
+    tracker = GameTracker(cards, deck_index, event_bus.EventList(), evict_finished_games=False, predicted_cards=0)
+    tracker.process_lines(lines)
+    cards_seen = [{"turn": event["turn"], "dbf_id": event["dbf_id"], "name": cards.dbf_id_to_name.get(event["dbf_id"])}
+                  for event in tracker.events if event["type"] == event_bus.CARD_PLAYED]
+    engine = tracker.engine
+    scorer = tracker.deck_scorer
+
+    record = {
+        "opponent_class": None,
+        "cards_seen": cards_seen,
+        "archetype": None,
+        "confidence": 0.0,
+        "matched_cards": 0,
+        "runner_up": None,
+    }
+    if engine and engine.opponent:
+        hero = engine.opponent.starting_hero
+        record["opponent_class"] = cards.class_name(hero.card_id) if hero else None
+    ranking = scorer.top(2)
+    if ranking:
+        archetype, score, _ = ranking[0]
+        record["archetype"] = archetype
+        record["matched_cards"] = score
+        record["confidence"] = round(score / len(cards_seen), 3)
+        if len(ranking) > 1:
+            record["runner_up"] = ranking[1][0]
+    return record
+
+
+def analyze_task(task, decks_path):
+    """Executado nos workers: lê só o trecho da partida e a analisa."""
+    log_path, game_number, start, end = task
+    cards, deck_index = load_shared_state(decks_path)
+    record = {"file": log_path, "game": game_number, "offset": start}
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        record.update(analyze_game(data.decode("utf-8", errors="replace").splitlines(keepends=True), cards, deck_index))
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def _analyze_task_star(args):
+    return analyze_task(*args)
+
+
+def run_batch(target, output, decks_path=META_DECKS_DB_PATH, workers=None):
+    """Analisa todos os logs do alvo em paralelo, gravando um registro JSONL por partida."""
+    files = find_log_files(target)
+    tasks = [task for log_path in files for task in split_games(log_path)]
+    print(f"{len(files)} arquivo(s), {len(tasks)} partida(s).", file=sys.stderr)
+
+    load_shared_state(decks_path)
+    start = time.perf_counter()
+    count = 0
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for record in executor.map(_analyze_task_star, ((task, decks_path) for task in tasks), chunksize=chunksize):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    elapsed = time.perf_counter() - start
+    if elapsed:
+        print(f"{count} partida(s) em {elapsed:.2f} s ({count / elapsed:.1f} partidas/s).", file=sys.stderr)
+    return count
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Analisa em lote arquivos Power.log arquivados.")
+    parser.add_argument("target", help="Diretório ou glob (ex.: 'arquivo/**/Power*.log')")
+    parser.add_argument("-o", "--output", help="Arquivo JSONL de saída (padrão: stdout)")
+    parser.add_argument("--decks", default=META_DECKS_DB_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: nº de CPUs)")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            run_batch(args.target, output, args.decks, args.workers)
+    else:
+        run_batch(args.target, sys.stdout, args.decks, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASELINE_PATH = "bench_baseline.json"
+META_DECKS_PATH = "meta_decks2.json"
+DEFAULT_TOLERANCE = 0.25  # Piora relativa aceita antes de acusar regressão
+
+# Direção de cada métrica: +1 quanto maior melhor, -1 quanto menor melhor
+METRIC_DIRECTIONS = {
+    "lines_per_sec": 1,
+    "play_latency_p50_ms": -1,
+    "play_latency_p99_ms": -1,
+    "peak_rss_mb": -1,
+    "import_ms": -1,
+    "first_event_ms": -1,
+}
+COLD_START_RUNS = 3  # Execuções por subcomando no --cold-start (vale a mediana)
+COLD_START_TIMEOUT = 60.0
+HEAVY_MODULES = ("hslog", "hearthstone", "numpy", "aiohttp", "bs4", "requests")
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo atual, em MB (None se indisponível)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb():
+    """Memória residente atual (Linux, via /proc); fora do Linux cai no pico."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return peak_rss_mb()
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _latency_metrics(latencies):
+    return {
+        "plays": len(latencies),
+        "play_latency_p50_ms": percentile(latencies, 0.50) * 1000 if latencies else None,
+        "play_latency_p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+    }
+
+
+def bench_log_reader(log_path, fast_scan):
+    """log_reader.parse_log sobre o log inteiro, sem seguir o arquivo."""
+    import log_reader
+
+    with open(log_path, "rb") as f:
+        line_count = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        events = _devnull_events(devnull)
+        log_reader.parse_log(log_path, fast_scan=fast_scan, follow=False, start_offset=0, events=events)
+        elapsed = time.perf_counter() - start
+        events.close()
+    return {"lines_per_sec": line_count / elapsed, "peak_rss_mb": peak_rss_mb()}
+
+
+def _devnull_events(devnull):
+    """Bus de eventos com o console apontando para o devnull; fechar antes de sair do `with`."""
+    import event_bus
+
+    return event_bus.EventBus([event_bus.ConsoleSink(devnull)])
+
+
+def bench_tracker(log_path, decks_path):
+    """DeckTracker.process_line linha a linha; latência medida nas linhas que geram uma jogada."""
+    import deck_tracker
+
+    latencies = []
+    line_count = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        events = _devnull_events(devnull)
+        tracker = deck_tracker.DeckTracker(log_path, decks_path, events=events)
+        determine_meta_deck = tracker._determine_meta_deck
+        plays = [0]
+
+        def counting_determine_meta_deck(card_id):
+            plays[0] += 1
+            return determine_meta_deck(card_id)
+
+        tracker._determine_meta_deck = counting_determine_meta_deck
+        with open(log_path, "r", encoding="utf-8") as f:
+            start = time.perf_counter()
+            for line in f:
+                plays_before = plays[0]
+                line_start = time.perf_counter()
+                tracker.process_line(line)
+                if plays[0] != plays_before:
+                    latencies.append(time.perf_counter() - line_start)
+                line_count += 1
+            elapsed = time.perf_counter() - start
+        events.close()
+    metrics = {"lines_per_sec": line_count / elapsed, "peak_rss_mb": peak_rss_mb()}
+    metrics.update(_latency_metrics(latencies))
+    return metrics
+
+
+def bench_determine_meta_deck(log_path, decks_path, games=200, cards_per_game=20, seed=0):
+    """_determine_meta_deck isolado, com cartas sorteadas de decks da base."""
+    import deck_tracker
+
+    rng = random.Random(seed)
+    latencies = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        events = _devnull_events(devnull)
+        tracker = deck_tracker.DeckTracker(log_path, decks_path, events=events)
+        for _ in range(games):
+            tracker.deck_scorer = tracker.deck_index.new_scorer()
+            tracker.last_known_archetype = "Desconhecido"
+            deck_cards = rng.choice(tracker.meta_decks)["card_ids"]
+            for card_id in rng.sample(deck_cards, min(cards_per_game, len(deck_cards))):
+                start = time.perf_counter()
+                tracker._determine_meta_deck(card_id)
+                latencies.append(time.perf_counter() - start)
+        events.close()
+    metrics = {"peak_rss_mb": peak_rss_mb()}
+    metrics.update(_latency_metrics(latencies))
+    return metrics
+
+
+def bench_long_session(log_path, decks_path, evict):
+    """
+    Sessão longa com muitas partidas: amostra o RSS a cada partida encerrada.
+
+    Com a remoção das partidas encerradas a memória deve ficar estável; sem ela,
+    cresce a cada partida. O crescimento é medido entre o fim do primeiro quarto
+    das partidas e o fim do log, depois do aquecimento dos caches.
+    """
+    import gc
+    import deck_tracker
+
+    samples = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        events = _devnull_events(devnull)
+        tracker = deck_tracker.DeckTracker(log_path, decks_path, evict_finished_games=evict, events=events)
+        finish_game = tracker._finish_game
+
+        def sampling_finish_game():
+            finish_game()
+            gc.collect()
+            samples.append(current_rss_mb())
+
+        tracker._finish_game = sampling_finish_game
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                tracker.process_line(line)
+        events.close()
+    warm = samples[len(samples) // 4] if samples else None
+    return {
+        "games": len(samples),
+        "retained_games": len(tracker.parser.games),
+        "rss_growth_mb": samples[-1] - warm if samples else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(function, *args):
+    """Roda o benchmark em um processo novo, para que o pico de RSS seja só dele."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def parse_import_times(stderr):
+    """
+    Saída de `python -X importtime`: retorna (ms de import, nº de módulos, pacotes
+    pesados carregados), contando só o que foi importado depois do `site`.
+    """
+    total_us = 0
+    modules = 0
+    heavy = set()
+    after_site = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not after_site:
+            after_site = name.strip() == "site" and not name.startswith("  ")
+            continue
+        modules += 1
+        if not name.startswith("  "):  # Import de primeiro nível: o cumulativo já inclui os aninhados
+            total_us += int(cumulative)
+        package = name.strip().split(".")[0]
+        if package in HEAVY_MODULES:
+            heavy.add(package)
+    return total_us / 1000, modules, sorted(heavy)
+
+
+def _run_until_ready(command, ready, events_path, env, stderr_path):
+    """
+    Executa o subcomando e retorna os ms desde o início do processo até ele
+    estar pronto: o primeiro evento no JSONL ("event"), a primeira linha no
+    stdout ("stdout") ou o fim do processo ("exit"). Só os comandos que seguem o
+    log ("event") são encerrados; os demais terminam sozinhos, sem deixar
+    órfãos os processos do pool deles.
+    """
+    with open(stderr_path, "w") as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE if ready == "stdout" else subprocess.DEVNULL,
+                                   stderr=stderr, text=True)
+        try:
+            if ready == "stdout":
+                process.stdout.readline()
+                elapsed = (time.perf_counter() - start) * 1000
+                process.communicate(timeout=COLD_START_TIMEOUT)
+                return elapsed
+            elif ready == "event":
+                while not (os.path.exists(events_path) and os.path.getsize(events_path)):
+                    if process.poll() is not None or time.perf_counter() - start > COLD_START_TIMEOUT:
+                        return None
+                    time.sleep(0.001)
+            else:
+                process.wait(COLD_START_TIMEOUT)
+            return (time.perf_counter() - start) * 1000
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.communicate()
+
+
+def bench_cold_start(log_path, decks_path, directory, runs=COLD_START_RUNS):
+    """
+    Cold start de cada subcomando do hsmeta.py, em processos novos: tempo de
+    import (`-X importtime`) e tempo até o primeiro evento/resultado.
+    """
+    cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hsmeta.py")
+    fixtures = os.path.dirname(cli)
+    cases = {
+        "track": (["track", "--log", "{log}", "--decks", decks_path], "event"),
+        "read-log": (["read-log", "--log", "{log}"], "event"),
+        "analyze": (["analyze", "{log}", "--decks", decks_path, "--workers", "1"], "stdout"),
+        "scrape": (["scrape", "meta", "--serve-fixtures", fixtures, "--no-cache", "--formats", "2",
+                    "--ranks", "legend", "--workers", "1", "--output-dir", directory], "exit"),
+    }
+    results = {}
+    for name, (arguments, ready) in cases.items():
+        first_event = []
+        imports = []
+        for run in range(runs):
+            for import_time in (False, True):
+                # Log novo a cada execução, sem índice de partidas nem checkpoint de uma execução anterior
+                run_log = os.path.join(directory, f"{name}-{run}-{int(import_time)}", "Power.log")
+                os.makedirs(os.path.dirname(run_log))
+                shutil.copy(log_path, run_log)
+                events_path = os.path.join(directory, f"{name}-{run}-{int(import_time)}.jsonl")
+                env = dict(os.environ, HS_EVENTS_JSONL=events_path)
+                env.pop("HS_EVENTS_SOCKET", None)
+                command = [sys.executable] + (["-X", "importtime"] if import_time else []) + [cli]
+                command += [argument.format(log=run_log) for argument in arguments]
+                stderr_path = f"{events_path}.stderr"
+                elapsed = _run_until_ready(command, ready, events_path, env, stderr_path)
+                if import_time:
+                    with open(stderr_path, "r", encoding="utf-8", errors="replace") as f:
+                        imports.append(parse_import_times(f.read()))
+                elif elapsed is not None:
+                    first_event.append(elapsed)
+        imports.sort()
+        import_ms, modules, heavy = imports[len(imports) // 2]
+        results[f"cold_start.{name}"] = {
+            "import_ms": import_ms,
+            "modules": modules,
+            "heavy_modules": heavy,
+            "first_event_ms": sorted(first_event)[len(first_event) // 2] if first_event else None,
+        }
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Retorna a lista de regressões (benchmark, métrica, baseline, atual)."""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, direction in METRIC_DIRECTIONS.items():
+            current = metrics.get(metric)
+            previous = baseline.get(name, {}).get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous * direction
+            if change < -tolerance:
+                regressions.append((name, metric, previous, current))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de rastreamento sobre logs sintéticos.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=14)
+    parser.add_argument("--cards-per-turn", type=int, default=2)
+    parser.add_argument("--decks", default=META_DECKS_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Grava os resultados como nova baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--long-session", type=int, metavar="PARTIDAS",
+                        help="Só verifica a memória de uma sessão longa com esse número de partidas")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Só mede o cold start (import e primeiro evento) de cada subcomando do hsmeta.py")
+    args = parser.parse_args()
+
+    from log_generator import generate_log
+
+    if args.long_session:
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = os.path.join(directory, "Power.log")
+            summary = generate_log(log_path, args.long_session, args.turns, args.cards_per_turn, args.decks, args.seed)
+            print(f"Log sintético: {summary['lines']} linhas, {args.long_session} partida(s).\n")
+            print(f"{'modo':24s} {'partidas':>9s} {'retidas':>8s} {'cresc. MB':>10s} {'pico MB':>8s}")
+            for label, evict in (("remove encerradas", True), ("mantém todas", False)):
+                metrics = run_isolated(bench_long_session, log_path, args.decks, evict)
+                print(f"{label:24s} {metrics['games']:>9d} {metrics['retained_games']:>8d} "
+                      f"{metrics['rss_growth_mb']:>10.1f} {metrics['peak_rss_mb']:>8.1f}")
+        return
+
+    if args.cold_start:
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = os.path.join(directory, "Power.log")
+            summary = generate_log(log_path, 1, args.turns, args.cards_per_turn, args.decks, args.seed)
+            print(f"Log sintético: {summary['lines']} linhas, 1 partida; {COLD_START_RUNS} execução(ões) por comando.\n")
+            results = bench_cold_start(log_path, args.decks, directory)
+        print(f"{'subcomando':24s} {'import ms':>10s} {'módulos':>8s} {'1º evento ms':>13s}  pesados")
+        for name, metrics in results.items():
+            first_event = metrics["first_event_ms"]
+            print(f"{name:24s} {metrics['import_ms']:>10.1f} {metrics['modules']:>8d} "
+                  f"{'-' if first_event is None else f'{first_event:.1f}':>13s}  {', '.join(metrics['heavy_modules']) or '-'}")
+        print("\n(1º evento: tempo desde o início do processo até o primeiro evento publicado; "
+              "para analyze, a primeira partida no stdout; para scrape, o fim da atualização)")
+        report_against_baseline(results, args, merge=True)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "Power.log")
+        summary = generate_log(log_path, args.games, args.turns, args.cards_per_turn, args.decks, args.seed)
+        print(f"Log sintético: {summary['lines']} linhas, {args.games} partida(s).\n")
+
+        results = {
+            "log_reader.regex": run_isolated(bench_log_reader, log_path, False),
+            "log_reader.fast_scan": run_isolated(bench_log_reader, log_path, True),
+            "tracker.process_log_line": run_isolated(bench_tracker, log_path, args.decks),
+            "tracker.determine_meta_deck": run_isolated(bench_determine_meta_deck, log_path, args.decks),
+        }
+
+    def fmt(value, pattern):
+        return "-" if value is None else pattern.format(value)
+
+    print(f"{'benchmark':30s} {'linhas/s':>12s} {'p50 ms':>9s} {'p99 ms':>9s} {'RSS MB':>8s}")
+    for name, metrics in results.items():
+        print(f"{name:30s} {fmt(metrics.get('lines_per_sec'), '{:,.0f}'):>12s} "
+              f"{fmt(metrics.get('play_latency_p50_ms'), '{:.3f}'):>9s} "
+              f"{fmt(metrics.get('play_latency_p99_ms'), '{:.3f}'):>9s} "
+              f"{fmt(metrics.get('peak_rss_mb'), '{:.1f}'):>8s}")
+    report_against_baseline(results, args)
+
+
+def report_against_baseline(results, args, merge=False):
+    """Grava a baseline (--save-baseline) ou compara com ela e sai com erro se houver regressões."""
+    if args.save_baseline:
+        baseline = {}
+        if merge and os.path.exists(args.baseline):
+            # O --cold-start só atualiza as suas entradas da baseline
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=4)
+        print(f"\nBaseline salva em '{args.baseline}'.")
+        return
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nNenhuma baseline em '{args.baseline}'. Use --save-baseline para criar uma.")
+        return
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"\nSem regressões em relação a '{args.baseline}' (tolerância {args.tolerance:.0%}).")
+        return
+    print("\nREGRESSÕES:")
+    for name, metric, previous, current in regressions:
+        print(f"  {name} {metric}: {previous:.3f} -> {current:.3f}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import marshal
+import os
+import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+
+CARD_CACHE_PATH = "card_cache.bin"
+CARD_CACHE_MAGIC = b"HSCARDS1\n"
+CARD_LOCALE = "enUS"
+
+
+class CardDatabase:
+    """
+    Apenas os campos de carta usados pelo tracker: cardId <-> dbfId, nome e classe.
+
+    Os dbfIds são strings, no mesmo formato das listas de `meta_decks.json`.
+    """
+    def __init__(self, dbf_ids, card_ids, names, card_classes):
+        self.card_id_to_dbf_id = dict(zip(card_ids, dbf_ids))
+        self.dbf_id_to_card_id = dict(zip(dbf_ids, card_ids))
+        self.dbf_id_to_name = dict(zip(dbf_ids, names))
+        self.dbf_id_to_class = dict(zip(dbf_ids, card_classes))
+
+    def __len__(self):
+        return len(self.dbf_id_to_card_id)
+
+    def class_name(self, card_id):
+        """Nome da classe da carta (ex.: 'DRUID'), ou None se ela não estiver no banco."""
+        from hearthstone.enums import CardClass
+
+        card_class = self.dbf_id_to_class.get(self.card_id_to_dbf_id.get(card_id))
+        if card_class is None:
+            return None
+        try:
+            return CardClass(card_class).name
+        except ValueError:
+            return str(card_class)
+
+
+def get_cache_key():
+    """Chave do cache: versão do pacote `hearthstone`, do Python (formato marshal) e idioma."""
+    try:
+        hearthstone_version = version("hearthstone")
+    except PackageNotFoundError:
+        hearthstone_version = "desconhecida"
+    return f"hearthstone={hearthstone_version};python={sys.version_info[0]}.{sys.version_info[1]};locale={CARD_LOCALE}"
+
+
+def compile_card_columns():
+    """Lê o CardDefs.xml pelo pacote `hearthstone` e extrai as colunas usadas pelo tracker."""
+    from hearthstone import cardxml
+
+    db, _ = cardxml.load_dbf(locale=CARD_LOCALE)
+    dbf_ids, card_ids, names, card_classes = [], [], [], []
+    for card_data in db.values():
+        if not getattr(card_data, "dbf_id", None) or not getattr(card_data, "id", None):
+            continue
+        dbf_ids.append(str(card_data.dbf_id))
+        card_ids.append(card_data.id)
+        names.append(card_data.name or "")
+        card_classes.append(int(card_data.card_class))
+    return dbf_ids, card_ids, names, card_classes
+
+
+def _read_cache(filepath, key):
+    """Retorna as colunas do cache ou None se ele não existir ou tiver outra chave."""
+    try:
+        with open(filepath, "rb") as f:
+            if f.readline() != CARD_CACHE_MAGIC:
+                return None
+            if f.readline().rstrip(b"\n").decode("utf-8") != key:
+                return None
+            return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(filepath, key, columns):
+    """Grava o cache de forma atômica (arquivo temporário + rename)."""
+    tmp_path = f"{filepath}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(CARD_CACHE_MAGIC)
+            f.write(key.encode("utf-8") + b"\n")
+            f.write(marshal.dumps(columns))
+        os.replace(tmp_path, filepath)
+    except OSError as e:
+        print(f"AVISO: Não foi possível gravar o cache de cartas '{filepath}'. {e}")
+
+
+def load_card_database(filepath=CARD_CACHE_PATH):
+    """
+    Carrega o banco de cartas a partir do cache compilado, recompilando-o se a chave mudou.
+
+    Returns:
+        tuple: (CardDatabase, bool indicando se o cache foi usado)
+    """
+    key = get_cache_key()
+    columns = _read_cache(filepath, key)
+    from_cache = columns is not None
+    if not from_cache:
+        columns = compile_card_columns()
+        _write_cache(filepath, key, columns)
+    return CardDatabase(*columns), from_cache
+
+
+def main():
+    """Mede o tempo de carga do banco de cartas com e sem o cache."""
+    start = time.perf_counter()
+    columns = compile_card_columns()
+    compile_time = time.perf_counter() - start
+    _write_cache(CARD_CACHE_PATH, get_cache_key(), columns)
+
+    start = time.perf_counter()
+    cards, from_cache = load_card_database()
+    cached_time = time.perf_counter() - start
+
+    print(f"Cartas: {len(cards)} | chave: {get_cache_key()}")
+    print(f"  cardxml.load_dbf(): {compile_time * 1000:.1f} ms")
+    print(f"  cache '{CARD_CACHE_PATH}': {cached_time * 1000:.1f} ms (usado: {from_cache})")
+
+
+if __name__ == "__main__":
+    main()
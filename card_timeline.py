@@ -0,0 +1,180 @@
+import argparse
+import heapq
+import json
+import random
+import time
+from array import array
+from collections import Counter, defaultdict
+
+from hearthstone.enums import Zone
+
+from deck_index import build_deck_index
+
+# --- CONFIGURAÇÃO ---
+MATCH_WEIGHT_BASE = 5.0  # Cada carta vista que está na lista multiplica o peso dela por esse fator
+PREDICTED_CARDS = 5  # Cartas ainda não vistas na previsão publicada a cada jogada (0 desliga)
+
+
+class CardTimeline:
+    """
+    Linha do tempo das cartas do oponente numa partida: (turno, carta, zona de
+    origem, zona de destino), na ordem dos pacotes.
+
+    Os registros ficam em arrays compactos (turno em 16 bits, zonas em 8 bits
+    e a carta como índice numa tabela de IDs), alguns bytes por movimento.
+    `move` acompanha a zona atual de todas as entidades, inclusive as ainda
+    ocultas, para que a zona de origem esteja certa quando a carta for revelada.
+    """
+    def __init__(self):
+        self.turns = array("H")
+        self.cards = array("I")
+        self.from_zones = array("B")
+        self.to_zones = array("B")
+        self.card_ids = []  # Código -> ID da carta
+        self._codes = {}  # ID da carta -> código
+        self.zones = {}  # ID da entidade -> zona atual
+
+    def move(self, entity_id, zone):
+        """Registra a nova zona da entidade e retorna a anterior (INVALID se desconhecida)."""
+        previous = self.zones.get(entity_id, Zone.INVALID)
+        self.zones[entity_id] = zone
+        return previous
+
+    def append(self, turn, card_id, from_zone, to_zone):
+        code = self._codes.get(card_id)
+        if code is None:
+            code = self._codes[card_id] = len(self.card_ids)
+            self.card_ids.append(card_id)
+        self.turns.append(turn)
+        self.cards.append(code)
+        self.from_zones.append(from_zone)
+        self.to_zones.append(to_zone)
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __iter__(self):
+        card_ids = self.card_ids
+        for turn, code, from_zone, to_zone in zip(self.turns, self.cards, self.from_zones, self.to_zones):
+            yield turn, card_ids[code], Zone(from_zone), Zone(to_zone)
+
+    def records(self):
+        """Registros serializáveis em JSON (resumo da partida): [turno, carta, origem, destino]."""
+        return [[turn, card_id, from_zone.name, to_zone.name] for turn, card_id, from_zone, to_zone in self]
+
+
+class RemainingCardPredictor:
+    """
+    Previsão incremental das cartas do oponente que ainda não apareceram.
+
+    Cada lista (ou assinatura de arquétipo) com pelo menos uma carta vista
+    recebe o peso `base ** cartas_vistas_na_lista`: quanto mais cartas vistas
+    ela contém, mais provável que seja o deck do oponente. A probabilidade
+    de uma carta é a soma dos pesos das listas que a contêm (ponderada pela
+    frequência da carta, nas assinaturas) dividida pela soma de todos os pesos.
+
+    A cada carta nova só as listas que a contêm mudam de peso, e a diferença
+    é somada às cartas dessas listas: o custo por jogada é o tamanho dessas
+    listas, não o da base.
+    """
+    def __init__(self, index, base=MATCH_WEIGHT_BASE):
+        self.index = index
+        self.base = base
+        self.seen_cards = set()
+        self.matches = defaultdict(int)  # Posição -> cartas vistas que estão na lista
+        self.expected = defaultdict(float)  # Carta -> soma ponderada dos pesos das listas que a contêm
+        self.total = 0.0
+
+    def _weight(self, matches):
+        return self.base ** matches if matches else 0.0
+
+    def add_card(self, card_id):
+        if card_id in self.seen_cards:
+            return False
+        self.seen_cards.add(card_id)
+        expected = self.expected
+        for position in self.index.postings.get(card_id, ()):
+            matches = self.matches[position]
+            delta = self._weight(matches + 1) - self._weight(matches)
+            self.matches[position] = matches + 1
+            self.total += delta
+            for card, weight in self.index.card_weights(position):
+                expected[card] += delta * weight
+        return True
+
+    def top(self, k=PREDICTED_CARDS):
+        """Até k tuplas (carta, probabilidade) das cartas ainda não vistas, da mais para a menos provável."""
+        if not self.total:
+            return []
+        seen = self.seen_cards
+        best = heapq.nlargest(k, ((value, card) for card, value in self.expected.items() if card not in seen))
+        return [(card, min(1.0, value / self.total)) for value, card in best]
+
+    def rebuild(self):
+        """Recalcula do zero com as cartas já vistas (após uma recarga da base de decks)."""
+        seen = self.seen_cards
+        self.seen_cards = set()
+        self.matches.clear()
+        self.expected.clear()
+        self.total = 0.0
+        for card_id in seen:
+            self.add_card(card_id)
+
+
+def simulate(meta_decks, games=200, plays=12, seed=0, index=None):
+    """
+    Joga partidas sorteadas da base e mede o custo por jogada (add_card + top)
+    e a precisão das previsões: fração das cartas previstas que estão de fato
+    no deck sorteado. Para comparar, a mesma precisão prevendo as cartas mais
+    populares da base ainda não vistas.
+    """
+    rng = random.Random(seed)
+    index = index or build_deck_index(meta_decks)
+    popular = [card for card, _ in Counter(card for deck in meta_decks for card in deck["card_ids"]).most_common()]
+    hits = predicted = popular_hits = 0
+    elapsed = []
+    for _ in range(games):
+        deck = rng.choice(meta_decks)
+        cards = list(deck["card_ids"])
+        rng.shuffle(cards)
+        predictor = RemainingCardPredictor(index)
+        for card in cards[:plays]:
+            start = time.perf_counter()
+            predictor.add_card(card)
+            top = predictor.top()
+            elapsed.append(time.perf_counter() - start)
+            deck_cards = set(deck["card_ids"])
+            hits += sum(1 for card_id, _ in top if card_id in deck_cards)
+            predicted += len(top)
+            guesses = [card_id for card_id in popular if card_id not in predictor.seen_cards][:len(top)]
+            popular_hits += sum(1 for card_id in guesses if card_id in deck_cards)
+    elapsed.sort()
+    return {
+        "precision": hits / predicted if predicted else 0.0,
+        "popular_precision": popular_hits / predicted if predicted else 0.0,
+        "p50_us": elapsed[len(elapsed) // 2] * 1e6,
+        "p99_us": elapsed[int(len(elapsed) * 0.99) - 1] * 1e6,
+    }
+
+
+def main():
+    """Precisão e custo por jogada da previsão sobre a base de decks."""
+    parser = argparse.ArgumentParser(description="Mede a previsão das cartas restantes do oponente.")
+    parser.add_argument("decks", nargs="?", default="meta_decks2.json")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Usa N variações sintéticas das listas da base")
+    args = parser.parse_args()
+
+    with open(args.decks, "r", encoding="utf-8") as f:
+        meta_decks = json.load(f)
+    if args.synthetic:
+        from archetype_signatures import synthesize_deck_lists
+        meta_decks = synthesize_deck_lists(meta_decks, args.synthetic)
+    result = simulate(meta_decks, args.games)
+    print(f"{len(meta_decks)} listas, {args.games} partidas: {result['precision']:.1%} das cartas previstas estão no deck "
+          f"(cartas mais populares: {result['popular_precision']:.1%}); "
+          f"por jogada p50 {result['p50_us']:.0f} µs, p99 {result['p99_us']:.0f} µs.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import heapq
+from collections import defaultdict
+
+UNNAMED_ARCHETYPE = "Arquétipo Sem Nome"
+SIGNATURE_MIN_DECKS = 500  # A partir desse tamanho da base o tracker usa as assinaturas (archetype_signatures)
+
+
+def deck_keys(meta_decks):
+    """
+    Chave estável de cada deck: (arquétipo, ordem entre os decks do mesmo
+    arquétipo). A base não tem IDs, e o mesmo arquétipo aparece em várias listas.
+    """
+    seen = defaultdict(int)
+    keys = []
+    for deck in meta_decks:
+        archetype = deck.get("archetype", UNNAMED_ARCHETYPE)
+        keys.append((archetype, seen[archetype]))
+        seen[archetype] += 1
+    return keys
+
+
+class DeckDelta:
+    """Diferença entre duas versões da base: decks adicionados, removidos e alterados (por chave)."""
+    def __init__(self, old_decks, new_decks):
+        old = {key: frozenset(deck.get("card_ids", [])) for key, deck in zip(deck_keys(old_decks), old_decks)}
+        new = {key: frozenset(deck.get("card_ids", [])) for key, deck in zip(deck_keys(new_decks), new_decks)}
+        self.decks = new_decks
+        self.added = {key: cards for key, cards in new.items() if key not in old}
+        self.removed = [key for key in old if key not in new]
+        self.changed = {key: cards for key, cards in new.items() if key in old and old[key] != cards}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def archetypes(self):
+        """Arquétipos afetados pela mudança."""
+        return {key[0] for key in list(self.added) + self.removed + list(self.changed)}
+
+    def describe(self):
+        return f"{len(self.added)} adicionado(s), {len(self.removed)} removido(s), {len(self.changed)} alterado(s)"
+
+
+class DeckIndex:
+    """
+    Índice invertido carta -> decks, construído uma única vez ao carregar a base.
+
+    Cada carta (dbfId) aponta para a lista de posições dos decks que a contêm,
+    de modo que uma jogada só toca os decks em que a carta aparece.
+
+    A base pode ser recarregada aos poucos (`prepare_update`/`apply_update`):
+    decks removidos deixam a posição vazia, reaproveitada pelos próximos
+    adicionados, para que as posições já usadas pelas pontuações não mudem.
+    """
+    def __init__(self, meta_decks):
+        self.decks = meta_decks
+        self.archetypes = [deck.get("archetype", UNNAMED_ARCHETYPE) for deck in meta_decks]
+        self.card_sets = [frozenset(deck.get("card_ids", [])) for deck in meta_decks]
+        self.positions = dict(zip(deck_keys(meta_decks), range(len(meta_decks))))
+        self._free = []
+        postings = defaultdict(list)
+        for deck_index, cards in enumerate(self.card_sets):
+            for card_id in cards:
+                postings[card_id].append(deck_index)
+        self.postings = dict(postings)
+
+    def __len__(self):
+        return len(self.card_sets)
+
+    def card_weights(self, position):
+        """(carta, peso) das cartas do deck; numa lista exata toda carta pesa 1."""
+        return ((card_id, 1.0) for card_id in self.card_sets[position])
+
+    def prepare_update(self, new_decks):
+        """Calcula a diferença para a nova base sem alterar o índice (pode rodar em outra thread)."""
+        return DeckDelta(self.decks, new_decks)
+
+    def _set_cards(self, position, cards):
+        postings = self.postings
+        old_cards = self.card_sets[position]
+        for card_id in old_cards - cards:
+            postings[card_id].remove(position)
+            if not postings[card_id]:
+                del postings[card_id]
+        for card_id in cards - old_cards:
+            postings.setdefault(card_id, []).append(position)
+        self.card_sets[position] = cards
+
+    def apply_update(self, delta):
+        """
+        Aplica a diferença tocando só as postagens dos decks afetados.
+        Retorna as posições alteradas, para `DeckScorer.rescore`.
+        """
+        touched = set()
+        for key in delta.removed:
+            position = self.positions.pop(key)
+            self._set_cards(position, frozenset())
+            self._free.append(position)
+            touched.add(position)
+        for key, cards in delta.changed.items():
+            position = self.positions[key]
+            self._set_cards(position, cards)
+            touched.add(position)
+        for key, cards in delta.added.items():
+            if self._free:
+                position = self._free.pop()
+                self.archetypes[position] = key[0]
+            else:
+                position = len(self.card_sets)
+                self.archetypes.append(key[0])
+                self.card_sets.append(frozenset())
+            self.positions[key] = position
+            self._set_cards(position, cards)
+            touched.add(position)
+        self.decks = delta.decks
+        return touched
+
+    def new_scorer(self):
+        """Cria a pontuação incremental para uma nova partida."""
+        return DeckScorer(self)
+
+
+class DeckScorer:
+    """
+    Pontuação incremental dos decks para as cartas vistas em uma partida.
+
+    Mantém um vetor de pontuações e um heap (-pontuação, posição do deck) com
+    entradas preguiçosas: cada carta nova empurra apenas os decks da sua lista
+    de postagens, e entradas desatualizadas são descartadas ao consultar o topo.
+    Empates são resolvidos pelo deck que aparece primeiro na base.
+    """
+    def __init__(self, index):
+        self.index = index
+        self.scores = [0] * len(index)
+        self.seen_cards = set()
+        self._heap = []
+
+    def add_card(self, card_id):
+        """Soma a carta aos decks que a contêm. Retorna False se já tinha sido vista."""
+        if card_id in self.seen_cards:
+            return False
+        self.seen_cards.add(card_id)
+        scores = self.scores
+        heap = self._heap
+        for deck_index in self.index.postings.get(card_id, ()):
+            scores[deck_index] += 1
+            heapq.heappush(heap, (-scores[deck_index], deck_index))
+        return True
+
+    def top(self, k=2):
+        """Retorna até k tuplas (arquétipo, pontuação, posição do deck), da melhor para a pior."""
+        heap = self._heap
+        scores = self.scores
+        result = []
+        popped = []
+        while heap and len(result) < k:
+            entry = heapq.heappop(heap)
+            neg_score, deck_index = entry
+            if scores[deck_index] != -neg_score:
+                continue  # Entrada desatualizada: o deck já subiu de pontuação
+            if any(deck_index == returned for _, _, returned in result):
+                continue  # Duplicada: após uma recarga o deck pode voltar a uma pontuação antiga
+            popped.append(entry)
+            result.append((self.index.archetypes[deck_index], -neg_score, deck_index))
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return result
+
+    def rescore(self, positions):
+        """Recalcula a pontuação dos decks alterados por uma recarga da base, com as cartas já vistas."""
+        scores = self.scores
+        scores.extend([0] * (len(self.index) - len(scores)))
+        for deck_index in positions:
+            scores[deck_index] = len(self.seen_cards & self.index.card_sets[deck_index])
+            if scores[deck_index]:
+                heapq.heappush(self._heap, (-scores[deck_index], deck_index))
+
+    def matching_cards(self, deck_index):
+        """Cartas vistas que pertencem ao deck informado."""
+        return self.seen_cards & self.index.card_sets[deck_index]
+
+
+def build_deck_index(meta_decks, min_decks=SIGNATURE_MIN_DECKS):
+    """
+    Índice exato para bases pequenas; assinaturas com LSH a partir de `min_decks`
+    listas. O módulo das assinaturas (e o numpy) só é importado nesse caso.
+    """
+    if len(meta_decks) >= min_decks:
+        from archetype_signatures import ArchetypeSignatureIndex
+        return ArchetypeSignatureIndex(meta_decks)
+    return DeckIndex(meta_decks)
@@ -1,34 +1,54 @@
 import os
 import sys
 import json
+import time
 import traceback
 from pathlib import Path
 
-import tailer
-from hslog import LogParser
-from hslog.export import EntityTreeExporter
-from hearthstone import cardxml
-from hslog.packets import TagChange, CreateGame, FullEntity
-from hearthstone.entities import Game
+import event_bus
+import metrics as stats
+from card_cache import CARD_CACHE_PATH, load_card_database
+from deck_index import build_deck_index
+from deck_watcher import DeckDatabaseWatcher
+from game_tracker import EVICT_FINISHED_GAMES, GameTracker
+from log_follower import LogFollower, split_lines
+from log_index import load_game_index
+from tracker_checkpoint import CHECKPOINT_INTERVAL, load_checkpoint, save_checkpoint
 
 # --- CONFIGURAÇÃO ---
 HEARTHSTONE_LOGS_DIR_WINDOWS = "C:\\Program Files (x86)\\Hearthstone\\Logs"
 HEARTHSTONE_LOGS_DIR_MACOS = Path.home() / "Library/Preferences/Blizzard/Hearthstone/Logs"
 META_DECKS_DB_PATH = "meta_decks.json"
-MINIMUM_MATCH_CONFIDENCE = 2 # Mínimo de cartas correspondentes para sugerir um arquétipo
+WATCH_DECKS_DB = True # Recarrega a base de decks quando o arquivo muda, sem reiniciar
+USE_CHECKPOINTS = True # Grava o estado periodicamente e retoma dele ao reiniciar
 
-class DeckTracker:
+class DeckTracker(GameTracker):
     """
     Analisa os logs do Hearthstone para identificar o arquétipo do oponente.
+
+    O laço por linha (parser, engine, pontuação e eventos) vem do GameTracker;
+    aqui ficam o acompanhamento do arquivo, a recarga da base de decks e os
+    checkpoints.
     """
-    def __init__(self, log_path, decks_db_path):
+    def __init__(self, log_path, decks_db_path, evict_finished_games=EVICT_FINISHED_GAMES, metrics=None,
+                 watch_decks_db=WATCH_DECKS_DB, use_checkpoints=USE_CHECKPOINTS, events=None):
         self.log_path = log_path
-        self.parser = LogParser()
-        self.opponent_played_cards = set()
-        self.db, self.dbf_id_to_name = self._load_card_database()
+        self.use_checkpoints = use_checkpoints
+        self.follower = None
+        self._checkpoint_dirty = False # Linhas processadas desde o último checkpoint
+        self._checkpoint_due = False # Partida encerrada: grava no fim do bloco atual
+        self._last_checkpoint = time.monotonic()
+        self._in_chunk = False # O estado só é consistente com o offset entre dois blocos
+        self.decks_db_path = decks_db_path
+        self.watch_decks_db = watch_decks_db
+        self.deck_watcher = None # DeckDatabaseWatcher, criado em run()
+        self.game_index = None # Offsets das partidas no Power.log
+        cards = self._load_card_database()
         self.meta_decks = self._load_meta_decks(decks_db_path)
-        self.game_id = 0 # Para rastrear o jogo atual
-        self.last_known_archetype = "Desconhecido"
+        # event_bus.EventBus que recebe os eventos da partida; por padrão, só o console
+        events = events if events is not None else event_bus.EventBus([event_bus.ConsoleSink()])
+        super().__init__(cards, build_deck_index(self.meta_decks), events, # Assinaturas com LSH em bases grandes
+                         evict_finished_games=evict_finished_games, metrics=metrics)
 
     def _load_meta_decks(self, filepath):
         """Carrega a definição de decks de um arquivo JSON."""
@@ -44,123 +64,189 @@ class DeckTracker:
             sys.exit(1)
 
     def _load_card_database(self):
-        """Carrega o banco de dados de cartas e cria um mapa de dbfId para nome."""
-        db, _ = cardxml.load_dbf()
-        mapping = {}
-        for card_data in db.values():
-            if hasattr(card_data, 'dbf_id') and hasattr(card_data, 'name'):
-                mapping[str(card_data.dbf_id)] = card_data.name
-        return db, mapping
-
-    def _determine_meta_deck(self):
-        """Compara as cartas jogadas com os decks meta e retorna o mais provável."""
-        best_match_archetype = "Desconhecido"
-        highest_score = -1
-        best_matching_cards = set()
-
-        for deck in self.meta_decks:
-            deck_cards = set(deck.get("card_ids", []))
-            matches = self.opponent_played_cards.intersection(deck_cards)
-            score = len(matches)
-
-            if score > highest_score:
-                highest_score = score
-                best_match_archetype = deck.get("archetype", "Arquétipo Sem Nome")
-                best_matching_cards = matches
-
-        if highest_score > MINIMUM_MATCH_CONFIDENCE:
-            if best_match_archetype != self.last_known_archetype:
-                self.last_known_archetype = best_match_archetype
-                print("\n" + "="*40)
-                print(f"==> Deck do Oponente: {best_match_archetype}")
-                print(f"    (Confiança baseada em {highest_score} cartas correspondentes):")
-                
-                # Imprime os nomes das cartas que deram match
-                for card_dbf_id in sorted(list(best_matching_cards)):
-                    card_name = self.dbf_id_to_name.get(card_dbf_id, f"ID:{card_dbf_id}")
-                    print(f"      - {card_name}")
-
-                print("="*40 + "\n")
-        
-        return best_match_archetype
+        """Carrega o banco de cartas (cardId <-> dbfId, nome, classe) do cache compilado."""
+        start = time.perf_counter()
+        cards, from_cache = load_card_database(CARD_CACHE_PATH)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        origem = "cache" if from_cache else "CardDefs.xml, cache recompilado"
+        print(f"Banco de cartas carregado em {elapsed_ms:.1f} ms ({origem}).")
+        return cards
+
+    def _start_game(self, packet_tree):
+        if self.game_index:
+            self.game_index.update()
+            self.game_index.save()
+        super()._start_game(packet_tree)
+
+    def _finish_game(self):
+        super()._finish_game()
+        self._checkpoint_due = True
 
-    def _process_log_line(self, line):
-        """Processa uma única linha do log."""
-        self.parser.read_line(line)
+    def _save_checkpoint(self):
+        """Grava o checkpoint no offset do fim do último bloco processado."""
+        metrics = self.metrics
+        if metrics:
+            start = time.perf_counter_ns()
+        offset = self.follower.offset
+        game_offset = self.game_index.game_offset_before(offset) if self.game_index else 0
+        save_checkpoint(self.log_path, offset, game_offset, self.game_id, self.opponent_played_cards)
+        self._checkpoint_dirty = self._checkpoint_due = False
+        self._last_checkpoint = time.monotonic()
+        if metrics:
+            metrics.observe("checkpoint", time.perf_counter_ns() - start)
+            metrics.count("checkpoints")
 
-        if not self.parser.games:
+    def _maybe_checkpoint(self):
+        if not self.use_checkpoints or self._in_chunk or not self._checkpoint_dirty:
             return
+        if self._checkpoint_due or time.monotonic() - self._last_checkpoint >= CHECKPOINT_INTERVAL:
+            self._save_checkpoint()
 
-        current_game_tree = self.parser.games[-1]
-
-        # Encontra o pacote CreateGame para obter a entidade do jogo de forma robusta.
-        # Isso é necessário para contornar as falhas de atributo em diferentes versões do hslog.
-        game_entity = None
-        for packet in current_game_tree:
-            if isinstance(packet, CreateGame):
-                for sub_packet in packet.packets:
-                    if isinstance(sub_packet, FullEntity):
-                        if sub_packet.tags.get(Game.Tag.GAME_ENTITY) == 1:
-                            game_entity = sub_packet
-                            break
-                if game_entity:
-                    break
-        
-        if not game_entity:
-            return # Pacote CreateGame ainda não foi encontrado
+    def _maybe_checkpoint_on_exit(self):
+        if self.use_checkpoints and not self._in_chunk and self._checkpoint_dirty:
+            self._save_checkpoint()
+
+    def _restore_checkpoint(self, checkpoint):
+        """
+        Relê a partida do checkpoint, do início dela até o offset gravado, sem
+        publicar eventos: parser, engine, pontuação e linha do tempo voltam ao
+        ponto em que estavam, e a leitura continua do offset.
+
+        Retorna o motivo de a releitura não reproduzir o checkpoint (número da
+        partida ou cartas vistas diferentes), com o estado já descartado, ou
+        None se deu certo.
+        """
+        with open(self.log_path, "rb") as f:
+            f.seek(checkpoint["game_offset"])
+            data = f.read(checkpoint["offset"] - checkpoint["game_offset"])
+        events, self.events = self.events, event_bus.EventList()
+        self.game_id = max(0, checkpoint["game_id"] - 1) # A releitura abre a partida de novo
+        try:
+            self.process_lines(split_lines(data))
+            if self.game_id != checkpoint["game_id"]:
+                problem = f"a releitura chegou à partida {self.game_id}, não à {checkpoint['game_id']}"
+            elif sorted(self.opponent_played_cards) != checkpoint["cards_seen"]:
+                problem = "as cartas relidas do log não batem com as do checkpoint"
+            else:
+                problem = None
+        except Exception as e:
+            problem = f"erro ao reler a partida ({type(e).__name__}: {e})"
+        finally:
+            self.events = events
+        if problem:
+            # Volta ao estado de um tracker recém-criado
+            self.reset_parser()
+            self._reset_game_state()
+            self.game_id = 0
+            self.last_game_summary = None
+        return problem
 
-        current_game_id = game_entity.id
-        if current_game_id != self.game_id:
-            print("\n--- Nova Partida Detectada ---")
-            self.game_id = current_game_id
-            self.opponent_played_cards.clear()
-            self.last_known_archetype = "Desconhecido"
+    def _process_chunk(self, chunk):
+        """Processa um bloco de linhas completas vindo do LogFollower."""
+        self._check_deck_update()
+        self._in_chunk = True
+        for line in split_lines(chunk):
+            self.process_line(line)
+        self._in_chunk = False
+        self._checkpoint_dirty = True
+        self._maybe_checkpoint()
 
-        exporter = EntityTreeExporter(current_game_tree)
-        game = exporter.export()
+    def _on_idle(self):
+        """O log chegou ao fim: momento de aplicar recargas da base e gravar o checkpoint."""
+        self._check_deck_update()
+        self._maybe_checkpoint()
 
-        if not game:
+    def _apply_deck_update(self):
+        """
+        Aplica a recarga da base de decks preparada pelo watcher e repontua as
+        cartas já vistas na partida em andamento.
+        """
+        metrics = self.metrics
+        if metrics:
+            start = time.perf_counter_ns()
+        result = self.deck_watcher.apply_pending()
+        if result is None:
             return
+        update, touched = result
+        self.meta_decks = update.decks
+        self.rescore(touched)
+        if metrics:
+            metrics.observe("deck_reload", time.perf_counter_ns() - start)
+            metrics.count("deck_reloads")
+        self.events.flush()
+        print(f"\n--- Base de decks '{self.decks_db_path}' atualizada: {update.describe()} ---")
+        if self.deck_scorer.seen_cards:
+            self._report_ranking(self.deck_scorer.top(2))
 
-        opponent = next((p for p in game.players if not p.is_main_player), None)
-        if not opponent:
-            return
+    def _check_deck_update(self):
+        if self.deck_watcher and self.deck_watcher.pending is not None:
+            self._apply_deck_update()
+
+    def _on_log_rotated(self):
+        """O Power.log foi truncado ou recriado: descarta o estado do parser."""
+        self.events.flush()
+        print("\n--- Power.log recriado ou truncado. Reiniciando a leitura. ---")
+        self.reset_parser()
+        if self.game_index:
+            self.game_index.update()
+            self.game_index.save()
 
-        for packet in self.parser.flush():
-            if isinstance(packet, TagChange) and packet.tag == Game.Tag.ZONE and packet.value == Game.Zone.PLAY:
-                entity = current_game_tree.find_entity(packet.entity)
-                if not entity or not entity.card_id:
-                    continue
-                if entity.controller == opponent.player_id:
-                    card_data = self.db.get(entity.card_id)
-                    dbf_id = str(getattr(card_data, 'dbf_id', None))
-
-                    if dbf_id and dbf_id not in self.opponent_played_cards:
-                        self.opponent_played_cards.add(dbf_id)
-                        print(f"Oponente jogou: {getattr(card_data, 'name', entity.card_id)} (ID: {dbf_id})")
-                        self._determine_meta_deck()
-
-    def run(self):
-        """Inicia o monitoramento do arquivo de log."""
+    def run(self, follow=True):
+        """Inicia o monitoramento do arquivo de log (`follow=False` para só processar o que já existe)."""
         print(f"Monitorando o arquivo de log: {self.log_path}")
         
+        follower = None
         try:
-            with open(self.log_path, "r", encoding="utf-8") as log_file:
-                # 1. Processa todo o conteúdo que já existe no arquivo
-                print("Analisando o histórico do log da sessão atual...")
-                for line in log_file:
-                    #print(f"Processando linha: {line.strip()}")
-                    self._process_log_line(line)
-
-                # 2. Agora, monitora novas linhas em tempo real de forma eficiente
-                print("\nAnálise do histórico concluída. Monitorando em tempo real... (Ctrl+C para sair)")
-                for line in tailer.follow(log_file):
-                    self._process_log_line(line)
+            self.game_index = load_game_index(self.log_path)
+            # 1. Retoma do checkpoint ou processa o conteúdo que já existe, a partir do início da partida atual
+            checkpoint = None
+            if self.use_checkpoints:
+                start = time.perf_counter()
+                checkpoint, reason = load_checkpoint(self.log_path)
+                if checkpoint:
+                    reason = self._restore_checkpoint(checkpoint)
+                    if reason:
+                        checkpoint = None
+                if checkpoint:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    print(f"Retomando do checkpoint (partida relida em {elapsed_ms:.1f} ms): partida {self.game_id}, "
+                          f"{len(self.opponent_played_cards)} carta(s) do oponente já vistas, "
+                          f"arquétipo {self.last_known_archetype}.")
+                elif reason != "nenhum checkpoint":
+                    print(f"AVISO: Checkpoint ignorado: {reason}.")
+            start_offset = checkpoint["offset"] if checkpoint else self.game_index.current_game_offset()
+            if self.watch_decks_db:
+                self.deck_watcher = DeckDatabaseWatcher(self.decks_db_path, self.deck_index).start()
+            follower = LogFollower(self.log_path, offset=start_offset, on_rotate=self._on_log_rotated,
+                                   metrics=self.metrics, on_idle=self._on_idle)
+            self.follower = follower
+            if self.metrics:
+                self.metrics.gauge("backlog_bytes", follower.backlog)
+            print(f"Analisando o histórico do log a partir do byte {start_offset}...")
+            for chunk in follower.iter_available_chunks():
+                self._process_chunk(chunk)
+            if not follow:
+                return
+
+            # 2. Agora, monitora novas linhas em tempo real de forma eficiente
+            self.events.flush()
+            print(f"\nAnálise do histórico concluída. Monitorando em tempo real via {follower.backend}... (Ctrl+C para sair)")
+            for chunk in follower.follow_chunks():
+                self._process_chunk(chunk)
         except KeyboardInterrupt:
+            self.events.flush()
             print("\nMonitoramento interrompido pelo usuário.")
-        except Exception as e:
+        except Exception:
+            self.events.flush()
             print("\nOcorreu um erro inesperado. Detalhes abaixo:")
             traceback.print_exc()
+        finally:
+            if follower:
+                self._maybe_checkpoint_on_exit()
+                follower.close()
+            if self.deck_watcher:
+                self.deck_watcher.stop()
+            self.events.flush()
 
 def get_log_path():
     """
@@ -189,15 +275,22 @@ def get_log_path():
         # Pode acontecer se a pasta Logs estiver vazia ou não tiver subdiretórios
         return None
 
-def main():
+def main(log_path=None, decks_db_path=META_DECKS_DB_PATH):
     """Função principal."""
-    log_path = get_log_path()
+    log_path = log_path or get_log_path()
     if not log_path or not os.path.exists(log_path):
         print("Arquivo Power.log não encontrado. Verifique se o caminho está correto e se os logs do Hearthstone estão ativados.")
         sys.exit(1)
     
-    tracker = DeckTracker(log_path, META_DECKS_DB_PATH)
-    tracker.run()
+    metrics, stats_writer = stats.start_from_env()
+    events = event_bus.from_env()
+    tracker = DeckTracker(log_path, decks_db_path, metrics=metrics, events=events)
+    try:
+        tracker.run()
+    finally:
+        events.close()
+        if stats_writer:
+            stats_writer.stop()
 
 if __name__ == "__main__":
     main()
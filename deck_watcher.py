@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+
+DECK_WATCH_INTERVAL = 2.0  # Segundos entre verificações do arquivo de decks
+
+
+def deck_list_problem(decks):
+    """Motivo de o JSON não ser uma base de decks (lista de objetos com `card_ids`), ou None."""
+    if not isinstance(decks, list):
+        return "o JSON não é uma lista de decks"
+    for number, deck in enumerate(decks, 1):
+        if not isinstance(deck, dict):
+            return f"o deck {number} não é um objeto"
+        if not isinstance(deck.get("archetype", ""), str):
+            return f"o deck {number} tem um 'archetype' que não é texto"
+        card_ids = deck.get("card_ids")
+        if not isinstance(card_ids, list) or not all(isinstance(card, (str, int)) for card in card_ids):
+            return f"o deck {number} não tem uma lista 'card_ids' de IDs de cartas"
+    return None
+
+
+class DeckDatabaseWatcher:
+    """
+    Observa o JSON de decks e prepara, numa thread própria, a atualização do índice.
+
+    Quando o mtime ou o tamanho do arquivo mudam, a thread relê o JSON e chama
+    `index.prepare_update`, que calcula a diferença (e, no índice de
+    assinaturas, reagrupa os arquétipos afetados) sem tocar no índice. A
+    atualização pronta fica pendente até a thread do tracker chamar
+    `apply_pending` entre duas linhas do log: a troca acontece de uma vez, na
+    mesma thread que pontua as cartas, e nunca fica pela metade para ela.
+    Enquanto houver uma atualização pendente, nenhuma outra é preparada.
+    """
+    def __init__(self, path, index, interval=DECK_WATCH_INTERVAL):
+        self.path = path
+        self.index = index
+        self.interval = interval
+        self.pending = None
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="deck-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:  # Uma base inesperada não pode parar as próximas recargas
+                print(f"AVISO: Falha ao preparar a recarga da base de decks '{self.path}': {type(e).__name__}: {e}")
+
+    def check(self):
+        """Prepara a atualização se o arquivo mudou. Retorna True se deixou uma pendente."""
+        if self.pending is not None:
+            return False
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                new_decks = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False  # Provavelmente ainda está sendo gravado; tenta de novo no próximo ciclo
+        self._signature = signature
+        problem = deck_list_problem(new_decks)
+        if problem:
+            # JSON completo, mas não é uma base de decks: mantém o índice atual até o arquivo mudar de novo
+            print(f"AVISO: Base de decks '{self.path}' ignorada: {problem}.")
+            return False
+        update = self.index.prepare_update(new_decks)
+        if not update:
+            return False
+        self.pending = update
+        return True
+
+    def apply_pending(self):
+        """
+        Aplica a atualização pendente no índice (chamar na thread do tracker).
+        Retorna (atualização, posições alteradas) ou None.
+        """
+        update = self.pending
+        if update is None:
+            return None
+        touched = self.index.apply_update(update)
+        self.pending = None
+        return update, touched
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
@@ -0,0 +1,354 @@
+import argparse
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+from collections import deque
+
+# --- CONFIGURAÇÃO ---
+GAME_START = "game_start"
+CARD_PLAYED = "card_played"
+ARCHETYPE_CHANGED = "archetype_changed"
+GAME_END = "game_end"
+CARDS_PREDICTED = "cards_predicted"
+EVENTS_DROPPED = "events_dropped"  # Gerado pelo próprio bus quando um sink perde eventos
+EVENT_TYPES = (GAME_START, CARD_PLAYED, ARCHETYPE_CHANGED, GAME_END, CARDS_PREDICTED, EVENTS_DROPPED)
+
+BATCH_SIZE = 64  # Eventos que acordam a thread do sink antes do intervalo
+FLUSH_INTERVAL = 0.05  # Segundos máximos que um evento espera para ser escrito
+SINK_CAPACITY = 10000  # Eventos pendentes por sink; acima disso os mais antigos são descartados
+MAX_CLIENT_BUFFER = 1024 * 1024  # Bytes pendentes por cliente do socket antes de desconectá-lo
+JSONL_ENV_VAR = "HS_EVENTS_JSONL"
+SOCKET_ENV_VAR = "HS_EVENTS_SOCKET"
+
+
+def make_event(event_type, **fields):
+    """Evento tipado: dict com "type", "time" (epoch) e os campos do tipo."""
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Tipo de evento desconhecido: {event_type}")
+    event = {"type": event_type, "time": time.time()}
+    event.update(fields)
+    return event
+
+
+def format_console(event):
+    """Texto do evento no console, no mesmo formato dos antigos `print` do tracker e do log_reader."""
+    event_type = event["type"]
+    if event_type == CARD_PLAYED:
+        card_id = event["dbf_id"] if "dbf_id" in event else event.get("card_id")
+        return f"Oponente jogou: {event['name']} (ID: {card_id})\n"
+    if event_type == GAME_START:
+        if event.get("opponent"):
+            return f"Oponente encontrado: {event['opponent']}\n" + "-" * 20 + "\n"
+        return "\n--- Nova Partida Detectada ---\n"
+    if event_type == ARCHETYPE_CHANGED:
+        lines = ["", "=" * 40, f"==> Deck do Oponente: {event['archetype']}",
+                 f"    (Confiança baseada em {event['score']} cartas correspondentes):"]
+        lines += [f"      - {name}" for name in event.get("matched_cards", [])]
+        if event.get("runner_up"):
+            lines.append(f"    Segunda opção: {event['runner_up']} ({event['runner_up_score']} cartas)")
+        lines += ["=" * 40, "", ""]
+        return "\n".join(lines)
+    if event_type == GAME_END:
+        return ("\n--- Partida Encerrada ---\n"
+                f"    Oponente: {event.get('opponent') or 'Desconhecido'} "
+                f"({event.get('opponent_class') or 'classe desconhecida'})\n"
+                f"    Arquétipo: {event.get('archetype')} ({event.get('cards_seen')} cartas vistas "
+                f"em {event.get('turns')} turnos)\n")
+    if event_type == CARDS_PREDICTED:
+        if not event["cards"]:
+            return ""
+        cards = ", ".join(f"{card['name']} ({card['probability']:.0%})" for card in event["cards"])
+        return f"    Ainda não vistas, prováveis: {cards}\n"
+    if event_type == EVENTS_DROPPED:
+        return f"AVISO: {event['count']} evento(s) descartado(s): a saída não acompanhou o log.\n"
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+class EventList(list):
+    """Coleta os eventos numa lista, sem sinks (workers do tracker_daemon, análise em lote, testes)."""
+    def emit(self, event_type, **fields):
+        event = make_event(event_type, **fields)
+        self.append(event)
+        return event
+
+    def flush(self, timeout=None):
+        pass
+
+
+class ConsoleSink:
+    """Saída legível no terminal (o stream é fixado na criação)."""
+    name = "console"
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, events):
+        self.stream.write("".join(format_console(event) for event in events))
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """Um objeto JSON por linha, acrescentado ao arquivo."""
+    name = "jsonl"
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, events):
+        self.file.write("".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class UnixSocketSink:
+    """
+    Servidor num socket Unix: cada cliente conectado recebe os eventos em JSONL.
+
+    Tudo é não bloqueante. Um cliente que deixa de ler acumula bytes até
+    `max_client_buffer` e então é desconectado, sem atrasar os demais.
+    """
+    name = "socket"
+
+    def __init__(self, path, max_client_buffer=MAX_CLIENT_BUFFER):
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("sockets Unix não são suportados nesta plataforma")
+        self.path = path
+        self.max_client_buffer = max_client_buffer
+        self.clients = {}  # socket -> bytearray pendente
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"'{path}' já existe e não é um socket")
+            os.unlink(path)  # Socket deixado por uma execução anterior
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.server.setblocking(False)
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            client.setblocking(False)
+            self.clients[client] = bytearray()
+
+    def _drop(self, client, reason):
+        print(f"AVISO: cliente do socket de eventos desconectado ({reason}).")
+        self.clients.pop(client, None)
+        client.close()
+
+    def _send_pending(self):
+        for client, pending in list(self.clients.items()):
+            while pending:
+                try:
+                    sent = client.send(pending)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    self.clients.pop(client, None)
+                    client.close()
+                    break
+                del pending[:sent]
+
+    def write(self, events):
+        self._accept()
+        data = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events).encode("utf-8")
+        for client, pending in list(self.clients.items()):
+            if len(pending) + len(data) > self.max_client_buffer:
+                self._drop(client, "não está lendo os eventos")
+                continue
+            pending += data
+        self._send_pending()
+
+    def idle(self):
+        self._accept()
+        self._send_pending()
+
+    def close(self):
+        for client in list(self.clients):
+            client.close()
+        self.clients.clear()
+        self.server.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class SinkWorker:
+    """
+    Fila limitada e thread de escrita de um sink.
+
+    `push` só faz um append na deque (e acorda a thread quando um lote
+    enche); a thread escreve os eventos em lotes. Com a fila cheia, o evento
+    mais antigo é descartado e contado: um sink lento perde eventos, mas
+    nunca segura o processamento do log. A contagem de descartados vira um
+    evento `events_dropped` no próximo lote.
+    """
+    def __init__(self, sink, capacity=SINK_CAPACITY, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = deque()
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._writing = False
+        self._failed = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"events-{sink.name}", daemon=True)
+        self._thread.start()
+
+    def push(self, event):
+        buffer = self.buffer
+        if len(buffer) >= self.capacity:
+            try:
+                buffer.popleft()
+                self.dropped += 1
+            except IndexError:
+                pass
+        buffer.append(event)
+        if len(buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _next_batch(self):
+        buffer = self.buffer
+        batch = []
+        if self.dropped != self._reported_dropped:
+            batch.append(make_event(EVENTS_DROPPED, sink=self.sink.name, count=self.dropped - self._reported_dropped))
+            self._reported_dropped = self.dropped
+        while buffer and len(batch) < self.batch_size:
+            batch.append(buffer.popleft())
+        return batch
+
+    def _drain(self):
+        while True:
+            self._writing = True
+            batch = self._next_batch()
+            if not batch:
+                self._writing = False
+                return
+            try:
+                self.sink.write(batch)
+            except Exception as e:  # Qualquer falha do sink: avisa uma vez e mantém a thread viva
+                self._report_failure(e)
+            self._writing = False
+
+    def _report_failure(self, error):
+        if not self._failed:
+            print(f"AVISO: falha ao escrever eventos em '{self.sink.name}': {type(error).__name__}: {error}")
+            self._failed = True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+            idle = getattr(self.sink, "idle", None)
+            if idle:
+                try:
+                    idle()
+                except Exception as e:
+                    self._report_failure(e)
+
+    def flush(self, timeout=1.0):
+        """Espera a fila esvaziar (fora do laço quente: antes de prints diretos e ao sair)."""
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        while (self.buffer or self._writing) and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._drain()
+        self.sink.close()
+
+
+class EventBus:
+    """Distribui eventos tipados para vários sinks, cada um com sua fila e sua thread."""
+    def __init__(self, sinks, capacity=SINK_CAPACITY, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.workers = [SinkWorker(sink, capacity, batch_size, flush_interval) for sink in sinks]
+
+    def emit(self, event_type, **fields):
+        event = make_event(event_type, **fields)
+        for worker in self.workers:
+            worker.push(event)
+        return event
+
+    def dropped(self):
+        return {worker.sink.name: worker.dropped for worker in self.workers}
+
+    def flush(self, timeout=1.0):
+        for worker in self.workers:
+            worker.flush(timeout)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+
+
+def from_env(stream=None):
+    """
+    Bus com a saída no console e, se definidos, `HS_EVENTS_JSONL` (arquivo
+    JSONL) e `HS_EVENTS_SOCKET` (socket Unix).
+    """
+    sinks = [ConsoleSink(stream)]
+    jsonl_path = os.environ.get(JSONL_ENV_VAR)
+    if jsonl_path:
+        try:
+            sinks.append(JsonlSink(jsonl_path))
+            print(f"Eventos em JSONL: '{jsonl_path}'.")
+        except OSError as e:
+            print(f"AVISO: não foi possível abrir o arquivo de eventos '{jsonl_path}': {e}")
+    socket_path = os.environ.get(SOCKET_ENV_VAR)
+    if socket_path:
+        try:
+            sinks.append(UnixSocketSink(socket_path))
+            print(f"Eventos no socket Unix '{socket_path}'.")
+        except OSError as e:
+            print(f"AVISO: não foi possível abrir o socket de eventos '{socket_path}': {e}")
+    return EventBus(sinks)
+
+
+def main():
+    """Cliente de exemplo: conecta no socket de eventos e mostra cada evento."""
+    parser = argparse.ArgumentParser(description="Mostra os eventos publicados pelo tracker num socket Unix.")
+    parser.add_argument("socket", help=f"Caminho do socket (o mesmo de {SOCKET_ENV_VAR})")
+    parser.add_argument("--json", action="store_true", help="Imprime o JSON bruto de cada evento")
+    args = parser.parse_args()
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(args.socket)
+    except OSError as e:
+        print(f"ERRO: não foi possível conectar em '{args.socket}': {e}")
+        sys.exit(1)
+    try:
+        for line in client.makefile("r", encoding="utf-8"):
+            print(line.rstrip("\n") if args.json else format_console(json.loads(line)), end="\n" if args.json else "")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+from hearthstone.enums import BlockType, GameTag, Zone
+from hslog.export import EntityTreeExporter, FriendlyPlayerExporter
+from hslog.packets import Block, ChangeEntity, CreateGame, FullEntity, ShowEntity, SubSpell, TagChange
+from hslog.player import coerce_to_entity_id
+
+# Pacotes cujas tags chegam nas linhas seguintes do log. Só podem ser aplicados
+# depois que o parser registrar o próximo pacote.
+TAGGED_PACKETS = (CreateGame, FullEntity, ShowEntity, ChangeEntity)
+
+
+def played_entity_id(packet):
+    """
+    ID da entidade que o pacote coloca na zona PLAY, ou None.
+
+    Cartas do próprio jogador entram em jogo por TAG_CHANGE ZONE=PLAY; as do
+    oponente, que estavam ocultas na mão, são reveladas por um SHOW_ENTITY que
+    já traz tag=ZONE value=PLAY.
+    """
+    if isinstance(packet, TagChange):
+        if packet.tag == GameTag.ZONE and packet.value == Zone.PLAY:
+            return int(coerce_to_entity_id(packet.entity))
+    elif isinstance(packet, ShowEntity):
+        if (GameTag.ZONE, Zone.PLAY) in packet.tags:
+            return int(packet.entity)
+    return None
+
+
+def zone_change(packet):
+    """
+    (ID da entidade, nova zona) se o pacote muda a zona de uma entidade, ou None.
+
+    Além do TAG_CHANGE ZONE, cobre o FULL_ENTITY (entidade criada já numa
+    zona) e o SHOW_ENTITY (carta revelada ao mudar de zona).
+    """
+    if isinstance(packet, TagChange):
+        if packet.tag == GameTag.ZONE:
+            return int(coerce_to_entity_id(packet.entity)), Zone(packet.value)
+    elif isinstance(packet, (FullEntity, ShowEntity)):
+        for tag, value in packet.tags:
+            if tag == GameTag.ZONE:
+                return int(packet.entity), Zone(value)
+    return None
+
+
+class GameStateEngine:
+    """
+    Mantém o modelo de entidades de uma partida aplicando apenas os pacotes novos.
+
+    Em vez de exportar a árvore inteira a cada linha, guarda um cursor dentro da
+    PacketTree do hslog (uma pilha de blocos abertos) e repassa cada pacote uma
+    única vez para um EntityTreeExporter persistente.
+    """
+    def __init__(self, packet_tree):
+        self.packet_tree = packet_tree
+        self.exporter = EntityTreeExporter(packet_tree, tolerate_missing_entities=True)
+        self._friendly_exporter = FriendlyPlayerExporter(packet_tree)
+        # Cada nível: [lista de pacotes, bloco dono da lista, próximo índice]
+        self._stack = [[packet_tree.packets, None, 0]]
+        self.game_entity = None
+        self.opponent = None
+
+    @property
+    def game(self):
+        return self.exporter.game
+
+    def update(self):
+        """Aplica os pacotes completos ainda não processados e os retorna em ordem."""
+        applied = []
+        stack = self._stack
+        while True:
+            packets, container, index = stack[-1]
+            if index < len(packets):
+                packet = packets[index]
+                if not self._is_complete(packet):
+                    break
+                stack[-1][2] = index + 1
+                self._apply(packet)
+                applied.append(packet)
+                if isinstance(packet, (Block, SubSpell)):
+                    stack.append([packet.packets, packet, 0])
+            elif container is not None and self._is_closed():
+                stack.pop()
+            else:
+                break
+        return applied
+
+    def _is_complete(self, packet):
+        """Um pacote com tags só está completo quando outro pacote foi registrado depois dele."""
+        if not isinstance(packet, TAGGED_PACKETS):
+            return True
+        last = packet.players[-1] if isinstance(packet, CreateGame) and packet.players else packet
+        return last.packet_id < self.packet_tree.packet_counter
+
+    def _is_closed(self):
+        """Indica se o bloco no topo da pilha não receberá mais pacotes."""
+        if self._stack[-1][1].ended:
+            return True
+        # BLOCK_END desbalanceado: o parser já voltou a escrever em um nível acima.
+        for parent, child in zip(self._stack, self._stack[1:]):
+            if parent[0][-1] is not child[1]:
+                return True
+        return False
+
+    def _apply(self, packet):
+        """Repassa um único pacote para o modelo de entidades."""
+        if isinstance(packet, Block):
+            # Os filhos do bloco são aplicados individualmente pelo cursor.
+            if packet.type == BlockType.GAME_RESET and self.game:
+                self.game.reset()
+            return
+        if isinstance(packet, SubSpell):
+            return
+
+        self.exporter.export_packet(packet)
+        if isinstance(packet, CreateGame):
+            self.game_entity = self.exporter.game
+
+        if self.opponent is None:
+            try:
+                self._friendly_exporter.export_packet(packet)
+            except KeyError:
+                # Entidade revelada sem CONTROLLER conhecido
+                return
+            self._resolve_opponent()
+
+    def _resolve_opponent(self):
+        """Guarda o oponente assim que o jogador principal for conhecido."""
+        friendly_player_id = self._friendly_exporter.friendly_player
+        if friendly_player_id is None or not self.game:
+            return
+        self.opponent = next(
+            (p for p in self.game.players if p.player_id != friendly_player_id), None
+        )
+
+    def find_entity(self, entity_id):
+        """Retorna a entidade atual com o ID informado, se existir."""
+        if not self.game:
+            return None
+        return self.game.find_entity_by_id(int(entity_id))
+
+    def player_name(self, player):
+        """BattleTag do jogador, resolvido pelo hslog na PlayerReference do CREATE_GAME."""
+        if player is None or not self.packet_tree.packets:
+            return None
+        create_game = self.packet_tree.packets[0]
+        for packet in getattr(create_game, "players", ()):
+            if packet.player_id == player.player_id:
+                return getattr(packet.entity, "name", None)
+        return None
+
+    def is_controlled_by_opponent(self, entity):
+        """Verifica se a entidade pertence ao oponente."""
+        if self.opponent is None:
+            return False
+        return entity.tags.get(GameTag.CONTROLLER) == self.opponent.player_id
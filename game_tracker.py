@@ -0,0 +1,258 @@
+import json
+import time
+
+from hearthstone.enums import GameTag, State
+from hslog import LogParser
+from hslog.packets import TagChange
+
+import event_bus
+from card_cache import load_card_database
+from card_timeline import PREDICTED_CARDS, CardTimeline, RemainingCardPredictor
+from deck_index import build_deck_index
+from game_state import GameStateEngine, played_entity_id, zone_change
+
+# --- CONFIGURAÇÃO ---
+MINIMUM_MATCH_CONFIDENCE = 2 # Mínimo de cartas correspondentes para sugerir um arquétipo
+EVICT_FINISHED_GAMES = True # Libera da memória as partidas encerradas (sessões longas)
+
+# Estado somente leitura de cada processo, por base de decks: (CardDatabase, índice
+# de decks). Carregado no processo principal antes dos pools do batch_analyzer e do
+# tracker_daemon, é herdado pelos workers via fork (copy-on-write); com spawn
+# (Windows) cada worker o carrega uma vez.
+_shared = {}
+
+
+def load_shared_state(decks_path):
+    """Banco de cartas e índice de decks compartilhados pelos GameTracker do processo."""
+    if decks_path not in _shared:
+        cards, _ = load_card_database()
+        with open(decks_path, "r", encoding="utf-8") as f:
+            deck_index = build_deck_index(json.load(f))
+        _shared[decks_path] = (cards, deck_index)
+    return _shared[decks_path]
+
+
+class GameTracker:
+    """
+    Transforma as linhas do Power.log em eventos da partida: início, cartas do
+    oponente, arquétipo mais provável, cartas ainda não vistas e fim.
+
+    Guarda o LogParser, o engine da partida atual, a pontuação dos decks, a
+    linha do tempo e a previsão das cartas restantes. É o laço comum do
+    deck_tracker, dos workers do tracker_daemon e do batch_analyzer; cada um
+    decide o que fazer com os eventos, entregues a `events.emit(tipo, **campos)`
+    (um event_bus.EventBus ou um event_bus.EventList).
+    """
+    def __init__(self, cards, deck_index, events=None, evict_finished_games=EVICT_FINISHED_GAMES, metrics=None,
+                 predicted_cards=PREDICTED_CARDS):
+        self.cards = cards
+        self.dbf_id_to_name = cards.dbf_id_to_name
+        self.deck_index = deck_index
+        self.events = events if events is not None else event_bus.EventList()
+        self.evict_finished_games = evict_finished_games
+        self.metrics = metrics # metrics.Metrics opcional; None desliga a instrumentação
+        self.predicted_cards = predicted_cards # 0 desliga a previsão das cartas restantes
+        self.parser = LogParser()
+        self.opponent_played_cards = set()
+        self.deck_scorer = deck_index.new_scorer()
+        self.timeline = CardTimeline() # Turno e zonas de cada carta do oponente na partida atual
+        self.predictor = RemainingCardPredictor(deck_index) # Cartas do oponente ainda não vistas
+        self.game_id = 0 # Para rastrear o jogo atual
+        self.engine = None # Estado incremental da partida atual
+        self.last_known_archetype = "Desconhecido"
+        self.last_game_summary = None # Resumo da última partida encerrada
+
+    def _reset_game_state(self):
+        self.opponent_played_cards.clear()
+        self.deck_scorer = self.deck_index.new_scorer()
+        self.timeline = CardTimeline()
+        self.predictor = RemainingCardPredictor(self.deck_index)
+        self.last_known_archetype = "Desconhecido"
+
+    def reset_parser(self):
+        """Descarta o estado do parser (log truncado ou recriado)."""
+        self.parser = LogParser()
+        self.engine = None
+
+    def _start_game(self, packet_tree):
+        """Cada CREATE_GAME gera uma nova PacketTree no hslog."""
+        previous = self.engine
+        if self.evict_finished_games and previous is not None and previous.packet_tree in self.parser.games:
+            # Partida anterior sem STATE=COMPLETE (desconexão, log cortado)
+            self.parser.games.remove(previous.packet_tree)
+        self.engine = GameStateEngine(packet_tree)
+        self.game_id += 1
+        self.events.emit(event_bus.GAME_START, game=self.game_id)
+        if self.metrics:
+            self.metrics.count("games")
+        self._reset_game_state()
+
+    def _determine_meta_deck(self, new_card_id):
+        """Soma a carta nova à pontuação dos decks e retorna o arquétipo mais provável."""
+        metrics = self.metrics
+        if metrics:
+            start = time.perf_counter_ns()
+        self.deck_scorer.add_card(new_card_id)
+        ranking = self.deck_scorer.top(2)
+        if metrics:
+            metrics.observe("scoring", time.perf_counter_ns() - start)
+        return self._report_ranking(ranking)
+
+    def _predict_remaining_cards(self, new_card_id):
+        """Atualiza a previsão das cartas ainda não vistas e a publica."""
+        if not self.predicted_cards:
+            return
+        metrics = self.metrics
+        if metrics:
+            start = time.perf_counter_ns()
+        self.predictor.add_card(new_card_id)
+        cards = [{"dbf_id": dbf_id, "name": self.dbf_id_to_name.get(dbf_id, f"ID:{dbf_id}"),
+                  "probability": round(probability, 3)}
+                 for dbf_id, probability in self.predictor.top(self.predicted_cards)]
+        self.events.emit(event_bus.CARDS_PREDICTED, game=self.game_id, cards=cards)
+        if metrics:
+            metrics.observe("prediction", time.perf_counter_ns() - start)
+
+    def _record_zone_change(self, entity_id, zone):
+        """Registra na linha do tempo o movimento de uma carta conhecida do oponente."""
+        engine = self.engine
+        previous = self.timeline.move(entity_id, zone)
+        if previous == zone:
+            return  # Carta revelada sem sair da zona
+        entity = engine.find_entity(entity_id)
+        if not entity or not entity.card_id or not engine.is_controlled_by_opponent(entity):
+            return
+        dbf_id = self.cards.card_id_to_dbf_id.get(entity.card_id)
+        if dbf_id:
+            game = engine.game
+            self.timeline.append(game.tags.get(GameTag.TURN, 0) if game else 0, dbf_id, previous, zone)
+
+    def _report_ranking(self, ranking):
+        """Publica o arquétipo mais provável quando ele muda e o retorna."""
+        metrics = self.metrics
+        if not ranking:
+            return "Desconhecido"
+
+        best_match_archetype, highest_score, best_deck_index = ranking[0]
+
+        if highest_score > MINIMUM_MATCH_CONFIDENCE:
+            if best_match_archetype != self.last_known_archetype:
+                self.last_known_archetype = best_match_archetype
+                if metrics:
+                    metrics.count("archetype_changes")
+                    start = time.perf_counter_ns()
+                # Nomes das cartas que deram match
+                matched_cards = [self.dbf_id_to_name.get(card_dbf_id, f"ID:{card_dbf_id}")
+                                 for card_dbf_id in sorted(self.deck_scorer.matching_cards(best_deck_index))]
+                runner_up_archetype, runner_up_score = (ranking[1][0], ranking[1][1]) if len(ranking) > 1 else (None, None)
+                self.events.emit(event_bus.ARCHETYPE_CHANGED, game=self.game_id, archetype=best_match_archetype,
+                                 score=highest_score, matched_cards=matched_cards,
+                                 runner_up=runner_up_archetype, runner_up_score=runner_up_score)
+                if metrics:
+                    metrics.observe("emit", time.perf_counter_ns() - start)
+
+        return best_match_archetype
+
+    def rescore(self, touched):
+        """Repontua as cartas já vistas depois de uma recarga da base de decks (posições alteradas)."""
+        self.deck_scorer.rescore(touched)
+        self.predictor.rebuild()
+
+    def process_line(self, line):
+        """Processa uma única linha do log."""
+        metrics = self.metrics
+        if metrics:
+            start = time.perf_counter_ns()
+            metrics.count("lines")
+        self.parser.read_line(line)
+        if metrics:
+            metrics.observe("read_line", time.perf_counter_ns() - start)
+
+        if not self.parser.games:
+            return
+
+        current_game_tree = self.parser.games[-1]
+        if self.engine is None or self.engine.packet_tree is not current_game_tree:
+            self._start_game(current_game_tree)
+
+        if metrics:
+            start = time.perf_counter_ns()
+        packets = self.engine.update()
+        if metrics:
+            metrics.observe("export", time.perf_counter_ns() - start)
+            metrics.count("packets", len(packets))
+
+        for packet in packets:
+            if isinstance(packet, TagChange) and packet.tag == GameTag.STATE and packet.value == State.COMPLETE:
+                self._finish_game()
+                return
+
+            change = zone_change(packet)
+            if change is not None:
+                self._record_zone_change(*change)
+
+            entity_id = played_entity_id(packet)
+            if entity_id is not None:
+                entity = self.engine.find_entity(entity_id)
+                if not entity or not entity.card_id:
+                    continue
+                if self.engine.is_controlled_by_opponent(entity):
+                    dbf_id = self.cards.card_id_to_dbf_id.get(entity.card_id)
+
+                    if dbf_id and dbf_id not in self.opponent_played_cards:
+                        self.opponent_played_cards.add(dbf_id)
+                        if metrics:
+                            metrics.count("events")
+                            start = time.perf_counter_ns()
+                        game = self.engine.game
+                        self.events.emit(event_bus.CARD_PLAYED, game=self.game_id, dbf_id=dbf_id,
+                                         card_id=entity.card_id,
+                                         name=self.dbf_id_to_name.get(dbf_id, entity.card_id),
+                                         turn=game.tags.get(GameTag.TURN, 0) if game else 0)
+                        if metrics:
+                            metrics.observe("emit", time.perf_counter_ns() - start)
+                        self._determine_meta_deck(dbf_id)
+                        self._predict_remaining_cards(dbf_id)
+
+    def process_lines(self, lines):
+        for line in lines:
+            self.process_line(line)
+
+    def summary(self):
+        """Resumo da partida atual (ou da que acabou de terminar)."""
+        engine = self.engine
+        opponent = engine.opponent if engine else None
+        hero = opponent.starting_hero if opponent else None
+        return {
+            "game": self.game_id,
+            "opponent": engine.player_name(opponent) if engine else None,
+            "opponent_class": self.cards.class_name(hero.card_id) if hero else None,
+            "archetype": self.last_known_archetype,
+            "cards_seen": len(self.opponent_played_cards),
+            "turns": engine.game.tags.get(GameTag.TURN, 0) if engine and engine.game else 0,
+            "timeline": self.timeline.records(),
+        }
+
+    def _finish_game(self):
+        """
+        Partida encerrada (STATE=COMPLETE): publica o resumo e, no modo de sessão
+        longa, descarta a PacketTree e as entidades dela.
+
+        O hslog acumula em `parser.games` a árvore de todas as partidas do
+        processo; removê-la da lista (e soltar o engine) deixa apenas a partida
+        em andamento na memória. As linhas restantes da partida encerrada
+        continuam indo para a árvore interna do parser, que é substituída no
+        próximo CREATE_GAME.
+        """
+        self.last_game_summary = self.summary()
+        self.events.emit(event_bus.GAME_END, **self.last_game_summary)
+
+        if self.evict_finished_games:
+            games = self.parser.games
+            if self.engine.packet_tree in games:
+                games.remove(self.engine.packet_tree)
+            self.engine = None
+            self.opponent_played_cards.clear()
+            self.deck_scorer = self.deck_index.new_scorer()
+            self.timeline = CardTimeline()
+            self.predictor = RemainingCardPredictor(self.deck_index)
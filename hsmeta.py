@@ -0,0 +1,55 @@
+import argparse
+import importlib
+import sys
+
+# --- CONFIGURAÇÃO ---
+# Cada subcomando só importa o seu módulo quando é executado: `hsmeta.py scrape`
+# não carrega o hslog e `hsmeta.py track` não carrega o aiohttp nem o BeautifulSoup.
+COMMANDS = {
+    "track": ("deck_tracker", "Acompanha o Power.log e identifica o deck do oponente"),
+    "read-log": ("log_reader", "Mostra o oponente e as cartas jogadas por ele (sem o hslog)"),
+    "scrape": ("refresh_hsguru", "Atualiza os dados do HSGuru: decks, meta e matchups"),
+    "analyze": ("batch_analyzer", "Analisa em lote arquivos Power.log arquivados"),
+}
+FORWARDED_COMMANDS = ("scrape", "analyze")  # Os argumentos vão direto para o argparse do módulo
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="hsmeta.py", description="HS Meta Analyzer: tracker, leitor de log, "
+                                                                  "scrapers do HSGuru e análise em lote.")
+    subparsers = parser.add_subparsers(dest="command", metavar="comando", required=True)
+
+    track = subparsers.add_parser("track", help=COMMANDS["track"][1])
+    track.add_argument("--log", help="Caminho do Power.log (padrão: detecta pela plataforma)")
+    track.add_argument("--decks", help="Base de decks (padrão: META_DECKS_DB_PATH do deck_tracker)")
+
+    read_log = subparsers.add_parser("read-log", help=COMMANDS["read-log"][1])
+    read_log.add_argument("--log", help="Caminho do Power.log (padrão: detecta pela plataforma)")
+    read_log.add_argument("--regex", action="store_true", help="Usa as regexes linha a linha em vez do scanner de bytes")
+
+    # Só para aparecerem na ajuda; os argumentos são tratados pelo próprio módulo
+    subparsers.add_parser("scrape", add_help=False, help=f"{COMMANDS['scrape'][1]} ('scrape --help' para as opções)")
+    subparsers.add_parser("analyze", add_help=False, help=f"{COMMANDS['analyze'][1]} ('analyze --help' para as opções)")
+    return parser
+
+
+def load_command(command):
+    """Importa o módulo do subcomando (o único ponto com imports pesados)."""
+    return importlib.import_module(COMMANDS[command][0])
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in FORWARDED_COMMANDS:
+        return load_command(argv[0]).main(argv[1:], prog=f"hsmeta.py {argv[0]}")
+
+    args = build_parser().parse_args(argv)
+    module = load_command(args.command)
+    if args.command == "track":
+        return module.main(log_path=args.log, decks_db_path=args.decks or module.META_DECKS_DB_PATH)
+    if args.command == "read-log":
+        return module.main(log_path=args.log, fast_scan=not args.regex)
+
+
+if __name__ == "__main__":
+    main()
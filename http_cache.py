@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+# --- CONFIGURAÇÃO ---
+CACHE_DIR = ".hsguru_cache"
+INDEX_FILE = "index.json"
+MAX_CACHE_BYTES = 64 * 1024 * 1024  # Acima disso, os corpos usados há mais tempo são removidos
+DEFAULT_TTL = 3600  # Segundos em que uma resposta é usada sem revalidar
+# TTL por prefixo de caminho; o primeiro que casar vale
+TTL_RULES = [
+    ("/matchups", 6 * 3600),
+    ("/decks", 3600),
+    ("/meta", 1800),
+]
+OFFLINE_ENV_VAR = "HS_OFFLINE"  # "1" = só o cache, nunca a rede
+
+
+class CacheMiss(Exception):
+    """No modo offline, a URL pedida não está no cache."""
+
+
+def is_offline():
+    return os.environ.get(OFFLINE_ENV_VAR) == "1"
+
+
+def ttl_for(url, default=DEFAULT_TTL):
+    path = urlsplit(url).path
+    for prefix, ttl in TTL_RULES:
+        if path.startswith(prefix):
+            return ttl
+    return default
+
+
+class ResponseCache:
+    """
+    Cache em disco das respostas HTTP dos scrapers.
+
+    Cada corpo fica em `<sha1 da URL>.body`; o `index.json` guarda por URL o
+    ETag, o Last-Modified, o hash do conteúdo, quando foi baixado e quando foi
+    usado pela última vez. Uma resposta dentro do TTL é usada sem rede; depois
+    dele é revalidada com If-None-Match / If-Modified-Since (304 só renova a
+    data). O índice também registra com qual hash de conteúdo cada arquivo de
+    saída foi gerado, para pular o parse quando nada mudou.
+    """
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = {}
+        self.outputs = {}  # arquivo de saída -> hash do conteúdo que o gerou
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _body_path(self, entry):
+        return os.path.join(self.directory, entry["key"] + ".body")
+
+    def _load(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.entries = index.get("entries", {})
+        self.outputs = index.get("outputs", {})
+
+    def save(self):
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries, "outputs": self.outputs}, f, indent=1)
+        os.replace(tmp_path, self._index_path())
+
+    def lookup(self, url):
+        """Entrada da URL, ou None se não houver (ou se o corpo tiver sumido do disco)."""
+        entry = self.entries.get(url)
+        if entry and not os.path.exists(self._body_path(entry)):
+            del self.entries[url]
+            return None
+        return entry
+
+    def is_fresh(self, entry, ttl):
+        return time.time() - entry["fetched_at"] < ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read(self, url):
+        """Corpo guardado da URL (marca o uso para a política de remoção)."""
+        entry = self.entries[url]
+        entry["last_access"] = time.time()
+        with open(self._body_path(entry), "rb") as f:
+            return f.read()
+
+    def revalidated(self, url):
+        """O servidor respondeu 304: o corpo guardado continua válido."""
+        self.entries[url]["fetched_at"] = time.time()
+        self.save()
+
+    def store(self, url, body, headers):
+        """Guarda uma resposta 200 e retorna o hash do conteúdo."""
+        content_hash = hashlib.sha256(body).hexdigest()
+        entry = {
+            "key": hashlib.sha1(url.encode("utf-8")).hexdigest(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "size": len(body),
+            "fetched_at": time.time(),
+            "last_access": time.time(),
+        }
+        tmp_path = self._body_path(entry) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, self._body_path(entry))
+        self.entries[url] = entry
+        self._evict()
+        self.save()
+        return content_hash
+
+    def _evict(self):
+        """Remove os corpos usados há mais tempo até o total caber em `max_bytes`."""
+        total = sum(entry["size"] for entry in self.entries.values())
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(entry))
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del self.entries[url]
+
+    def output_is_current(self, output, content_hash):
+        """Indica se o arquivo de saída existe e foi gerado a partir deste mesmo conteúdo."""
+        return self.outputs.get(str(output)) == content_hash and os.path.exists(output)
+
+    def record_output(self, output, content_hash):
+        self.outputs[str(output)] = content_hash
+        self.save()
+
+
+def cached_get(url, headers=None, timeout=15, cache=None, offline=None):
+    """
+    `requests.get` com o cache em disco, para os scrapers síncronos.
+
+    Retorna o corpo em bytes. Lança as exceções do `requests` como antes e
+    `CacheMiss` se, offline, a URL não estiver no cache.
+    """
+    import requests
+
+    cache = cache or ResponseCache()
+    offline = is_offline() if offline is None else offline
+    entry = cache.lookup(url)
+    if entry and (offline or cache.is_fresh(entry, ttl_for(url))):
+        return cache.read(url)
+    if offline:
+        raise CacheMiss(f"'{url}' não está no cache (modo offline).")
+
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(cache.conditional_headers(entry))
+    response = requests.get(url, headers=request_headers, timeout=timeout)
+    if entry and response.status_code == 304:
+        cache.revalidated(url)
+        return cache.read(url)
+    response.raise_for_status()
+    cache.store(url, response.content, response.headers)
+    return response.content
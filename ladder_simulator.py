@@ -0,0 +1,212 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from matchup_matrix import MATCHUPS_CSV_PATH, META_DATA_PATH, load_matchup_matrix
+
+DEFAULT_SESSIONS = 20000  # Sessões simuladas por deck
+GAMES_PER_SESSION = 12  # Partidas por sessão (~1 hora de ladder)
+SESSIONS_PER_SHARD = 2000  # Tamanho fixo dos shards: o resultado não depende do nº de processos
+DEFAULT_DURATION = 6.0  # Minutos por partida quando o meta_data.json não informa
+MIN_META_COVERAGE = 0.5  # Fração mínima da popularidade do meta_data.json que precisa estar na matriz
+WIN_STREAK_LENGTH = 3  # A partir da 3ª vitória seguida a vitória vale 2 estrelas (se ativado)
+
+
+def load_meta_data(meta_data_path=META_DATA_PATH):
+    """Popularidade (%) e duração média (min) por arquétipo, do meta_data.json."""
+    try:
+        with open(meta_data_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return {}
+    meta = {}
+    for entry in entries:
+        try:
+            popularity = float(entry["popularity"].split("%")[0])
+        except (KeyError, ValueError):
+            popularity = 0.0
+        meta[entry["archetype"]] = {
+            "popularity": popularity,
+            "duration": entry.get("duration") or DEFAULT_DURATION,
+            "climbing_speed": entry.get("climbing_speed"),
+        }
+    return meta
+
+
+def build_field(matrix, meta, boosts=None):
+    """
+    Distribuição de oponentes: popularidade do meta_data.json para os
+    arquétipos que estão na matriz. Se menos de MIN_META_COVERAGE da
+    popularidade do meta_data.json casar com nomes da matriz (os dois vêm de
+    páginas diferentes do HSGuru), usa a popularidade da própria matriz.
+    `boosts` (nome -> fator) simula mudanças no meta.
+    """
+    weights = np.array([meta.get(name, {}).get("popularity", 0.0) for name in matrix.names], dtype=np.float64)
+    meta_total = sum(entry["popularity"] for entry in meta.values())
+    source = "meta_data.json"
+    if not meta_total or weights.sum() / meta_total < MIN_META_COVERAGE:
+        weights = matrix.popularity.astype(np.float64)
+        source = "matriz"
+    for name, factor in (boosts or {}).items():
+        weights[matrix.index[name]] *= factor
+    total = weights.sum()
+    if not np.isfinite(total) or total <= 0 or (weights < 0).any():
+        raise ValueError(f"popularidade total do campo é {total:g} (fonte: {source}); "
+                         "confira a matriz de matchups e os fatores de --boost")
+    return weights / total, source
+
+
+def win_probabilities(matrix, field):
+    """
+    Probabilidade de vitória de cada deck contra cada oponente. Matchups sem
+    dados usam o winrate esperado do deck contra o campo (ou 50%).
+    """
+    expected = np.nan_to_num(matrix.expected_winrates(field.astype(np.float32)), nan=50.0)
+    winrates = np.asarray(matrix.winrates, dtype=np.float64)
+    filled = np.where(np.isnan(winrates), expected[:, None], winrates)
+    return filled / 100.0
+
+
+def simulate_shard(win_prob, field, deck_indices, durations, sessions, games, seed, win_streaks=False):
+    """
+    Simula `sessions` sessões de `games` partidas para cada deck, todas de uma vez.
+
+    Retorna (winrates, estrelas/hora), arrays (decks, sessões).
+    """
+    rng = np.random.default_rng(seed)
+    decks = len(deck_indices)
+    # Oponentes e sorteios de todas as partidas: arrays (decks, sessões, partidas)
+    opponents = rng.choice(len(field), size=(decks, sessions, games), p=field)
+    p_win = win_prob[np.asarray(deck_indices)[:, None, None], opponents]
+    wins = rng.random(p_win.shape) < p_win
+
+    stars = np.where(wins, 1, -1).astype(np.int16)
+    if win_streaks:
+        # Tamanho da sequência de vitórias em cada partida: posição - última derrota
+        positions = np.arange(games)
+        last_loss = np.maximum.accumulate(np.where(wins, -1, positions), axis=2)
+        stars += (wins & (positions - last_loss >= WIN_STREAK_LENGTH)).astype(np.int16)
+
+    winrates = wins.mean(axis=2)
+    hours = games * np.asarray(durations, dtype=np.float64)[:, None] / 60.0
+    stars_per_hour = stars.sum(axis=2) / hours
+    return winrates, stars_per_hour
+
+
+def _simulate_shard_star(args):
+    return simulate_shard(*args)
+
+
+def simulate_ladder(matrix, field, deck_indices, durations, sessions=DEFAULT_SESSIONS, games=GAMES_PER_SESSION,
+                    seed=0, workers=None, win_streaks=False):
+    """
+    Divide as sessões em shards de tamanho fixo, cada um com uma semente
+    derivada de `seed` (SeedSequence.spawn), e os simula em paralelo.
+    """
+    win_prob = win_probabilities(matrix, field)
+    shard_sizes = [min(SESSIONS_PER_SHARD, sessions - start) for start in range(0, sessions, SESSIONS_PER_SHARD)]
+    seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+    tasks = [(win_prob, field, deck_indices, durations, size, games, shard_seed, win_streaks)
+             for size, shard_seed in zip(shard_sizes, seeds)]
+    if workers == 1:
+        results = list(map(_simulate_shard_star, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_shard_star, tasks))
+    winrates = np.concatenate([result[0] for result in results], axis=1)
+    stars_per_hour = np.concatenate([result[1] for result in results], axis=1)
+    return winrates, stars_per_hour
+
+
+def summarize(names, winrates, stars_per_hour):
+    """Média e percentis 5/50/95 de winrate e estrelas/hora por deck."""
+    winrate_pct = np.percentile(winrates, [5, 50, 95], axis=1)
+    stars_pct = np.percentile(stars_per_hour, [5, 50, 95], axis=1)
+    return [{
+        "archetype": name,
+        "winrate_mean": float(winrates[i].mean() * 100),
+        "winrate_p5": float(winrate_pct[0, i] * 100),
+        "winrate_p50": float(winrate_pct[1, i] * 100),
+        "winrate_p95": float(winrate_pct[2, i] * 100),
+        "stars_per_hour_mean": float(stars_per_hour[i].mean()),
+        "stars_per_hour_p5": float(stars_pct[0, i]),
+        "stars_per_hour_p50": float(stars_pct[1, i]),
+        "stars_per_hour_p95": float(stars_pct[2, i]),
+    } for i, name in enumerate(names)]
+
+
+def _parse_boosts(values):
+    boosts = {}
+    for value in values or []:
+        name, _, factor = value.rpartition("=")
+        boosts[name] = float(factor)
+    return boosts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo de subida no ladder a partir dos matchups do HSGuru.")
+    parser.add_argument("--matchups", default=MATCHUPS_CSV_PATH)
+    parser.add_argument("--meta-data", default=META_DATA_PATH)
+    parser.add_argument("--decks", nargs="+", help="Decks simulados (padrão: todos com popularidade > 0)")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument("--games", type=int, default=GAMES_PER_SESSION, help="Partidas por sessão")
+    parser.add_argument("--boost", action="append", metavar="NOME=FATOR",
+                        help="Multiplica a popularidade de um arquétipo (pode repetir)")
+    parser.add_argument("--win-streaks", action="store_true", help="Conta a estrela extra de sequência de vitórias")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20, help="Linhas exibidas")
+    parser.add_argument("--output", help="Grava o resumo completo em JSON")
+    args = parser.parse_args()
+
+    try:
+        matrix = load_matchup_matrix(args.matchups)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"ERRO: {e}")
+        sys.exit(1)
+    meta = load_meta_data(args.meta_data)
+    boosts = _parse_boosts(args.boost)
+    unknown = [name for name in list(boosts) + (args.decks or []) if name not in matrix.index]
+    if unknown:
+        print(f"ERRO: arquétipo(s) fora da matriz de matchups: {', '.join(unknown)}")
+        sys.exit(1)
+
+    try:
+        field, source = build_field(matrix, meta, boosts)
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        sys.exit(1)
+    names = args.decks or [name for name, share in zip(matrix.names, field) if share > 0]
+    deck_indices = [matrix.index[name] for name in names]
+    durations = [meta.get(name, {}).get("duration", DEFAULT_DURATION) for name in names]
+
+    total_games = len(names) * args.sessions * args.games
+    print(f"Campo: {np.count_nonzero(field)} arquétipos (popularidade de {source}). "
+          f"Simulando {total_games:,} partidas...")
+    start = time.perf_counter()
+    winrates, stars_per_hour = simulate_ladder(matrix, field, deck_indices, durations, args.sessions, args.games,
+                                               args.seed, args.workers, args.win_streaks)
+    elapsed = time.perf_counter() - start
+    print(f"{total_games:,} partidas em {elapsed:.2f} s ({total_games / elapsed / 1e6:.1f} milhões/s).\n")
+
+    summary = sorted(summarize(names, winrates, stars_per_hour), key=lambda row: -row["stars_per_hour_mean"])
+    print(f"{'arquétipo':24s} {'winrate':>8s} {'p5-p95':>13s} {'⭐/h':>6s} {'p5-p95':>13s} {'HSGuru':>8s}")
+    for row in summary[:args.top]:
+        hsguru = meta.get(row["archetype"], {}).get("climbing_speed") or "-"
+        print(f"{row['archetype']:24s} {row['winrate_mean']:7.1f}% "
+              f"{row['winrate_p5']:5.1f}-{row['winrate_p95']:<5.1f}% "
+              f"{row['stars_per_hour_mean']:6.2f} {row['stars_per_hour_p5']:6.2f}-{row['stars_per_hour_p95']:<6.2f} "
+              f"{hsguru:>8s}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4, ensure_ascii=False)
+        print(f"\nResumo salvo em '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
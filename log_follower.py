@@ -0,0 +1,287 @@
+import ctypes
+import os
+import select
+import struct
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+CHUNK_SIZE = 256 * 1024  # Bytes lidos por syscall
+POLL_INTERVAL = 0.05  # Segundos entre verificações quando não há inotify
+SAFETY_TIMEOUT = 1.0  # Mesmo com inotify, verifica o arquivo periodicamente
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def split_lines(chunk):
+    """Linhas decodificadas de um bloco que só contém linhas completas."""
+    return [line.decode("utf-8", errors="replace") + "\n" for line in chunk.split(b"\n")[:-1]]
+
+
+class InotifyWatcher:
+    """Aguarda eventos do inotify (Linux, inclusive Wine) para um arquivo, observando o diretório dele."""
+    def __init__(self, fd, filename):
+        self.fd = fd
+        self.filename = filename
+
+    @classmethod
+    def create(cls, path):
+        """Retorna um watcher ou None se o inotify não estiver disponível nesta plataforma."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            # O diretório é observado para também perceber o arquivo sendo recriado ou renomeado.
+            directory = os.fsencode(str(Path(path).resolve().parent))
+            if libc.inotify_add_watch(fd, directory, INOTIFY_MASK) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            return None
+        return cls(fd, os.fsencode(Path(path).name))
+
+    def wait(self, timeout):
+        """Bloqueia até um evento envolvendo o arquivo ou até o timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return False
+            if self._drain():
+                return True
+
+    def _drain(self):
+        """Consome os eventos pendentes e indica se algum deles é do arquivo observado."""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                _, _, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset:offset + name_length].rstrip(b"\0")
+                offset += name_length
+                if name == self.filename:
+                    relevant = True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class LogFollower:
+    """
+    'tail -f' orientado a eventos para o Power.log.
+
+    Lê blocos grandes em um buffer reaproveitado e separa as linhas com
+    `bytes.split`, sem uma syscall por linha. Espera por novos dados com
+    inotify quando disponível e, senão, com polling. Detecta o arquivo sendo
+    truncado ou recriado (inode diferente) e o reabre do início, avisando
+    `on_rotate`. `on_idle` é chamado sempre que o follow alcança o fim do
+    arquivo, antes de esperar por dados novos.
+    """
+    def __init__(self, log_path, offset=None, on_rotate=None, chunk_size=CHUNK_SIZE,
+                 poll_interval=POLL_INTERVAL, use_inotify=True, metrics=None, on_idle=None):
+        self.log_path = Path(log_path)
+        self.on_rotate = on_rotate
+        self.on_idle = on_idle
+        self.metrics = metrics  # metrics.Metrics opcional: etapa "read" e bytes lidos
+        self.poll_interval = poll_interval
+        self._buffer = bytearray(chunk_size)
+        self._view = memoryview(self._buffer)
+        self._pending = bytearray()
+        self._file = None
+        self._inode = None
+        self.offset = 0  # Offset em bytes do fim da última linha entregue
+        self._open(offset)
+        self._watcher = InotifyWatcher.create(self.log_path) if use_inotify else None
+
+    @property
+    def backend(self):
+        return "inotify" if self._watcher else "polling"
+
+    def backlog(self):
+        """Bytes já escritos no log e ainda não entregues (tamanho do arquivo menos o offset)."""
+        try:
+            return max(0, os.stat(self.log_path).st_size - self.offset)
+        except FileNotFoundError:
+            return 0
+
+    def _open(self, offset=None):
+        """Abre o log (sem buffer do Python) e posiciona no offset, ou no fim se for None."""
+        if self._file:
+            self._file.close()
+        try:
+            self._file = open(self.log_path, "rb", buffering=0)
+        except FileNotFoundError:
+            self._file = None
+            self._inode = None
+            self.offset = 0
+            return
+        stat = os.fstat(self._file.fileno())
+        self._inode = stat.st_ino
+        self.offset = stat.st_size if offset is None else min(offset, stat.st_size)
+        self._file.seek(self.offset)
+        self._pending.clear()
+
+    def _read_chunk(self):
+        """
+        Lê um bloco e retorna os bytes das linhas completas (b"" se só houver
+        uma linha parcial), ou None no fim do arquivo.
+        """
+        if not self._file:
+            return None
+        metrics = self.metrics
+        if metrics:
+            start = time.perf_counter_ns()
+        size = self._file.readinto(self._view)
+        if not size:
+            return None
+        pending = self._pending
+        pending += self._view[:size]
+        end = pending.rfind(b"\n") + 1
+        if not end:
+            return b""
+        chunk = bytes(pending[:end])
+        del pending[:end]
+        self.offset += len(chunk)
+        if metrics:
+            metrics.observe("read", time.perf_counter_ns() - start)
+            metrics.count("bytes_read", len(chunk))
+        return chunk
+
+    def _read_lines(self):
+        """Como `_read_chunk`, mas retorna a lista de linhas decodificadas."""
+        chunk = self._read_chunk()
+        if chunk is None:
+            return None
+        return split_lines(chunk)
+
+    def _check_rotation(self):
+        """Reabre o log se ele foi recriado, removido ou truncado. Retorna True se reabriu."""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return False
+        if stat.st_ino == self._inode and stat.st_size >= self.offset + len(self._pending):
+            return False
+        self._open(0)
+        if self.on_rotate:
+            self.on_rotate()
+        return True
+
+    def iter_available(self):
+        """Entrega as linhas já escritas no arquivo, sem bloquear."""
+        while True:
+            lines = self._read_lines()
+            if lines is None:
+                return
+            yield from lines
+
+    def iter_available_chunks(self):
+        """Entrega os blocos de bytes (só linhas completas) já escritos no arquivo, sem bloquear."""
+        while True:
+            chunk = self._read_chunk()
+            if chunk is None:
+                return
+            if chunk:
+                yield chunk
+
+    def poll_chunks(self):
+        """Blocos já escritos, sem esperar (para loops assíncronos); sem dados, verifica se o log foi recriado."""
+        chunks = list(self.iter_available_chunks())
+        if not chunks and self._check_rotation():
+            chunks = list(self.iter_available_chunks())
+        return chunks
+
+    def follow(self):
+        """Gerador infinito de linhas novas, esperando por eventos do sistema de arquivos."""
+        return self._follow(self.iter_available)
+
+    def follow_chunks(self):
+        """Gerador infinito de blocos de bytes novos, para os scanners que trabalham sobre bytes."""
+        return self._follow(self.iter_available_chunks)
+
+    def _follow(self, iter_available):
+        while True:
+            yielded = False
+            for item in iter_available():
+                yielded = True
+                yield item
+            if yielded:
+                continue
+            if self._check_rotation():
+                continue
+            if self.on_idle:
+                self.on_idle()
+            if self._watcher:
+                self._watcher.wait(SAFETY_TIMEOUT)
+            else:
+                time.sleep(self.poll_interval)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+        if self._watcher:
+            self._watcher.close()
+
+
+def measure_latency(use_inotify, samples=200, interval=0.005):
+    """Mede a latência entre a escrita de uma linha e sua entrega pelo follower."""
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = Path(directory) / "Power.log"
+        log_path.touch()
+        follower = LogFollower(log_path, use_inotify=use_inotify)
+
+        def writer():
+            with open(log_path, "a", encoding="utf-8") as f:
+                for _ in range(samples):
+                    f.write(f"D {time.perf_counter():.9f} GameState.DebugPrintPower() - teste\n")
+                    f.flush()
+                    time.sleep(interval)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        latencies = []
+        for line in follower.follow():
+            latencies.append(time.perf_counter() - float(line.split()[1]))
+            if len(latencies) == samples:
+                break
+        thread.join()
+        backend = follower.backend
+        follower.close()
+
+    latencies.sort()
+    return backend, latencies
+
+
+def main():
+    """Compara a latência escrita -> entrega do inotify e do polling."""
+    for use_inotify in (True, False):
+        backend, latencies = measure_latency(use_inotify)
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        print(f"{backend:8s} p50={p50:.3f} ms  p99={p99:.3f} ms  max={latencies[-1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from card_cache import load_card_database
+
+META_DECKS_PATH = "meta_decks2.json"
+DECK_SIZE = 30
+STARTING_HAND = (3, 4)  # Primeiro e segundo jogador
+FRIENDLY_PLAYER_ID = 2  # Como no Power.log de exemplo, o jogador local é o 2
+OPPONENT_PLAYER_ID = 1
+HEROES = [
+    ("HERO_01", "Garrosh Hellscream"), ("HERO_02", "Thrall"), ("HERO_03", "Valeera Sanguinar"),
+    ("HERO_04", "Uther Lightbringer"), ("HERO_05", "Rexxar"), ("HERO_06", "Malfurion Stormrage"),
+    ("HERO_07", "Gul'dan"), ("HERO_08", "Jaina Proudmoore"), ("HERO_09", "Anduin Wrynn"),
+    ("HERO_10", "Illidan Stormrage"),
+]
+EFFECT_SUFFIX = "EffectCardId=System.Collections.Generic.List`1[System.String] EffectIndex=0 Target=0 SubOption=-1"
+
+
+class SyntheticEntity:
+    def __init__(self, entity_id, controller, card_id="", name=""):
+        self.entity_id = entity_id
+        self.controller = controller
+        self.card_id = card_id
+        self.name = name
+        self.zone = "DECK"
+        self.revealed = False
+
+    def descriptor(self):
+        """Entidade no formato `[entityName=... id=... zone=... cardId=... player=...]` do log."""
+        if self.revealed:
+            name, card_id = self.name, self.card_id
+        else:
+            name, card_id = "UNKNOWN ENTITY [cardType=INVALID]", ""
+        return f"[entityName={name} id={self.entity_id} zone={self.zone} zonePos=0 cardId={card_id} player={self.controller}]"
+
+
+class PowerLogWriter:
+    """
+    Escreve blocos no formato do Power.log: cada lista de `GameState.DebugPrintPower`
+    é repetida em seguida como `PowerTaskList.DebugPrintPower`, como faz o cliente.
+    """
+    def __init__(self, f, start_time):
+        self.f = f
+        self.now = start_time
+        self.task_list_id = 0
+        self.lines = 0
+        self._pending = []
+
+    def _timestamp(self):
+        return self.now.strftime("%H:%M:%S.%f") + "0"
+
+    def _write(self, text):
+        self.f.write(f"D {self._timestamp()} {text}\n")
+        self.lines += 1
+
+    def power(self, depth, text, task_list_text=None):
+        """Linha de GameState.DebugPrintPower; `task_list_text` substitui o texto no espelho."""
+        self._pending.append((depth, text, text if task_list_text is None else task_list_text))
+
+    def game_meta(self, text):
+        self._write(f"GameState.DebugPrintGame() - {text}")
+
+    def flush(self, seconds=1.0):
+        """Emite a lista de GameState pendente e o seu espelho em PowerTaskList."""
+        if not self._pending:
+            return
+        self._write(f"GameState.DebugPrintPowerList() - Count={len(self._pending)}")
+        for depth, text, _ in self._pending:
+            self._write(f"GameState.DebugPrintPower() - {'    ' * depth}{text}")
+        self.task_list_id += 1
+        self._write(f"PowerTaskList.DebugDump() - ID={self.task_list_id} ParentID=0 PreviousID=0 TaskCount={len(self._pending)}")
+        for depth, _, text in self._pending:
+            self._write(f"PowerTaskList.DebugPrintPower() - {'    ' * (depth + 1)}{text}")
+        self._write("PowerTaskList.DebugDump() - Block End=(null)")
+        self._write(f"PowerProcessor.EndCurrentTaskList() - m_currentTaskList={self.task_list_id}")
+        self._pending = []
+        self.now += timedelta(seconds=seconds)
+
+
+def _card_tags(entity, zone):
+    """Tags típicas de uma carta revelada; a maior parte do log é este tipo de linha."""
+    cost = entity.entity_id % 10
+    return [
+        ("CONTROLLER", entity.controller), ("CARDTYPE", "MINION"), ("TAG_LAST_KNOWN_COST_IN_HAND", cost),
+        ("COST", cost), ("ATK", cost), ("HEALTH", cost + 1), ("ZONE", zone),
+        ("ENTITY_ID", entity.entity_id), ("RARITY", "COMMON"), ("478", 1), ("1037", 0),
+        ("1043", 1), ("1068", 0), ("SPAWN_TIME_COUNT", 1), ("HAS_ACTIVATE_POWER", 1),
+    ]
+
+
+class SyntheticGame:
+    """Uma partida sintética entre o jogador local e o oponente, com decks de `meta_decks2.json`."""
+    def __init__(self, writer, rng, friendly_deck, opponent_deck, first_entity_id=4):
+        self.writer = writer
+        self.rng = rng
+        self.entities = []
+        self.decks = {}
+        self.hands = {FRIENDLY_PLAYER_ID: [], OPPONENT_PLAYER_ID: []}
+        self.just_played = []
+        self.opponent_plays = []
+        next_id = first_entity_id
+        for player_id, cards in ((OPPONENT_PLAYER_ID, opponent_deck), (FRIENDLY_PLAYER_ID, friendly_deck)):
+            deck = []
+            for card_id, name in cards:
+                deck.append(SyntheticEntity(next_id, player_id, card_id, name))
+                next_id += 1
+            rng.shuffle(deck)
+            self.decks[player_id] = deck
+            self.entities.extend(deck)
+        self.heroes = {}
+        for player_id in (OPPONENT_PLAYER_ID, FRIENDLY_PLAYER_ID):
+            card_id, name = rng.choice(HEROES)
+            hero = SyntheticEntity(next_id, player_id, card_id, name)
+            hero.zone, hero.revealed = "PLAY", True
+            self.heroes[player_id] = hero
+            next_id += 1
+
+    def write(self, turns, cards_per_turn):
+        self._create_game()
+        for player_id, count in zip((OPPONENT_PLAYER_ID, FRIENDLY_PLAYER_ID), STARTING_HAND):
+            for _ in range(count):
+                self._draw(player_id, depth=0)
+        self.writer.flush()
+        for turn in range(1, turns + 1):
+            self._turn(turn, OPPONENT_PLAYER_ID if turn % 2 else FRIENDLY_PLAYER_ID, cards_per_turn)
+        self._game_over()
+
+    def _create_game(self):
+        w = self.writer
+        w.power(0, "CREATE_GAME")
+        w.power(1, "GameEntity EntityID=1")
+        for tag, value in (("CARDTYPE", "GAME"), ("ZONE", "PLAY"), ("ENTITY_ID", 1)):
+            w.power(2, f"tag={tag} value={value}")
+        for player_id in (OPPONENT_PLAYER_ID, FRIENDLY_PLAYER_ID):
+            entity_id = player_id + 1
+            lo = self.rng.randrange(10_000_000, 99_999_999)
+            w.power(1, f"Player EntityID={entity_id} PlayerID={player_id} GameAccountId=[hi=144115193835963207 lo={lo}]")
+            for tag, value in (("CONTROLLER", player_id), ("CARDTYPE", "PLAYER"), ("PLAYER_ID", player_id),
+                               ("HERO_ENTITY", self.heroes[player_id].entity_id), ("MAXHANDSIZE", 10),
+                               ("TEAM_ID", player_id), ("ZONE", "PLAY"), ("ENTITY_ID", entity_id)):
+                w.power(2, f"tag={tag} value={value}")
+        for entity in self.entities:
+            w.power(0, f"FULL_ENTITY - Creating ID={entity.entity_id} CardID=",
+                    f"FULL_ENTITY - Updating {entity.descriptor()} CardID=")
+            for tag, value in (("ZONE", "DECK"), ("CONTROLLER", entity.controller), ("ENTITY_ID", entity.entity_id)):
+                w.power(1, f"tag={tag} value={value}")
+        for hero in self.heroes.values():
+            w.power(0, f"FULL_ENTITY - Creating ID={hero.entity_id} CardID={hero.card_id}",
+                    f"FULL_ENTITY - Updating {hero.descriptor()} CardID={hero.card_id}")
+            for tag, value in (("CONTROLLER", hero.controller), ("CARDTYPE", "HERO"), ("HEALTH", 30),
+                               ("ZONE", "PLAY"), ("ENTITY_ID", hero.entity_id)):
+                w.power(1, f"tag={tag} value={value}")
+        w.power(0, "TAG_CHANGE Entity=GameEntity tag=STATE value=RUNNING ")
+        for player_id in (OPPONENT_PLAYER_ID, FRIENDLY_PLAYER_ID):
+            w.power(0, f"TAG_CHANGE Entity={player_id + 1} tag=PLAYSTATE value=PLAYING ")
+        w.flush()
+        w.game_meta("GameType=GT_RANKED")
+        w.game_meta("FormatType=FT_STANDARD")
+
+    def _draw(self, player_id, depth):
+        deck = self.decks[player_id]
+        if not deck:
+            return
+        entity = deck.pop()
+        if player_id == FRIENDLY_PLAYER_ID:
+            # As cartas do jogador local são reveladas ao serem compradas
+            self.writer.power(depth, f"SHOW_ENTITY - Updating Entity={entity.descriptor()} CardID={entity.card_id}")
+            entity.revealed = True
+            for tag, value in _card_tags(entity, "HAND"):
+                self.writer.power(depth + 1, f"tag={tag} value={value}")
+        else:
+            self.writer.power(depth, f"TAG_CHANGE Entity={entity.descriptor()} tag=ZONE value=HAND ")
+        entity.zone = "HAND"
+        self.hands[player_id].append(entity)
+
+    def _turn(self, turn, player_id, cards_per_turn):
+        w = self.writer
+        w.power(0, f"BLOCK_START BlockType=TRIGGER Entity=GameEntity {EFFECT_SUFFIX} TriggerKeyword=TAG_NOT_SET")
+        w.power(1, f"TAG_CHANGE Entity=GameEntity tag=TURN value={turn} ")
+        w.power(1, f"TAG_CHANGE Entity={player_id + 1} tag=RESOURCES value={min(10, (turn + 1) // 2)} ")
+        self._draw(player_id, depth=1)
+        w.power(0, "BLOCK_END")
+        for entity in self.just_played:
+            w.power(0, f"TAG_CHANGE Entity={entity.descriptor()} tag=JUST_PLAYED value=0 ")
+        self.just_played = []
+        w.flush()
+
+        hand = self.hands[player_id]
+        for played in range(1, cards_per_turn + 1):
+            if not hand:
+                break
+            entity = hand.pop(self.rng.randrange(len(hand)))
+            w.power(0, f"BLOCK_START BlockType=PLAY Entity={entity.descriptor()} {EFFECT_SUFFIX}")
+            w.power(1, f"TAG_CHANGE Entity={player_id + 1} tag=NUM_CARDS_PLAYED_THIS_TURN value={played} ")
+            if player_id == OPPONENT_PLAYER_ID:
+                # Cartas do oponente são reveladas já na zona PLAY
+                w.power(1, f"SHOW_ENTITY - Updating Entity={entity.descriptor()} CardID={entity.card_id}")
+                entity.revealed = True
+                for tag, value in _card_tags(entity, "PLAY") + [("JUST_PLAYED", 1)]:
+                    w.power(2, f"tag={tag} value={value}")
+                self.opponent_plays.append(entity.card_id)
+            else:
+                w.power(1, f"TAG_CHANGE Entity={entity.descriptor()} tag=ZONE value=PLAY ")
+                w.power(1, f"TAG_CHANGE Entity={entity.descriptor()} tag=JUST_PLAYED value=1 ")
+            entity.zone = "PLAY"
+            w.power(1, f"TAG_CHANGE Entity={entity.descriptor()} tag=EXHAUSTED value=1 ")
+            w.power(0, "BLOCK_END")
+            self.just_played.append(entity)
+            w.flush(seconds=self.rng.uniform(2, 10))
+
+    def _game_over(self):
+        w = self.writer
+        w.power(0, "TAG_CHANGE Entity=GameEntity tag=STEP value=FINAL_GAMEOVER ")
+        winner = self.rng.choice((OPPONENT_PLAYER_ID, FRIENDLY_PLAYER_ID))
+        for player_id in (OPPONENT_PLAYER_ID, FRIENDLY_PLAYER_ID):
+            result = "WON" if player_id == winner else "LOST"
+            w.power(0, f"TAG_CHANGE Entity={player_id + 1} tag=PLAYSTATE value={result} ")
+        w.power(0, "TAG_CHANGE Entity=GameEntity tag=STATE value=COMPLETE ")
+        w.flush(seconds=30)
+
+
+def load_deck_lists(decks_path, cards):
+    """Converte as listas de dbfIds em listas de 30 cartas (cardId, nome) conhecidas pelo banco de cartas."""
+    with open(decks_path, "r", encoding="utf-8") as f:
+        meta_decks = json.load(f)
+    deck_lists = []
+    for deck in meta_decks:
+        known = [
+            (cards.dbf_id_to_card_id[dbf_id], cards.dbf_id_to_name[dbf_id])
+            for dbf_id in deck.get("card_ids", []) if dbf_id in cards.dbf_id_to_card_id
+        ]
+        if known:
+            # As listas só trazem cartas distintas; completa o deck com cópias
+            deck_lists.append((deck.get("archetype"), (known * DECK_SIZE)[:DECK_SIZE]))
+    return deck_lists
+
+
+def generate_log(output_path, games=1, turns=12, cards_per_turn=2, decks_path=META_DECKS_PATH, seed=0, cards=None):
+    """
+    Gera um Power.log sintético.
+
+    Returns:
+        dict: Linhas escritas e, para cada partida, o arquétipo do oponente e os cardIds que ele jogou.
+    """
+    rng = random.Random(seed)
+    if cards is None:
+        cards, _ = load_card_database()
+    deck_lists = load_deck_lists(decks_path, cards)
+    summary = {"lines": 0, "games": []}
+    with open(output_path, "w", encoding="utf-8") as f:
+        writer = PowerLogWriter(f, datetime(2024, 1, 1, 12, 0, 0))
+        for _ in range(games):
+            (opponent_archetype, opponent_deck), (_, friendly_deck) = rng.sample(deck_lists, 2)
+            game = SyntheticGame(writer, rng, friendly_deck, opponent_deck)
+            game.write(turns, cards_per_turn)
+            summary["games"].append({"opponent_archetype": opponent_archetype, "opponent_plays": game.opponent_plays})
+        summary["lines"] = writer.lines
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um Power.log sintético para testes de desempenho.")
+    parser.add_argument("output", help="Arquivo de saída")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--cards-per-turn", type=int, default=2)
+    parser.add_argument("--decks", default=META_DECKS_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = generate_log(args.output, args.games, args.turns, args.cards_per_turn, args.decks, args.seed)
+    plays = sum(len(game["opponent_plays"]) for game in summary["games"])
+    print(f"{summary['lines']} linhas, {args.games} partida(s), {plays} cartas jogadas pelo oponente em '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import bisect
+import json
+import mmap
+import os
+import sys
+from pathlib import Path
+
+# Linha que abre uma partida no Power.log e a linha de lista que costuma precedê-la.
+CREATE_GAME_MARKER = b"GameState.DebugPrintPower() - CREATE_GAME"
+POWER_LIST_MARKER = b"DebugPrintPowerList()"
+INDEX_SUFFIX = ".games.json"
+FINGERPRINT_SIZE = 128  # Bytes iniciais do log usados para detectar um arquivo recriado
+
+
+def find_game_offsets(data, start=0, end=None):
+    """
+    Varre um buffer de bytes (ou mmap) e retorna o offset do início de cada partida.
+
+    A partida começa na linha `DebugPrintPowerList()` imediatamente anterior ao
+    `CREATE_GAME` quando ela existe, senão na própria linha do `CREATE_GAME`.
+    """
+    if end is None:
+        end = len(data)
+    offsets = []
+    position = data.find(CREATE_GAME_MARKER, start, end)
+    while position != -1:
+        line_start = data.rfind(b"\n", 0, position) + 1
+        previous_line_start = data.rfind(b"\n", 0, max(line_start - 1, 0)) + 1
+        if line_start > 0 and data.find(POWER_LIST_MARKER, previous_line_start, line_start) != -1:
+            line_start = previous_line_start
+        offsets.append(line_start)
+        position = data.find(CREATE_GAME_MARKER, position + len(CREATE_GAME_MARKER), end)
+    return offsets
+
+
+class GameOffsetIndex:
+    """
+    Índice lateral (`Power.log.games.json`) com o offset em bytes de cada partida do log.
+
+    O índice guarda até onde o arquivo já foi varrido; `update()` varre apenas
+    os bytes acrescentados desde então. Se o log foi truncado ou recriado
+    (inode, tamanho ou bytes iniciais diferentes) o índice é refeito do zero.
+    """
+    def __init__(self, log_path, index_path=None):
+        self.log_path = Path(log_path)
+        self.index_path = Path(index_path) if index_path else Path(f"{log_path}{INDEX_SUFFIX}")
+        self.offsets = []
+        self.scanned_size = 0
+        self.inode = None
+        self.fingerprint = ""
+        self._load()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _load(self):
+        """Carrega o índice salvo, se existir e for legível."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.offsets = [int(offset) for offset in saved["offsets"]]
+            self.scanned_size = int(saved["scanned_size"])
+            self.inode = saved["inode"]
+            self.fingerprint = saved["fingerprint"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+
+    def _reset(self):
+        self.offsets = []
+        self.scanned_size = 0
+        self.inode = None
+        self.fingerprint = ""
+
+    def save(self):
+        """Grava o índice ao lado do log. Falhas de escrita apenas geram um aviso."""
+        data = {
+            "inode": self.inode,
+            "fingerprint": self.fingerprint,
+            "scanned_size": self.scanned_size,
+            "offsets": self.offsets,
+        }
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"AVISO: Não foi possível gravar o índice de partidas '{self.index_path}'. {e}")
+
+    def update(self):
+        """Varre os bytes novos do log e retorna os offsets das partidas encontradas."""
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            self._reset()
+            return []
+
+        with open(self.log_path, "rb") as f:
+            fingerprint = f.read(FINGERPRINT_SIZE).hex()
+            if (stat.st_ino != self.inode or stat.st_size < self.scanned_size
+                    or not fingerprint.startswith(self.fingerprint)):
+                self._reset()
+            self.inode = stat.st_ino
+            self.fingerprint = fingerprint
+            if stat.st_size == 0 or stat.st_size == self.scanned_size:
+                return []
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # Só varre linhas completas; a última linha parcial fica para a próxima chamada.
+                end = data.rfind(b"\n", self.scanned_size) + 1
+                if end <= self.scanned_size:
+                    return []
+                new_offsets = find_game_offsets(data, self.scanned_size, end)
+        self.offsets.extend(new_offsets)
+        self.scanned_size = end
+        return new_offsets
+
+    def current_game_offset(self):
+        """Offset do início da partida mais recente (0 se o log não tiver partidas)."""
+        return self.offsets[-1] if self.offsets else 0
+
+    def game_offset_before(self, offset):
+        """Offset do início da última partida que começa antes de `offset` (0 se nenhuma)."""
+        position = bisect.bisect_left(self.offsets, offset)
+        return self.offsets[position - 1] if position else 0
+
+    def game_range(self, game_number):
+        """Intervalo [início, fim) em bytes da partida informada (índice de lista, aceita negativos)."""
+        start = self.offsets[game_number]
+        next_number = game_number + 1 if game_number >= 0 else len(self.offsets) + game_number + 1
+        end = self.offsets[next_number] if next_number < len(self.offsets) else self.scanned_size
+        return start, end
+
+    def read_game(self, game_number):
+        """Retorna as linhas (str) de uma partida passada, para análise offline."""
+        start, end = self.game_range(game_number)
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return data.decode("utf-8", errors="replace").splitlines(keepends=True)
+
+
+def load_game_index(log_path):
+    """Abre o índice lateral do log, atualiza-o com os bytes novos e o salva."""
+    index = GameOffsetIndex(log_path)
+    index.update()
+    index.save()
+    return index
+
+
+def main():
+    log_path = sys.argv[1] if len(sys.argv) > 1 else "./Power.log"
+    index = load_game_index(log_path)
+    print(f"{len(index)} partida(s) em '{log_path}':")
+    for game_number in range(len(index)):
+        start, end = index.game_range(game_number)
+        print(f"  #{game_number}: bytes {start}-{end}")
+
+
+if __name__ == "__main__":
+    main()
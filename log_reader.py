@@ -1,7 +1,12 @@
 import re
 import sys
-from pathlib import Path
 import time
+from pathlib import Path
+
+import event_bus
+import metrics as stats
+from log_follower import LogFollower
+from log_index import load_game_index
 
 # Regex para identificar uma carta sendo jogada da mão.
 # Captura o nome da entidade, ID da carta e ID do jogador.
@@ -15,6 +20,22 @@ CARD_PLAY_REGEX = re.compile(r"PowerTaskList.+ Entity=\[(?:entityName)=(.*) id=\
 # Lida com "name=" e "entityName=".
 PLAYER_NAME_REGEX = re.compile(r"\[(?:entityName|name)=(.*) id=\d+ zone=PLAY.*cardId=HERO_.*player=(\d+)\]")
 
+# --- Scanner rápido sobre bytes ---
+# Quase todas as linhas do log são "tag=... value=...". O prefiltro literal acha
+# as poucas linhas candidatas direto no bloco de bytes, e só nelas são aplicadas
+# as versões ancoradas (no início da linha) das regexes acima. O prefixo
+# preguiçoso `[^\n]*?` faz o `match` ancorado capturar exatamente o mesmo que o
+# `search` original.
+USE_FAST_SCANNER = True
+HERO_LITERAL = b"cardId=HERO_"
+JUST_PLAYED_LITERAL = b"tag=JUST_PLAYED"
+FAST_CARD_PLAY = re.compile(rb"[^\n]*?PowerTaskList.+ Entity=\[(?:entityName)=(.*) id=\d+ zone=PLAY.*cardId=(.*) player=(\d+)\] tag=JUST_PLAYED")
+FAST_PLAYER_NAME = re.compile(rb"[^\n]*?\[(?:entityName|name)=(.*) id=\d+ zone=PLAY.*cardId=HERO_.*player=(\d+)\]")
+
+# Eventos: ("hero", player_id, nome) e ("card", player_id, nome, card_id)
+EVENT_HERO = "hero"
+EVENT_CARD = "card"
+
 
 def get_log_path():
     """
@@ -45,20 +66,65 @@ def get_log_path():
         return None
 
 
-def follow(thefile):
-    """'tail -f' em Python."""
-    thefile.seek(0, 2)  # Vai para o final do arquivo
-    while True:
-        line = thefile.readline()
-        if not line:
-            time.sleep(0.1)
-            continue
-        yield line
+def regex_events(line):
+    """Eventos de uma linha (str) pelo caminho original, com as duas regexes."""
+    events = []
+    match = PLAYER_NAME_REGEX.search(line)
+    if match:
+        events.append((EVENT_HERO, match.group(2), match.group(1)))
+    match = CARD_PLAY_REGEX.search(line)
+    if match:
+        events.append((EVENT_CARD, match.group(3), match.group(1), match.group(2)))
+    return events
+
+
+def scan_events(chunk):
+    """
+    Eventos de um bloco de bytes com linhas completas, em uma única passada.
+
+    Produz os mesmos eventos, na mesma ordem, que `regex_events` aplicado linha a linha.
+    """
+    # Prefiltro: bytes.find para cada literal (bem mais rápido que uma alternância em regex)
+    line_starts = set()
+    for literal in (HERO_LITERAL, JUST_PLAYED_LITERAL):
+        position = chunk.find(literal)
+        while position != -1:
+            line_starts.add(chunk.rfind(b"\n", 0, position) + 1)
+            position = chunk.find(literal, position + len(literal))
+
+    events = []
+    for start in sorted(line_starts):
+        end = chunk.find(b"\n", start)
+        if end == -1:
+            end = len(chunk)
+
+        if chunk.find(HERO_LITERAL, start, end) != -1:
+            match = FAST_PLAYER_NAME.match(chunk, start, end)
+            if match:
+                events.append((EVENT_HERO, match.group(2).decode(), match.group(1).decode("utf-8", errors="replace")))
+        if chunk.find(JUST_PLAYED_LITERAL, start, end) != -1:
+            match = FAST_CARD_PLAY.match(chunk, start, end)
+            if match:
+                events.append((
+                    EVENT_CARD,
+                    match.group(3).decode(),
+                    match.group(1).decode("utf-8", errors="replace"),
+                    match.group(2).decode("utf-8", errors="replace"),
+                ))
+    return events
 
 
-def parse_log(log_path):
+def parse_log(log_path, fast_scan=USE_FAST_SCANNER, follow=True, start_offset=None, metrics=None, events=None):
     """
     Analisa o arquivo de log do Hearthstone em tempo real, focando no oponente.
+
+    Por padrão começa na partida atual (`start_offset=None`). Com `follow=False`
+    apenas processa o que já existe no arquivo e retorna. Com um `metrics.Metrics`,
+    registra o tempo das etapas "read", "scan" e "output", os contadores de
+    linhas e eventos e o backlog do arquivo.
+
+    O oponente e as cartas jogadas vão para o `events` (event_bus.EventBus);
+    sem um bus, é criado um que escreve no console.
     """
     opponent_player_id = "1"  # Oponente é sempre o jogador 2
     opponent_name = None
@@ -66,43 +132,119 @@ def parse_log(log_path):
     print(f"Monitorando o arquivo de log: {log_path}")
     print(f"Oponente é considerado o Jogador {opponent_player_id}.")
     print("-" * 20)
+    if events is None:
+        events = event_bus.EventBus([event_bus.ConsoleSink()])
 
-    with open(log_path, "r", encoding="utf-8") as f:
-        
-        def process_line(line):
-            nonlocal opponent_name
+    def process_event(event):
+        nonlocal opponent_name
+        if metrics:
+            metrics.count("events")
+        if event[0] == EVENT_HERO:
             # Procura por nome de jogador caso ainda não tenha sido encontrado
-            if not opponent_name:
-                match = PLAYER_NAME_REGEX.search(line)
-                if match:
-                    player_name_match = match.group(1)
-                    player_id_match = match.group(2)
-                    if player_id_match == opponent_player_id:
-                        opponent_name = player_name_match
-                        print(f"Oponente encontrado: {opponent_name}")
-                        print("-" * 20)
-
-            # Procura por cartas jogadas pelo oponente
-            match = CARD_PLAY_REGEX.search(line)
-            if match:
-                player_id_match = match.group(3)
-                if player_id_match == opponent_player_id:
-                    card_name = match.group(1)
-                    card_id = match.group(2)
-                    print(f"Oponente jogou: {card_name} (ID: {card_id})")
+            _, player_id, player_name = event
+            if not opponent_name and player_id == opponent_player_id:
+                opponent_name = player_name
+                events.emit(event_bus.GAME_START, opponent=opponent_name)
+        else:
+            # Cartas jogadas pelo oponente
+            _, player_id, card_name, card_id = event
+            if player_id == opponent_player_id:
+                events.emit(event_bus.CARD_PLAYED, name=card_name, card_id=card_id)
+
+    def process_line(line):
+        if not metrics:
+            for event in regex_events(line):
+                process_event(event)
+            return
+        start = time.perf_counter_ns()
+        found = regex_events(line)
+        middle = time.perf_counter_ns()
+        for event in found:
+            process_event(event)
+        metrics.observe("scan", middle - start)
+        if found:
+            metrics.observe("output", time.perf_counter_ns() - middle)
+        metrics.count("lines")
 
-        # Processa o arquivo desde o início
-        for line in f:
-            process_line(line)
+    def process_chunk(chunk):
+        if not metrics:
+            for event in scan_events(chunk):
+                process_event(event)
+            return
+        start = time.perf_counter_ns()
+        found = scan_events(chunk)
+        middle = time.perf_counter_ns()
+        for event in found:
+            process_event(event)
+        metrics.observe("scan", middle - start)
+        if found:
+            metrics.observe("output", time.perf_counter_ns() - middle)
+        metrics.count("lines", chunk.count(b"\n"))
+
+    def on_rotate():
+        nonlocal opponent_name
+        events.flush()
+        print("\nPower.log recriado ou truncado. Reiniciando a leitura.")
+        opponent_name = None
+
+    # Processa o arquivo a partir do início da partida atual
+    if start_offset is None:
+        start_offset = load_game_index(log_path).current_game_offset()
+    follower = LogFollower(log_path, offset=start_offset, on_rotate=on_rotate, metrics=metrics)
+    if metrics:
+        metrics.gauge("backlog_bytes", follower.backlog)
+    if fast_scan:
+        available, follow_new, process = follower.iter_available_chunks, follower.follow_chunks, process_chunk
+    else:
+        available, follow_new, process = follower.iter_available, follower.follow, process_line
+    try:
+        for item in available():
+            process(item)
+        if not follow:
+            return
 
         # Agora, monitora em tempo real
+        events.flush()
         print("\nMonitorando novas cartas jogadas pelo oponente...")
-        for line in follow(f):
-            process_line(line)
+        for item in follow_new():
+            process(item)
+    finally:
+        follower.close()
+        events.flush()
+
+
+def compare_scanners(log_path, repeat=20):
+    """Confere que os dois caminhos geram os mesmos eventos e compara a vazão em linhas/s."""
+    with open(log_path, "rb") as f:
+        data = f.read()
+    if not data.endswith(b"\n"):
+        data += b"\n"
+    line_count = data.count(b"\n")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        regex_result = [event for line in data.decode("utf-8", errors="replace").splitlines(keepends=True)
+                        for event in regex_events(line)]
+    regex_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fast_result = scan_events(data)
+    fast_time = (time.perf_counter() - start) / repeat
+
+    print(f"{line_count} linhas, {len(fast_result)} eventos em '{log_path}'")
+    print(f"  regex por linha: {line_count / regex_time:,.0f} linhas/s")
+    print(f"  scanner de bytes: {line_count / fast_time:,.0f} linhas/s ({regex_time / fast_time:.1f}x)")
+    print(f"  eventos idênticos: {regex_result == fast_result}")
+    return regex_result == fast_result
+
 
+def main(log_path=None, fast_scan=USE_FAST_SCANNER):
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        equal = compare_scanners(sys.argv[2] if len(sys.argv) > 2 else "./Power.log")
+        sys.exit(0 if equal else 1)
 
-def main():
-    log_path = get_log_path()
+    log_path = Path(log_path) if log_path else get_log_path()
     if not log_path or not log_path.exists():
         # Se não encontrar, cria um arquivo vazio para não dar erro.
         print("Power.log não encontrado. Criando um arquivo vazio.")
@@ -110,12 +252,18 @@ def main():
         log_path = Path("./Power.log")
         log_path.touch()
 
+    metrics, stats_writer = stats.start_from_env()
+    events = event_bus.from_env()
     try:
-        parse_log(log_path)
+        parse_log(log_path, fast_scan=fast_scan, metrics=metrics, events=events)
     except KeyboardInterrupt:
         print("\nMonitoramento interrompido.")
     except Exception as e:
         print(f"\nOcorreu um erro: {e}")
+    finally:
+        events.close()
+        if stats_writer:
+            stats_writer.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+import csv
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+
+MATCHUPS_CSV_PATH = "hsguru_matchups.csv"
+POPULARITY_CSV_PATH = "hsguru_popularity.csv"
+META_DATA_PATH = "meta_data.json"
+MATRIX_STORE_PATH = "hsguru_matchups.npy"  # Matriz float32; nomes e popularidade em <store>.json
+REFRESH_COMMAND = "python refresh_hsguru.py matchups"
+
+
+def _parse_float(text):
+    try:
+        return float(text.replace("%", ""))
+    except ValueError:
+        return np.nan
+
+
+def _popularity_from_meta_data(names, meta_data_path):
+    """Popularidade (%) de cada nome segundo o meta_data.json ("1.7% (2598)"), NaN se ausente."""
+    try:
+        with open(meta_data_path, "r", encoding="utf-8") as f:
+            meta = {entry["archetype"]: _parse_float(entry["popularity"].split()[0]) for entry in json.load(f)}
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        meta = {}
+    return [meta.get(name, np.nan) for name in names]
+
+
+def read_matchups_csv(csv_path=MATCHUPS_CSV_PATH, popularity_path=POPULARITY_CSV_PATH, meta_data_path=META_DATA_PATH):
+    """
+    Lê o CSV de matchups e devolve (nomes, matriz float32 quadrada, popularidade float32).
+
+    `matriz[i, j]` é o winrate (%) de `nomes[i]` contra `nomes[j]`, NaN quando o
+    HSGuru não tem dados. Os nomes são a união das colunas e das linhas. A
+    popularidade vem do CSV separado gravado pelo scraper ou, na falta dele, do
+    meta_data.json.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if any(label in name for name in header for label in ("Archetype", "Popularity")):
+            raise ValueError(
+                f"'{csv_path}' está no formato antigo (popularidade misturada ao cabeçalho e linhas sem "
+                f"o nome do deck). Gere-o de novo com scrape_matchups_hsguru.py ou refresh_hsguru.py."
+            )
+        columns = header[1:]
+        rows = [(row[0], row[1:]) for row in reader if row]
+
+    known_columns = set(columns)
+    names = list(columns) + [name for name, _ in rows if name not in known_columns]
+    index = {name: i for i, name in enumerate(names)}
+    winrates = np.full((len(names), len(names)), np.nan, dtype=np.float32)
+    column_indices = [index[name] for name in columns]
+    for name, values in rows:
+        winrates[index[name], column_indices[:len(values)]] = [_parse_float(value) for value in values[:len(columns)]]
+
+    popularity = [np.nan] * len(names)
+    try:
+        with open(popularity_path, newline="", encoding="utf-8") as f:
+            for name, value in list(csv.reader(f))[1:]:
+                if name in index:
+                    popularity[index[name]] = _parse_float(value)
+    except FileNotFoundError:
+        popularity = _popularity_from_meta_data(names, meta_data_path)
+    return names, winrates, np.array(popularity, dtype=np.float32)
+
+
+def save_matrix_store(names, winrates, popularity, store_path=MATRIX_STORE_PATH, source_mtime=None):
+    """Grava a matriz em .npy (mapeável com mmap) e os nomes/popularidade em <store>.json."""
+    tmp_path = store_path + ".tmp.npy"
+    np.save(tmp_path, np.ascontiguousarray(winrates, dtype=np.float32))
+    os.replace(tmp_path, store_path)
+    metadata = {
+        "names": names,
+        "popularity": [None if np.isnan(value) else float(value) for value in popularity],
+        "source_mtime": source_mtime,
+    }
+    with open(store_path + ".json", "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False)
+
+
+class MatchupMatrix:
+    """
+    Matriz de matchups com consultas vetorizadas.
+
+    Na construção são pré-calculadas a matriz com NaN -> 0 e a máscara dos
+    matchups conhecidos; assim cada consulta é um produto matriz-vetor (ou uma
+    coluna) seguido de um `argpartition`, na casa dos microssegundos para as
+    ~100 linhas do HSGuru.
+    """
+    def __init__(self, names, winrates, popularity):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.winrates = winrates
+        self.popularity = np.nan_to_num(np.asarray(popularity, dtype=np.float32))
+        known = ~np.isnan(winrates)
+        self._known = known.astype(np.float32)
+        self._filled = np.where(known, winrates, np.float32(0))
+
+    def __len__(self):
+        return len(self.names)
+
+    def field_vector(self, field=None):
+        """Pesos do campo (dict nome -> peso); None = popularidade atual. Normalizado para somar 1."""
+        if field is None:
+            weights = self.popularity.copy()
+        else:
+            weights = np.zeros(len(self.names), dtype=np.float32)
+            for name, weight in field.items():
+                weights[self.index[name]] = weight
+        total = weights.sum()
+        return weights / total if total else weights
+
+    def expected_winrates(self, field=None):
+        """
+        Winrate esperado (%) de cada deck contra o campo, ponderado pela
+        popularidade. Matchups sem dados são ignorados e os pesos restantes
+        renormalizados; decks sem nenhum matchup conhecido ficam NaN.
+        """
+        weights = field if isinstance(field, np.ndarray) else self.field_vector(field)
+        covered = self._known @ weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(covered > 0, (self._filled @ weights) / covered, np.nan)
+
+    def _top(self, scores, n):
+        """Índices dos n maiores valores (NaN por último), em ordem decrescente."""
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+        n = min(n, len(scores))
+        candidates = np.argpartition(-scores, n - 1)[:n]
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.names[i], float(scores[i])) for i in ordered if scores[i] != -np.inf]
+
+    def best_counters(self, archetype, n=5):
+        """Decks com maior winrate contra o arquétipo: lista de (nome, winrate)."""
+        column = self.winrates[:, self.index[archetype]].copy()
+        column[self.index[archetype]] = np.nan
+        return self._top(column, n)
+
+    def top_against(self, field=None, n=5):
+        """Os n decks com maior winrate esperado contra um campo (dict nome -> peso) ou o meta atual."""
+        return self._top(self.expected_winrates(field), n)
+
+
+def load_matchup_matrix(csv_path=MATCHUPS_CSV_PATH, store_path=MATRIX_STORE_PATH,
+                        popularity_path=POPULARITY_CSV_PATH, mmap=True):
+    """
+    Carrega a matriz do .npy (mapeado em memória), reconvertendo o CSV quando
+    ele for mais novo que a cópia binária ou ela não existir. Sem o CSV (o
+    repositório não traz matchups de verdade), levanta FileNotFoundError com o
+    comando que baixa os dados do HSGuru.
+    """
+    try:
+        csv_mtime = os.path.getmtime(csv_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"'{csv_path}' não encontrado. Rode `{REFRESH_COMMAND}` para baixar os matchups "
+                                f"do HSGuru.") from None
+    try:
+        with open(store_path + ".json", "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if metadata.get("source_mtime") != csv_mtime:
+            raise FileNotFoundError
+        winrates = np.load(store_path, mmap_mode="r" if mmap else None)
+    except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        names, winrates, popularity = read_matchups_csv(csv_path, popularity_path)
+        save_matrix_store(names, winrates, popularity, store_path, csv_mtime)
+        return MatchupMatrix(names, winrates, popularity)
+    popularity = [np.nan if value is None else value for value in metadata["popularity"]]
+    return MatchupMatrix(metadata["names"], winrates, popularity)
+
+
+def main():
+    """Mostra os melhores decks contra o meta atual e mede o tempo de cada consulta."""
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else MATCHUPS_CSV_PATH
+    try:
+        matrix = load_matchup_matrix(csv_path)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"ERRO: {e}")
+        sys.exit(1)
+    print(f"Matriz {len(matrix)}x{len(matrix)} carregada.")
+
+    print("\nMelhores decks contra o meta atual (winrate esperado):")
+    for name, winrate in matrix.top_against(n=10):
+        print(f"  {winrate:5.1f}%  {name}")
+
+    most_popular = matrix.names[int(np.argmax(matrix.popularity))]
+    print(f"\nMelhores counters para {most_popular}:")
+    for name, winrate in matrix.best_counters(most_popular):
+        print(f"  {winrate:5.1f}%  {name}")
+
+    field = {name: 1.0 for name in matrix.names[:5]}
+    print("\nTempo por consulta:")
+    for label, query in (("expected_winrates", lambda: matrix.expected_winrates()),
+                         ("best_counters", lambda: matrix.best_counters(most_popular)),
+                         ("top_against (campo)", lambda: matrix.top_against(field))):
+        runs = 2000
+        elapsed = timeit.timeit(query, number=runs) / runs
+        print(f"  {label:22s} {elapsed * 1e6:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import json
+import os
+import sys
+import threading
+import time
+
+STATS_ENV_VAR = "HS_STATS_FILE"  # Caminho do arquivo de estatísticas; ausente = instrumentação desligada
+STATS_INTERVAL = 5.0  # Segundos entre gravações do arquivo de estatísticas
+HISTOGRAM_BUCKETS = 40  # Bucket i conta durações com i bits em ns (< 2**i ns, até ~9 min)
+
+
+class Metrics:
+    """
+    Contadores e histogramas de tempo por etapa do pipeline.
+
+    Os histogramas usam buckets em potências de 2 (o `bit_length` da duração em
+    ns), então registrar uma medida custa uma soma em uma lista. Quem instrumenta
+    guarda `metrics = None` quando desligado e só chama `perf_counter_ns` se
+    houver um objeto, deixando o custo desligado em um teste de `None`.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}  # etapa -> [contagem por bucket]
+        self.totals_ns = {}
+        self.gauges = {}  # nome -> função avaliada só no snapshot
+        self.started = time.time()
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage, elapsed_ns):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = [0] * HISTOGRAM_BUCKETS
+            self.totals_ns[stage] = 0
+        histogram[min(elapsed_ns.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self.totals_ns[stage] += elapsed_ns
+
+    def gauge(self, name, function):
+        """Registra um valor instantâneo (ex.: backlog do log), calculado apenas ao gerar o snapshot."""
+        self.gauges[name] = function
+
+    def _stage_summary(self, histogram, total_ns):
+        count = sum(histogram)
+        summary = {"count": count, "total_ms": total_ns / 1e6, "mean_us": total_ns / count / 1000 if count else None}
+        # Percentis aproximados pelo limite superior do bucket
+        for label, fraction in (("p50_us", 0.50), ("p90_us", 0.90), ("p99_us", 0.99)):
+            threshold = count * fraction
+            cumulative = 0
+            for bucket, bucket_count in enumerate(histogram):
+                cumulative += bucket_count
+                if cumulative >= threshold and count:
+                    summary[label] = (1 << bucket) / 1000
+                    break
+            else:
+                summary[label] = None
+        summary["buckets_us"] = {f"<{(1 << bucket) / 1000:g}": n for bucket, n in enumerate(histogram) if n}
+        return summary
+
+    def snapshot(self):
+        """Retorna um dicionário serializável em JSON com o estado atual das métricas."""
+        # Cópias feitas de uma vez: a thread que grava o arquivo não trava o caminho quente.
+        counters = dict(self.counters)
+        histograms = {stage: list(histogram) for stage, histogram in list(self.histograms.items())}
+        totals = dict(self.totals_ns)
+        gauges = {}
+        for name, function in list(self.gauges.items()):
+            try:
+                gauges[name] = function()
+            except OSError:
+                gauges[name] = None
+        return {
+            "timestamp": time.time(),
+            "uptime_s": time.time() - self.started,
+            "counters": counters,
+            "gauges": gauges,
+            "stages": {stage: self._stage_summary(histogram, totals.get(stage, 0))
+                       for stage, histogram in histograms.items()},
+        }
+
+
+class StatsFileWriter:
+    """Grava periodicamente o snapshot das métricas em um arquivo JSON (substituição atômica)."""
+    def __init__(self, metrics, path, interval=STATS_INTERVAL):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.metrics.snapshot(), f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"AVISO: não foi possível gravar as estatísticas em '{self.path}': {e}")
+
+    def stop(self):
+        """Para a thread e grava um último snapshot."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+
+def start_from_env():
+    """Liga a instrumentação se `HS_STATS_FILE` estiver definido. Retorna (metrics, writer) ou (None, None)."""
+    path = os.environ.get(STATS_ENV_VAR)
+    if not path:
+        return None, None
+    metrics = Metrics()
+    print(f"Métricas de desempenho em '{path}' (a cada {STATS_INTERVAL:g} s).")
+    return metrics, StatsFileWriter(metrics, path).start()
+
+
+def format_snapshot(snapshot):
+    """Tabela legível de um snapshot."""
+    lines = [f"uptime {snapshot['uptime_s']:.0f} s"]
+    for name, value in sorted(snapshot["counters"].items()):
+        lines.append(f"  {name:20s} {value:>14,}")
+    for name, value in sorted(snapshot["gauges"].items()):
+        lines.append(f"  {name:20s} {'-' if value is None else f'{value:,}':>14s}")
+    lines.append(f"  {'etapa':20s} {'n':>10s} {'média µs':>10s} {'p50 µs':>9s} {'p99 µs':>9s} {'total ms':>10s}")
+    for stage, summary in snapshot["stages"].items():
+        lines.append(f"  {stage:20s} {summary['count']:>10,} {summary['mean_us'] or 0:>10.1f} "
+                     f"{summary['p50_us'] or 0:>9.1f} {summary['p99_us'] or 0:>9.1f} {summary['total_ms']:>10.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    """Mostra o arquivo de estatísticas; com --watch, relê a cada intervalo."""
+    args = [arg for arg in sys.argv[1:] if arg != "--watch"]
+    path = args[0] if args else os.environ.get(STATS_ENV_VAR, "tracker_stats.json")
+    while True:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                print(format_snapshot(json.load(f)))
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Não foi possível ler '{path}': {e}")
+        if "--watch" not in sys.argv:
+            return
+        time.sleep(STATS_INTERVAL)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+import aiohttp
+
+from http_cache import CACHE_DIR, CacheMiss, ResponseCache, is_offline, ttl_for
+from scrape_hsguru import parse_meta_decks, save_decks_to_json
+from scrape_matchups_hsguru import parse_matchup_table, save_matchup_table
+from scrape_meta_hsguru import parse_meta_data, save_data_to_json
+
+# --- CONFIGURAÇÃO ---
+HSGURU_BASE_URL = "https://www.hsguru.com"
+DEFAULT_FORMATS = ["1"]  # format=1 é o modo Padrão (Standard)
+DEFAULT_RANKS = [None]  # None = ranking padrão do site (ex.: "legend", "diamond_to_legend")
+MAX_CONCURRENCY = 8  # Requisições simultâneas no total
+PER_HOST_INTERVAL = 0.5  # Segundos mínimos entre o início de duas requisições ao mesmo host
+MAX_RETRIES = 3  # Novas tentativas após a primeira, para erros de rede, 429 e 5xx
+RETRY_BACKOFF = 1.0  # Espera base (s) entre tentativas, dobrada a cada uma
+REQUEST_TIMEOUT = 15
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# source: "rede" (200), "revalidado" (304) ou "cache" (dentro do TTL ou offline)
+FetchResult = namedtuple("FetchResult", "content content_hash source")
+
+# Páginas do HSGuru: caminho, função de parse (roda no pool de processos) e saída padrão
+PAGES = {
+    "decks": ("/decks", parse_meta_decks, "meta_decks.json"),
+    "meta": ("/meta", parse_meta_data, "meta_data.json"),
+    "matchups": ("/matchups", parse_matchup_table, "hsguru_matchups.csv"),
+}
+
+# Fixtures servidas pelo servidor local de testes (caminho -> arquivo), numa porta
+# livre escolhida pelo sistema. hsguru_matchups.html tem os nomes e a popularidade
+# reais dos arquétipos, mas winrates sintéticos (build_sample_page).
+FIXTURE_ROUTES = {
+    "/decks": "hsguru_decks.html",
+    "/meta": "hsguru.html",
+    "/matchups": "hsguru_matchups.html",
+}
+
+
+class HostRateLimiter:
+    """Espaça o início das requisições a cada host em pelo menos `interval` segundos."""
+    def __init__(self, interval=PER_HOST_INTERVAL):
+        self.interval = interval
+        self._next_start = {}
+        self._locks = {}
+
+    async def wait(self, host):
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class HsguruClient:
+    """
+    Cliente HTTP assíncrono compartilhado por todos os scrapers.
+
+    Uma única `aiohttp.ClientSession` reaproveita as conexões (keep-alive), um
+    semáforo limita as requisições simultâneas e o `HostRateLimiter` evita
+    rajadas contra o mesmo host. Erros de rede, 429 e 5xx são tentados de novo
+    com backoff exponencial (respeitando `Retry-After`).
+
+    Com um `http_cache.ResponseCache`, respostas dentro do TTL não vão à rede e
+    as vencidas são revalidadas por ETag/Last-Modified; `offline=True` usa só o
+    cache.
+    """
+    def __init__(self, concurrency=MAX_CONCURRENCY, per_host_interval=PER_HOST_INTERVAL,
+                 retries=MAX_RETRIES, backoff=RETRY_BACKOFF, timeout=REQUEST_TIMEOUT,
+                 cache=None, offline=False, ttl=None):
+        self.cache = cache
+        self.offline = offline
+        self.ttl = ttl  # None = TTL por URL (http_cache.TTL_RULES)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(per_host_interval)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": USER_AGENT},
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+    def _retry_delay(self, attempt, retry_after=None):
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def fetch(self, url):
+        """
+        Retorna um FetchResult com o corpo da URL. Lança aiohttp.ClientError após
+        esgotar as tentativas e CacheMiss se, offline, a URL não estiver no cache.
+        """
+        cache = self.cache
+        entry = cache.lookup(url) if cache else None
+        if entry and (self.offline or cache.is_fresh(entry, ttl_for(url) if self.ttl is None else self.ttl)):
+            return FetchResult(cache.read(url), entry["content_hash"], "cache")
+        if self.offline:
+            raise CacheMiss(f"'{url}' não está no cache (modo offline).")
+        headers = cache.conditional_headers(entry) if entry else {}
+
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            async with self._semaphore:
+                await self.rate_limiter.wait(host)
+                try:
+                    async with self._session.get(url, headers=headers) as response:
+                        if entry and response.status == 304:
+                            cache.revalidated(url)
+                            return FetchResult(cache.read(url), entry["content_hash"], "revalidado")
+                        if response.status not in RETRY_STATUSES or attempt == self.retries:
+                            response.raise_for_status()
+                            body = await response.read()
+                            if cache:
+                                content_hash = cache.store(url, body, response.headers)
+                            else:
+                                content_hash = hashlib.sha256(body).hexdigest()
+                            return FetchResult(body, content_hash, "rede")
+                        retry_after = response.headers.get("Retry-After")
+                        error = f"HTTP {response.status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if isinstance(e, aiohttp.ClientResponseError) or attempt == self.retries:
+                        raise
+                    error = f"{type(e).__name__}: {e}"
+            delay = self._retry_delay(attempt, retry_after)
+            print(f"  AVISO: {url} falhou ({error}). Nova tentativa em {delay:.1f} s.")
+            await asyncio.sleep(delay)
+
+
+def page_url(base_url, path, game_format, rank):
+    params = {"format": game_format}
+    if rank:
+        params["rank"] = rank
+    return f"{base_url}{path}?{urlencode(params)}"
+
+
+def output_path(output_dir, filename, game_format, rank, single_variant):
+    """Arquivo de saída: o nome padrão, ou com formato/ranking no nome quando há várias variantes."""
+    if single_variant:
+        return Path(output_dir) / filename
+    stem, suffix = os.path.splitext(filename)
+    rank_part = f".{rank}" if rank else ""
+    return Path(output_dir) / f"{stem}.format{game_format}{rank_part}{suffix}"
+
+
+def build_jobs(base_url, pages, formats, ranks, output_dir):
+    single_variant = len(formats) == 1 and len(ranks) == 1
+    jobs = []
+    for page in pages:
+        path, _, filename = PAGES[page]
+        for game_format in formats:
+            for rank in ranks:
+                jobs.append((page, page_url(base_url, path, game_format, rank),
+                             output_path(output_dir, filename, game_format, rank, single_variant)))
+    return jobs
+
+
+def save_result(page, result, output):
+    """Grava o resultado do parse no formato de cada scraper. Retorna False se não havia o que gravar."""
+    if page == "decks":
+        save_decks_to_json(result, output)
+        return bool(result)
+    if page == "meta":
+        save_data_to_json(result, output)
+        return bool(result)
+    if result.columns:
+        # A popularidade de cada coluna vai para um CSV separado (hsguru_popularity*.csv)
+        output = Path(output)
+        save_matchup_table(result, output, output.with_name(output.name.replace("matchups", "popularity")))
+        return True
+    print(f"Nenhuma tabela de matchups para salvar em '{output}'.")
+    return False
+
+
+async def refresh_page(client, pool, page, url, output):
+    """Baixa uma página e a analisa no pool de processos; o loop segue buscando as outras."""
+    start = time.perf_counter()
+    try:
+        fetched = await client.fetch(url)
+    except (aiohttp.ClientError, asyncio.TimeoutError, CacheMiss) as e:
+        print(f"ERRO: Falha ao buscar {url}. {e}")
+        return False
+    fetch_time = time.perf_counter() - start
+    cache = client.cache
+    if cache and cache.output_is_current(output, fetched.content_hash):
+        print(f"  {page}: {url} sem alterações ({fetched.source}); mantendo '{output}'.")
+        return True
+
+    parse_start = time.perf_counter()
+    parse = PAGES[page][1]
+    result = await asyncio.get_running_loop().run_in_executor(pool, parse, fetched.content)
+    if save_result(page, result, output) and cache:
+        cache.record_output(output, fetched.content_hash)
+    print(f"  {page}: {url} ({len(fetched.content) / 1024:.0f} KiB, {fetched.source}) obtido em {fetch_time:.2f} s, "
+          f"analisado em {time.perf_counter() - parse_start:.2f} s.")
+    return True
+
+
+async def refresh_all(jobs, concurrency=MAX_CONCURRENCY, per_host_interval=PER_HOST_INTERVAL,
+                      retries=MAX_RETRIES, workers=None, cache=None, offline=False, ttl=None):
+    """Atualiza todas as páginas em paralelo. Retorna o número de páginas atualizadas."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with HsguruClient(concurrency, per_host_interval, retries, cache=cache, offline=offline, ttl=ttl) as client:
+            results = await asyncio.gather(*(refresh_page(client, pool, page, url, output)
+                                             for page, url, output in jobs))
+    return sum(results)
+
+
+def serve_fixtures(directory=".", routes=None, failures=0):
+    """
+    Sobe um servidor HTTP local, numa porta livre, que responde os caminhos do
+    HSGuru com fixtures (ex.: /meta -> hsguru.html), ignorando a query string.
+    As `failures` primeiras requisições de cada URL recebem 503 (com
+    Retry-After: 0), para exercitar as novas tentativas. Retorna (server, base_url).
+    """
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    routes = FIXTURE_ROUTES if routes is None else routes
+    attempts = {}
+    attempts_lock = threading.Lock()
+
+    class FixtureHandler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+        def send_head(self):
+            with attempts_lock:
+                attempts[self.path] = attempt = attempts.get(self.path, 0) + 1
+            if attempt <= failures:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            return super().send_head()
+
+        def translate_path(self, path):
+            fixture = routes.get(urlsplit(path).path)
+            if fixture is None:
+                return os.path.join(directory, "__fixture_inexistente__")
+            return os.path.join(directory, fixture)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Atualiza em paralelo os dados do HSGuru (decks, meta e matchups).")
+    parser.add_argument("pages", nargs="*", metavar="página",
+                        help=f"Páginas a atualizar: {', '.join(PAGES)} (padrão: todas)")
+    parser.add_argument("--formats", nargs="+", default=DEFAULT_FORMATS)
+    parser.add_argument("--ranks", nargs="+", default=DEFAULT_RANKS)
+    parser.add_argument("--output-dir", help="Pasta dos arquivos gerados (padrão: a atual; obrigatória com --serve-fixtures)")
+    parser.add_argument("--base-url", default=HSGURU_BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--per-host-interval", type=float, default=PER_HOST_INTERVAL)
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--workers", type=int, default=None, help="Processos de parse (padrão: nº de CPUs)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache em disco")
+    parser.add_argument("--ttl", type=float, help="TTL (s) para todas as URLs, no lugar das regras por caminho")
+    parser.add_argument("--offline", action="store_true", default=is_offline(),
+                        help="Usa apenas o cache, sem rede (também via HS_OFFLINE=1)")
+    parser.add_argument("--serve-fixtures", metavar="DIR",
+                        help="Serve as fixtures de DIR em um servidor local e atualiza a partir dele")
+    parser.add_argument("--fixture-failures", type=int, default=0, metavar="N",
+                        help="Com --serve-fixtures, responde 503 às N primeiras requisições de cada página")
+    args = parser.parse_args(argv)
+    unknown = [page for page in args.pages if page not in PAGES]
+    if unknown:
+        parser.error(f"página(s) desconhecida(s): {', '.join(unknown)}")
+    if args.serve_fixtures and args.output_dir is None:
+        # Os winrates das fixtures são sintéticos: não podem substituir os dados de verdade
+        parser.error("com --serve-fixtures, informe --output-dir (as fixtures não vão para os caminhos padrão)")
+    output_dir = args.output_dir or "."
+
+    base_url = args.base_url
+    cache_dir = args.cache_dir
+    server = fixture_cache = None
+    if args.serve_fixtures:
+        server, base_url = serve_fixtures(args.serve_fixtures, failures=args.fixture_failures)
+        print(f"Servindo fixtures de '{args.serve_fixtures}' em {base_url}")
+        # A porta muda a cada execução: as URLs das fixtures não vão para o cache de verdade
+        fixture_cache = tempfile.TemporaryDirectory(prefix="hsguru_fixtures_")
+        cache_dir = fixture_cache.name
+
+    jobs = build_jobs(base_url, args.pages or list(PAGES), args.formats, args.ranks, output_dir)
+    print(f"Atualizando {len(jobs)} página(s) do HSGuru (até {args.concurrency} simultâneas)...")
+    start = time.perf_counter()
+    try:
+        cache = None if args.no_cache else ResponseCache(cache_dir)
+        updated = asyncio.run(refresh_all(jobs, args.concurrency, args.per_host_interval, args.retries, args.workers,
+                                          cache=cache, offline=args.offline, ttl=args.ttl))
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+        if fixture_cache:
+            fixture_cache.cleanup()
+    print(f"\n{updated}/{len(jobs)} página(s) atualizada(s) em {time.perf_counter() - start:.2f} s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,11 @@
 import json
-import time
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
+
+from http_cache import CacheMiss, cached_get
 
 # --- CONFIGURAÇÃO ---
 HSGURU_META_URL = "https://www.hsguru.com/decks?format=1" # format=1 é o modo Padrão (Standard)
 OUTPUT_FILE = "meta_decks.json"
 
-# Configurações do Selenium
-SCROLL_PAUSE_TIME = 2  # Tempo de espera para o conteúdo carregar após cada rolagem
-SCROLL_ATTEMPTS = 10   # Quantas vezes o script tentará rolar para baixo
-
 def scrape_meta_decks():
     """
     Busca os decks do meta do site HSGuru e extrai o arquétipo e os IDs das cartas.
@@ -22,19 +14,31 @@ def scrape_meta_decks():
         list: Uma lista de dicionários, onde cada dicionário representa um deck.
               Retorna uma lista vazia se ocorrer um erro.
     """
+    import requests
+
     print(f"Buscando dados de decks do meta em: {HSGURU_META_URL}")
 
     try:
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        response = requests.get(HSGURU_META_URL, headers=headers, timeout=15)
-        response.raise_for_status()  # Lança um erro para respostas HTTP 4xx/5xx
-    except requests.exceptions.RequestException as e:
+        content = cached_get(HSGURU_META_URL, headers=headers, timeout=15)  # Lança um erro para respostas HTTP 4xx/5xx
+    except (requests.exceptions.RequestException, CacheMiss) as e:
         print(f"ERRO: Falha ao buscar a página. {e}")
         return []
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    return parse_meta_decks(content)
+
+def parse_meta_decks(content):
+    """
+    Extrai o arquétipo e os IDs das cartas de cada deck do HTML da página de decks.
+
+    Returns:
+        list: Uma lista de dicionários, onde cada dicionário representa um deck.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
     meta_decks = []
 
     # Encontra todos os containers de deck na página
@@ -1,8 +1,14 @@
-
-import requests
-from bs4 import BeautifulSoup
-import json
+import codecs
 import csv
+import html
+import math
+import re
+import sys
+import time
+import tracemalloc
+from array import array
+
+from http_cache import CacheMiss, cached_get
 
 def scrape_hsguru_matchups(url="https://www.hsguru.com/matchups"):
     """
@@ -14,14 +20,29 @@ def scrape_hsguru_matchups(url="https://www.hsguru.com/matchups"):
     Returns:
         tuple: A tuple containing the matchup data as a dictionary and a list of deck names, or (None, None) if an error occurs.
     """
+    import requests
+
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-    except requests.exceptions.RequestException as e:
+        content = cached_get(url)  # Raises for bad status codes; served from the on-disk cache when fresh
+    except (requests.exceptions.RequestException, CacheMiss) as e:
         print(f"Error fetching URL: {e}")
         return None, None
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+    return parse_matchups(content)
+
+def parse_matchups(content):
+    """
+    Parses the matchup table out of the HTML of an HSGuru matchups page.
+
+    Args:
+        content (bytes | str): The page HTML.
+
+    Returns:
+        tuple: A tuple containing the matchup data as a dictionary and a list of deck names, or (None, None) if no table is found.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
 
     table = soup.find('table')
     if not table:
@@ -54,17 +75,303 @@ def scrape_hsguru_matchups(url="https://www.hsguru.com/matchups"):
 
     return matchup_data, deck_names
 
+def save_matchups_to_csv(matchup_data, deck_names, filepath='hsguru_matchups.csv'):
+    """Writes the matchup table to a CSV file, one row per deck."""
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f)
+
+        # Write header
+        writer.writerow([''] + deck_names)
+
+        # Write data rows
+        for row_deck_name, matchups in matchup_data.items():
+            row = [row_deck_name] + [matchups.get(col_deck_name, '') for col_deck_name in deck_names]
+            writer.writerow(row)
+    print(f"Matchup data saved to {filepath}")
+
+# --- Streaming table parser ---
+# Only the table tags matter, so a single regex over the raw HTML finds them and
+# everything between two tags is cell text. Nothing else of the page is kept.
+TABLE_TAG_RE = re.compile(r"<(/?)(table|thead|tbody|tr|th|td)\b[^>]*>", re.IGNORECASE)
+INNER_TAG_RE = re.compile(r"<[^>]*>")
+HEADER_LABEL_RE = re.compile(r"archetype|popularity", re.IGNORECASE)
+NAN = float('nan')
+# Deck names and popularity for the benchmark page (generated from the hsguru_matchups.html fixture)
+BENCHMARK_MATCHUPS_CSV = 'tests/fixtures/hsguru_matchups.csv'
+BENCHMARK_POPULARITY_CSV = 'tests/fixtures/hsguru_popularity.csv'
+
+class MatchupTable:
+    """
+    Dense matchup matrix: `winrates[i * len(columns) + j]` is the winrate of
+    `rows[i]` against `columns[j]` (NaN when HSGuru has no data), stored in a
+    flat array('d'). `popularity[j]` is the popularity (%) of `columns[j]`.
+    """
+    def __init__(self, rows, columns, winrates, popularity):
+        self.rows = rows
+        self.columns = columns
+        self.winrates = winrates
+        self.popularity = popularity
+
+    def winrate(self, row, column):
+        value = self.winrates[self.rows.index(row) * len(self.columns) + self.columns.index(column)]
+        return None if math.isnan(value) else value
+
+    def row_values(self, i):
+        width = len(self.columns)
+        return self.winrates[i * width:(i + 1) * width]
+
+def _parse_percent(text):
+    try:
+        return float(text.replace('%', ''))
+    except ValueError:
+        return NAN
+
+class StreamingMatchupParser:
+    """
+    Incremental parser for the HSGuru matchups table.
+
+    `feed()` accepts the page in chunks (e.g. as it is downloaded). Header rows
+    (`<th>` cells) become the column names and the separate popularity vector;
+    every body row is converted to floats and appended to the matrix as soon as
+    its `</tr>` is seen, then passed to `on_row(name, values)` if given. No DOM
+    is built: the only state is the row currently being read.
+    """
+    def __init__(self, on_row=None):
+        self.on_row = on_row
+        self.rows = []
+        self.columns = []
+        self.popularity = array('d')
+        self.winrates = array('d')
+        self._buffer = ''
+        # Bytes are decoded incrementally, so a character split between two chunks is kept whole
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._depth = 0  # Nesting of <table>; only the first table is read
+        self._done = False
+        self._header_rows = []
+        self._column_positions = None
+        self._cells = None
+        self._cell_text = None
+        self._row_is_header = True
+
+    def feed(self, data):
+        if self._done:
+            return
+        if isinstance(data, bytes):
+            data = self._decoder.decode(data)
+        text = self._buffer + data
+        # A tag may be cut at the end of the chunk: keep it for the next feed
+        cut = text.rfind('<')
+        if cut != -1 and text.find('>', cut) == -1:
+            self._buffer = text[cut:]
+            text = text[:cut]
+        else:
+            self._buffer = ''
+        self._tokenize(text)
+
+    def close(self):
+        self._buffer += self._decoder.decode(b'', final=True)
+        if self._buffer:
+            self._tokenize(self._buffer)
+            self._buffer = ''
+        self._end_row()
+        return self.table()
+
+    def table(self):
+        self._finish_header()
+        return MatchupTable(self.rows, self.columns, self.winrates, self.popularity)
+
+    def _tokenize(self, text):
+        position = 0
+        for match in TABLE_TAG_RE.finditer(text):
+            if self._cell_text is not None and match.start() > position:
+                self._cell_text.append(text[position:match.start()])
+            position = match.end()
+            self._handle_tag(match.group(2).lower(), bool(match.group(1)))
+            if self._done:
+                return
+        if self._cell_text is not None and position < len(text):
+            self._cell_text.append(text[position:])
+
+    def _handle_tag(self, tag, closing):
+        if tag == 'table':
+            self._depth += -1 if closing else 1
+            if closing and self._depth == 0:
+                self._end_row()
+                self._done = True
+            return
+        if self._depth != 1:
+            return
+        if tag == 'tr':
+            self._end_row()
+            if not closing:
+                self._cells = []
+                self._row_is_header = True
+        elif tag in ('th', 'td'):
+            self._end_cell()
+            if not closing and self._cells is not None:
+                self._cell_text = []
+                if tag == 'td':
+                    self._row_is_header = False
+        elif tag == 'tbody' and not closing:
+            self._end_row()
+            self._finish_header()
+
+    def _end_cell(self):
+        if self._cell_text is not None:
+            text = INNER_TAG_RE.sub(' ', ''.join(self._cell_text))
+            self._cells.append(html.unescape(text).strip())
+            self._cell_text = None
+
+    def _end_row(self):
+        self._end_cell()
+        cells = self._cells
+        self._cells = None
+        if not cells:
+            return
+        if self._row_is_header and self._column_positions is None:
+            self._header_rows.append(cells)
+            return
+        self._finish_header()
+        values = array('d', [NAN]) * len(self.columns)
+        for j, position in enumerate(self._column_positions):
+            if position < len(cells):
+                values[j] = _parse_percent(cells[position])
+        self.rows.append(cells[0])
+        self.winrates.extend(values)
+        if self.on_row:
+            self.on_row(cells[0], values)
+
+    def _finish_header(self):
+        """The first header row names the columns; a second one holds their popularity."""
+        if self._column_positions is not None:
+            return
+        first = self._header_rows[0] if self._header_rows else []
+        # Position 0 is the corner above the row names; the label cell is not a deck
+        self._column_positions = [p for p, name in enumerate(first)
+                                  if p > 0 and name and not HEADER_LABEL_RE.search(name)]
+        self.columns = [first[p] for p in self._column_positions]
+        popularity = array('d', [NAN]) * len(self.columns)
+        if len(self._header_rows) > 1:
+            percents = [_parse_percent(text) for text in self._header_rows[1] if text.endswith('%')]
+            for j, value in enumerate(percents[:len(self.columns)]):
+                popularity[j] = value
+        self.popularity = popularity
+
+def parse_matchup_table(content, chunk_size=64 * 1024):
+    """Parses the page HTML (bytes or str) with the streaming parser, one chunk at a time."""
+    parser = StreamingMatchupParser()
+    for start in range(0, len(content), chunk_size):
+        parser.feed(content[start:start + chunk_size])
+    return parser.close()
+
+def scrape_matchup_table(url="https://www.hsguru.com/matchups"):
+    """Same as `scrape_hsguru_matchups`, but returns a `MatchupTable` built by the streaming parser (or None)."""
+    import requests
+
+    try:
+        content = cached_get(url)
+    except (requests.exceptions.RequestException, CacheMiss) as e:
+        print(f"Error fetching URL: {e}")
+        return None
+    table = parse_matchup_table(content)
+    if not table.columns:
+        print("No table found on the page.")
+        return None
+    return table
+
+def save_matchup_table(table, filepath='hsguru_matchups.csv', popularity_path='hsguru_popularity.csv'):
+    """
+    Writes the matrix (header = column decks, one row per deck, empty cells for
+    missing data) and, in a separate file, the popularity of each column deck.
+    """
+    def fmt(value):
+        return '' if math.isnan(value) else f"{value:g}"
+
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([''] + table.columns)
+        for i, row_name in enumerate(table.rows):
+            writer.writerow([row_name] + [fmt(value) for value in table.row_values(i)])
+    with open(popularity_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['archetype', 'popularity'])
+        for name, value in zip(table.columns, table.popularity):
+            writer.writerow([name, fmt(value)])
+    print(f"Matchup data saved to {filepath} (popularity in {popularity_path})")
+
+def build_sample_page(deck_names, popularity, seed=0):
+    """
+    Synthetic matchups page with HSGuru's table layout, for benchmarks and tests:
+    a header row with the deck names, a second header row with the popularity and
+    one body row per deck, some cells empty.
+    """
+    import random
+
+    rng = random.Random(seed)
+    parts = ['<html><body><table class="table is-fullwidth"><thead><tr><th></th><th>Archetype<br>Popularity:</th>']
+    parts += [f'<th><a href="/archetype/{html.escape(name)}">{html.escape(name)}</a></th>' for name in deck_names]
+    parts.append('</tr><tr>')
+    parts += [f'<th>{value:.1f}%</th>' for value in popularity]
+    parts.append('</tr></thead><tbody>')
+    for row_name in deck_names:
+        parts.append(f'<tr><td><a href="/archetype/{html.escape(row_name)}">{html.escape(row_name)}</a></td>'
+                     f'<td>{rng.uniform(40, 60):.1f}</td>')
+        for col_name in deck_names:
+            if row_name == col_name:
+                parts.append('<td><span class="tag">50.0</span></td>')
+            elif rng.random() < 0.15:
+                parts.append('<td></td>')
+            else:
+                parts.append(f'<td><span class="tag" style="background-color:hsl(120, 30%, 50%);">{rng.uniform(25, 75):.1f}</span></td>')
+        parts.append('</tr>')
+    parts.append('</tbody></table></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+def _measure(function, content, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function(content)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    function(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def benchmark_parsers(size=None, repeat=5, csv_path=BENCHMARK_MATCHUPS_CSV, popularity_path=BENCHMARK_POPULARITY_CSV):
+    """Compares the BeautifulSoup parser with the streaming one on a synthetic page (time and peak memory)."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        names = next(csv.reader(f))[1:]
+    try:
+        with open(popularity_path, newline='', encoding='utf-8') as f:
+            popularity = {name: _parse_percent(value) for name, value in list(csv.reader(f))[1:]}
+    except FileNotFoundError:
+        popularity = {}
+    percents = [popularity.get(name, 0.0) for name in names]
+    if size:
+        names = [names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else '') for i in range(size)]
+        percents = [percents[i % len(percents)] for i in range(size)]
+    content = build_sample_page(names, percents)
+
+    (matchup_data, _), soup_time, soup_peak = _measure(parse_matchups, content, repeat)
+    table, stream_time, stream_peak = _measure(parse_matchup_table, content, repeat)
+
+    equal = table.columns == names and all(
+        matchup_data[row][col] == table.winrate(row, col)
+        for row in table.rows for col in table.columns)
+    print(f"{len(names)}x{len(names)} table, {len(content) / 1024:.0f} KiB of HTML")
+    print(f"  BeautifulSoup: {soup_time * 1000:8.1f} ms, peak {soup_peak / 1024 / 1024:6.1f} MiB")
+    print(f"  streaming:     {stream_time * 1000:8.1f} ms, peak {stream_peak / 1024 / 1024:6.1f} MiB "
+          f"({soup_time / stream_time:.1f}x faster, {soup_peak / stream_peak:.0f}x less memory)")
+    print(f"  same winrates: {equal}")
+    return equal
+
 if __name__ == "__main__":
-    matchup_data, deck_names = scrape_hsguru_matchups()
-    if matchup_data and deck_names:
-        with open('hsguru_matchups.csv', 'w', newline='') as f:
-            writer = csv.writer(f)
-            
-            # Write header
-            writer.writerow([''] + deck_names)
-            
-            # Write data rows
-            for row_deck_name, matchups in matchup_data.items():
-                row = [row_deck_name] + [matchups.get(col_deck_name, '') for col_deck_name in deck_names]
-                writer.writerow(row)
-        print("Matchup data saved to hsguru_matchups.csv")
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        equal = benchmark_parsers(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        sys.exit(0 if equal else 1)
+
+    table = scrape_matchup_table()
+    if table:
+        save_matchup_table(table)
+
@@ -1,6 +1,6 @@
 import json
-import requests
-from bs4 import BeautifulSoup
+
+from http_cache import CacheMiss, cached_get
 
 HSGURU_META_URL = "https://www.hsguru.com/meta?format=1"
 OUTPUT_FILE = "meta_data.json"
@@ -13,19 +13,31 @@ def scrape_meta_data():
         list: Uma lista de dicionários, onde cada dicionário representa um arquétipo.
               Retorna uma lista vazia se ocorrer um erro.
     """
+    import requests
+
     print(f"Buscando dados do meta em: {HSGURU_META_URL}")
 
     try:
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        response = requests.get(HSGURU_META_URL, headers=headers, timeout=15)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
+        content = cached_get(HSGURU_META_URL, headers=headers, timeout=15)
+    except (requests.exceptions.RequestException, CacheMiss) as e:
         print(f"ERRO: Falha ao buscar a página. {e}")
         return []
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    return parse_meta_data(content)
+
+def parse_meta_data(content):
+    """
+    Extrai o arquétipo, winrate, popularidade, etc. do HTML da página de meta.
+
+    Returns:
+        list: Uma lista de dicionários, onde cada dicionário representa um arquétipo.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
     meta_data = []
 
     table = soup.find("table", class_="is-striped")
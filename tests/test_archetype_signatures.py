@@ -0,0 +1,65 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from archetype_signatures import ArchetypeSignatureIndex, synthesize_deck_lists
+from deck_index import DeckIndex, build_deck_index
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def meta_decks():
+    with open(ROOT / "meta_decks2.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _agreement(deck_lists, queries=150, max_plays=8, seed=1):
+    """Fração das jogadas em que o arquétipo do LSH está entre os melhores da varredura exaustiva."""
+    rng = random.Random(seed)
+    exact_index, signature_index = DeckIndex(deck_lists), ArchetypeSignatureIndex(deck_lists)
+    hits = plays = 0
+    for _ in range(queries):
+        deck = rng.choice(deck_lists)
+        exact, approx = exact_index.new_scorer(), signature_index.new_scorer()
+        for card in rng.sample(deck["card_ids"], min(max_plays, len(deck["card_ids"]))):
+            exact.add_card(card)
+            approx.add_card(card)
+            best_score = max(exact.scores)
+            best = {exact_index.archetypes[i] for i, score in enumerate(exact.scores) if score == best_score}
+            ranking = approx.top(2)
+            hits += bool(ranking) and ranking[0][0] in best
+            plays += 1
+    return hits / plays
+
+
+def test_build_deck_index_switches_to_signatures(meta_decks):
+    assert isinstance(build_deck_index(meta_decks), DeckIndex)
+    assert isinstance(build_deck_index(meta_decks, min_decks=len(meta_decks)), ArchetypeSignatureIndex)
+
+
+def test_exact_copies_agree_with_exhaustive_scan(meta_decks):
+    # Sem trocas de cartas só erra quando listas diferentes do mesmo arquétipo caem na mesma assinatura
+    deck_lists = synthesize_deck_lists(meta_decks, 600, max_swaps=0, seed=2)
+    assert _agreement(deck_lists) >= 0.97
+
+
+def test_variants_mostly_agree_with_exhaustive_scan(meta_decks):
+    deck_lists = synthesize_deck_lists(meta_decks, 2000, seed=3)
+    index = ArchetypeSignatureIndex(deck_lists)
+    assert len(index) < len(deck_lists) / 10
+    assert _agreement(deck_lists) >= 0.9
+
+
+def test_scorer_interface_matches_deck_scorer(meta_decks):
+    index = ArchetypeSignatureIndex(synthesize_deck_lists(meta_decks, 600, seed=4))
+    scorer = index.new_scorer()
+    deck = meta_decks[0]
+    for card in deck["card_ids"][:6]:
+        assert scorer.add_card(card) is True
+    assert scorer.add_card(deck["card_ids"][0]) is False
+    archetype, count, position = scorer.top(1)[0]
+    assert archetype == deck["archetype"]
+    assert count == len(scorer.matching_cards(position)) == 6
@@ -0,0 +1,77 @@
+import json
+import random
+from pathlib import Path
+
+from deck_index import DeckIndex, build_deck_index
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DECKS = [
+    {"archetype": "Aggro Druid", "card_ids": [1, 2, 3, 4]},
+    {"archetype": "Ramp Druid", "card_ids": [1, 2, 5, 6]},
+    {"archetype": "Control Priest", "card_ids": [7, 8, 9]},
+    {"archetype": "Aggro Druid", "card_ids": [1, 2, 3, 10]},
+]
+
+
+def _exhaustive_top(decks, seen, k=2):
+    """Referência: pontua todas as listas e desempata pela ordem na base."""
+    scores = [(-len(seen & set(deck["card_ids"])), position) for position, deck in enumerate(decks)]
+    return [(decks[position]["archetype"], -score, position) for score, position in sorted(scores)[:k] if score]
+
+
+def test_ranking_and_ties():
+    scorer = DeckIndex(DECKS).new_scorer()
+    assert scorer.top(2) == []
+    scorer.add_card(1)
+    # Empate entre três listas: vence a que aparece primeiro na base
+    assert scorer.top(2) == [("Aggro Druid", 1, 0), ("Ramp Druid", 1, 1)]
+    scorer.add_card(5)
+    assert scorer.top(2) == [("Ramp Druid", 2, 1), ("Aggro Druid", 1, 0)]
+    scorer.add_card(3)
+    scorer.add_card(10)
+    assert scorer.top(3) == [("Aggro Druid", 3, 3), ("Aggro Druid", 2, 0), ("Ramp Druid", 2, 1)]
+    assert scorer.matching_cards(3) == {1, 3, 10}
+
+
+def test_repeated_and_unknown_cards():
+    scorer = DeckIndex(DECKS).new_scorer()
+    assert scorer.add_card(7) is True
+    assert scorer.add_card(7) is False
+    assert scorer.add_card(999) is True
+    assert scorer.top(2) == [("Control Priest", 1, 2)]
+
+
+def test_top_does_not_consume_the_heap():
+    scorer = DeckIndex(DECKS).new_scorer()
+    for card in (1, 2, 5):
+        scorer.add_card(card)
+    assert scorer.top(2) == scorer.top(2) == [("Ramp Druid", 3, 1), ("Aggro Druid", 2, 0)]
+
+
+def test_matches_exhaustive_scan_on_repo_decks():
+    with open(ROOT / "meta_decks2.json", "r", encoding="utf-8") as f:
+        decks = json.load(f)
+    index = build_deck_index(decks)
+    assert isinstance(index, DeckIndex)
+    rng = random.Random(0)
+    pool = sorted({card for deck in decks for card in deck["card_ids"]})
+    for _ in range(50):
+        scorer = index.new_scorer()
+        seen = set()
+        for card in rng.sample(pool, 10):
+            scorer.add_card(card)
+            seen.add(card)
+            assert scorer.top(3) == _exhaustive_top(decks, seen, 3)
+
+
+def test_rescore_after_update():
+    index = DeckIndex(DECKS)
+    scorer = index.new_scorer()
+    for card in (7, 8):
+        scorer.add_card(card)
+    new_decks = DECKS[:2] + [{"archetype": "Control Priest", "card_ids": [1]}] + DECKS[3:] + \
+        [{"archetype": "Big Priest", "card_ids": [7, 8, 11]}]
+    touched = index.apply_update(index.prepare_update(new_decks))
+    scorer.rescore(touched)
+    assert scorer.top(2) == [("Big Priest", 2, 4)]
@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+from deck_index import DeckIndex
+from deck_watcher import DeckDatabaseWatcher
+
+DECKS = [
+    {"archetype": "Aggro Druid", "card_ids": ["1", "2", "3"]},
+    {"archetype": "Control Priest", "card_ids": ["7", "8", "9"]},
+]
+
+
+def _write(path, content, generation):
+    path.write_text(content, encoding="utf-8")
+    # O watcher compara mtime e tamanho: garante um mtime novo a cada gravação
+    os.utime(path, ns=(generation * 10**9, generation * 10**9))
+
+
+@pytest.fixture
+def watched(tmp_path):
+    path = tmp_path / "meta_decks.json"
+    _write(path, json.dumps(DECKS), 1)
+    index = DeckIndex(DECKS)
+    return path, index, DeckDatabaseWatcher(str(path), index)
+
+
+def test_reload_applies_only_the_changes(watched):
+    path, index, watcher = watched
+    _write(path, json.dumps(DECKS + [{"archetype": "Big Priest", "card_ids": ["7", "10"]}]), 2)
+    assert watcher.check() is True
+    update, touched = watcher.apply_pending()
+    assert update.describe() == "1 adicionado(s), 0 removido(s), 0 alterado(s)"
+    assert touched == {2} and index.archetypes[2] == "Big Priest"
+
+
+@pytest.mark.parametrize("content", [
+    '{"archetype": "Aggro Druid"}',
+    '[1, 2]',
+    '[{"archetype": "Aggro Druid"}]',
+    '[{"archetype": "Aggro Druid", "card_ids": [[1]]}]',
+    '[{"archetype": 3, "card_ids": ["1"]}]',
+])
+def test_invalid_deck_list_keeps_the_index(watched, capsys, content):
+    path, index, watcher = watched
+    _write(path, content, 2)
+    assert watcher.check() is False
+    assert watcher.pending is None and index.archetypes == ["Aggro Druid", "Control Priest"]
+    assert "AVISO: Base de decks" in capsys.readouterr().out
+
+    # O próximo arquivo válido ainda é recarregado
+    _write(path, json.dumps(DECKS[:1]), 3)
+    assert watcher.check() is True
+    assert watcher.apply_pending()[0].describe() == "0 adicionado(s), 1 removido(s), 0 alterado(s)"
+
+
+def test_partial_json_is_retried(watched):
+    path, _, watcher = watched
+    _write(path, json.dumps(DECKS)[:-5], 2)
+    assert watcher.check() is False
+    _write(path, json.dumps(DECKS[:1]), 2)  # Mesmo mtime; o tamanho mudou
+    assert watcher.check() is True
@@ -0,0 +1,87 @@
+import pytest
+
+import event_bus
+
+
+class ListSink:
+    name = "lista"
+
+    def __init__(self):
+        self.events = []
+        self.failures = 0
+
+    def write(self, events):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("sink quebrado")
+        self.events.extend(events)
+
+    def close(self):
+        pass
+
+
+def test_events_arrive_in_order():
+    sink = ListSink()
+    bus = event_bus.EventBus([sink], batch_size=4, flush_interval=0.01)
+    for i in range(10):
+        bus.emit(event_bus.CARD_PLAYED, game=1, dbf_id=i)
+    bus.close()
+    assert [event["dbf_id"] for event in sink.events] == list(range(10))
+
+
+def test_full_queue_drops_oldest_and_reports():
+    sink = ListSink()
+    worker = event_bus.SinkWorker(sink, capacity=3, batch_size=100, flush_interval=60)
+    for i in range(5):
+        worker.push(event_bus.make_event(event_bus.CARD_PLAYED, dbf_id=i))
+    worker.close()
+    assert sink.events[0]["type"] == event_bus.EVENTS_DROPPED and sink.events[0]["count"] == 2
+    assert [event["dbf_id"] for event in sink.events[1:]] == [2, 3, 4]
+
+
+def test_failing_sink_keeps_thread_alive(capsys):
+    sink = ListSink()
+    sink.failures = 2
+    bus = event_bus.EventBus([sink], batch_size=1, flush_interval=0.01)
+    for i in range(4):
+        bus.emit(event_bus.CARD_PLAYED, game=1, dbf_id=i)
+        bus.flush()
+    worker = bus.workers[0]
+    assert worker._thread.is_alive()
+    bus.close()
+    assert [event["dbf_id"] for event in sink.events] == [2, 3]
+    assert capsys.readouterr().out.count("AVISO: falha ao escrever eventos em 'lista'") == 1
+
+
+def test_event_list_collects_events():
+    events = event_bus.EventList()
+    event = events.emit(event_bus.GAME_START, game=3)
+    events.flush()
+    assert events == [event] and event["type"] == event_bus.GAME_START and event["game"] == 3
+
+
+def test_socket_sink_never_deletes_a_regular_file(tmp_path):
+    path = tmp_path / "eventos.txt"
+    path.write_text("não apagar", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        event_bus.UnixSocketSink(str(path))
+    assert path.read_text(encoding="utf-8") == "não apagar"
+
+
+def test_socket_sink_replaces_a_stale_socket(tmp_path):
+    path = str(tmp_path / "hs.sock")
+    event_bus.UnixSocketSink(path).server.close()  # Socket que ficou de uma execução anterior
+    sink = event_bus.UnixSocketSink(path)
+    sink.close()
+
+
+def test_from_env_skips_unusable_outputs(tmp_path, monkeypatch, capsys):
+    regular_file = tmp_path / "arquivo"
+    regular_file.write_text("", encoding="utf-8")
+    monkeypatch.setenv(event_bus.JSONL_ENV_VAR, str(tmp_path / "não_existe" / "eventos.jsonl"))
+    monkeypatch.setenv(event_bus.SOCKET_ENV_VAR, str(regular_file))
+    bus = event_bus.from_env()
+    bus.close()
+    assert [worker.sink.name for worker in bus.workers] == ["console"]
+    assert capsys.readouterr().out.count("AVISO:") == 2
+    assert regular_file.exists()
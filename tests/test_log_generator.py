@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+import event_bus
+from card_cache import load_card_database
+from deck_index import build_deck_index
+from game_tracker import GameTracker
+from log_generator import generate_log
+
+ROOT = Path(__file__).resolve().parent.parent
+DECKS_PATH = str(ROOT / "meta_decks2.json")
+
+
+def test_generated_log_is_what_the_tracker_sees(tmp_path):
+    cards = load_card_database(str(ROOT / "card_cache.bin"))[0]
+    path = tmp_path / "Power.log"
+    summary = generate_log(path, games=3, decks_path=DECKS_PATH, seed=2, cards=cards)
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    assert summary["lines"] == len(lines)
+
+    with open(DECKS_PATH, "r", encoding="utf-8") as f:
+        tracker = GameTracker(cards, build_deck_index(json.load(f)), event_bus.EventList(), predicted_cards=0)
+    tracker.process_lines(lines)
+    events = tracker.events
+
+    assert [event["game"] for event in events if event["type"] == event_bus.GAME_START] == [1, 2, 3]
+    assert [event["game"] for event in events if event["type"] == event_bus.GAME_END] == [1, 2, 3]
+    for number, game in enumerate(summary["games"], 1):
+        played = [event["card_id"] for event in events
+                  if event["type"] == event_bus.CARD_PLAYED and event["game"] == number]
+        # O tracker publica cada carta do oponente uma vez por partida
+        assert played == list(dict.fromkeys(game["opponent_plays"]))
+
+
+def test_same_seed_gives_the_same_log(tmp_path):
+    cards = load_card_database(str(ROOT / "card_cache.bin"))[0]
+    first, second = tmp_path / "a.log", tmp_path / "b.log"
+    generate_log(first, games=2, decks_path=DECKS_PATH, seed=5, cards=cards)
+    generate_log(second, games=2, decks_path=DECKS_PATH, seed=5, cards=cards)
+    assert first.read_bytes() == second.read_bytes()
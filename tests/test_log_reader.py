@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import pytest
+
+from card_cache import load_card_database
+from log_generator import generate_log
+from log_reader import EVENT_CARD, EVENT_HERO, regex_events, scan_events
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _regex_result(data):
+    return [event for line in data.decode("utf-8", errors="replace").splitlines(keepends=True)
+            for event in regex_events(line)]
+
+
+@pytest.fixture(scope="module")
+def generated_log(tmp_path_factory):
+    path = tmp_path_factory.mktemp("logs") / "Power.log"
+    cards = load_card_database(str(ROOT / "card_cache.bin"))[0]
+    generate_log(path, games=2, decks_path=str(ROOT / "meta_decks2.json"), seed=1, cards=cards)
+    return path.read_bytes()
+
+
+def test_scanner_matches_regex_on_repo_log():
+    data = (ROOT / "Power.log").read_bytes()
+    expected = _regex_result(data)
+    assert expected
+    assert scan_events(data) == expected
+
+
+def test_scanner_matches_regex_on_generated_log(generated_log):
+    expected = _regex_result(generated_log)
+    assert {event[0] for event in expected} == {EVENT_HERO, EVENT_CARD}
+    assert scan_events(generated_log) == expected
+
+
+def test_scanner_matches_regex_on_any_chunk_boundary(generated_log):
+    # O follower entrega blocos de linhas completas: o resultado não depende de onde eles são cortados
+    lines = generated_log.splitlines(keepends=True)
+    expected = _regex_result(generated_log)
+    for size in (1, 7, 100):
+        events = []
+        for first in range(0, len(lines), size):
+            events += scan_events(b"".join(lines[first:first + size]))
+        assert events == expected
+
+
+def test_scanner_handles_last_line_without_newline():
+    line = ("D 12:00:00.0000000 PowerTaskList.DebugPrintPower() -     TAG_CHANGE "
+            "Entity=[entityName=Fireball id=40 zone=PLAY zonePos=0 cardId=CS2_029 player=2] tag=JUST_PLAYED value=1")
+    assert scan_events(line.encode()) == regex_events(line) == [(EVENT_CARD, "2", "Fireball", "CS2_029")]
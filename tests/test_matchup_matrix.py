@@ -0,0 +1,53 @@
+import csv
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from matchup_matrix import REFRESH_COMMAND, load_matchup_matrix, read_matchups_csv
+
+# Gerados a partir da fixture hsguru_matchups.html: nomes e popularidade reais, winrates sintéticos
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+MATCHUPS_CSV = str(FIXTURES / "hsguru_matchups.csv")
+POPULARITY_CSV = str(FIXTURES / "hsguru_popularity.csv")
+
+
+def test_store_round_trip(tmp_path):
+    store = str(tmp_path / "matchups.npy")
+    names, winrates, popularity = read_matchups_csv(MATCHUPS_CSV, POPULARITY_CSV)
+    from_csv = load_matchup_matrix(MATCHUPS_CSV, store, POPULARITY_CSV)
+    from_store = load_matchup_matrix(MATCHUPS_CSV, store, POPULARITY_CSV)
+
+    assert isinstance(from_store.winrates, np.memmap)
+    assert from_csv.names == from_store.names == names
+    np.testing.assert_array_equal(np.asarray(from_store.winrates), winrates)
+    np.testing.assert_array_equal(from_store.popularity, np.nan_to_num(popularity))
+
+
+def test_queries_match_a_direct_computation(tmp_path):
+    matrix = load_matchup_matrix(MATCHUPS_CSV, str(tmp_path / "matchups.npy"), POPULARITY_CSV)
+    weights = matrix.field_vector()
+    expected = []
+    for i, name in enumerate(matrix.names):
+        known = ~np.isnan(matrix.winrates[i])
+        if weights[known].sum():
+            expected.append((name, float(np.dot(matrix.winrates[i][known], weights[known]) / weights[known].sum())))
+    expected.sort(key=lambda item: -item[1])
+    top = matrix.top_against(n=5)
+    assert [name for name, _ in top] == [name for name, _ in expected[:5]]
+    assert [value for _, value in top] == pytest.approx([value for _, value in expected[:5]], rel=1e-5)
+
+    target = matrix.names[0]
+    for name, winrate in matrix.best_counters(target):
+        assert name != target and winrate == pytest.approx(float(matrix.winrates[matrix.index[name], 0]))
+
+
+def test_missing_csv_asks_for_a_refresh(tmp_path):
+    with pytest.raises(FileNotFoundError, match=REFRESH_COMMAND):
+        load_matchup_matrix(str(tmp_path / "hsguru_matchups.csv"), str(tmp_path / "matchups.npy"))
+
+
+def test_fixture_csv_is_square():
+    with open(MATCHUPS_CSV, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert [row[0] for row in rows[1:]] == rows[0][1:]
@@ -0,0 +1,46 @@
+import math
+
+from scrape_matchups_hsguru import StreamingMatchupParser, build_sample_page, parse_matchup_table, parse_matchups
+
+NAMES = ["Protoss Priest", "Élémentaire Mage", "Drácula Rogue", "Pirate Warrior"]
+POPULARITY = [12.5, 8.0, 3.1, 0.7]
+
+
+def test_non_ascii_name_split_between_chunks():
+    content = build_sample_page(NAMES, POPULARITY)
+    # Corta os bytes no meio do "É" (2 bytes em UTF-8) do texto da célula
+    split = content.index(">É".encode("utf-8")) + 2
+    parser = StreamingMatchupParser()
+    parser.feed(content[:split])
+    parser.feed(content[split:])
+    table = parser.close()
+
+    assert table.columns == NAMES
+    assert table.rows == NAMES
+    assert not any("�" in name for name in table.rows + table.columns)
+
+
+def test_every_chunk_size_gives_the_same_table():
+    content = build_sample_page(NAMES, POPULARITY)
+    expected = parse_matchup_table(content, chunk_size=len(content))
+    for chunk_size in (1, 2, 3, 7, 64):
+        table = parse_matchup_table(content, chunk_size=chunk_size)
+        assert table.columns == expected.columns
+        assert table.rows == expected.rows
+        assert list(table.popularity) == list(expected.popularity)
+        assert [None if math.isnan(v) else v for v in table.winrates] == \
+               [None if math.isnan(v) else v for v in expected.winrates]
+
+
+def test_streaming_parser_matches_beautifulsoup():
+    names = [f"{name} {i}" for i in range(5) for name in NAMES]
+    content = build_sample_page(names, POPULARITY * 5, seed=5)
+    matchup_data, _ = parse_matchups(content)
+    table = parse_matchup_table(content, chunk_size=100)
+
+    assert table.columns == table.rows == names
+    assert list(matchup_data) == names
+    assert list(table.popularity) == POPULARITY * 5
+    for row in names:
+        assert [table.winrate(row, column) for column in names] == [matchup_data[row][column] for column in names]
+    assert any(value is None for row in matchup_data.values() for value in row.values())  # Células vazias
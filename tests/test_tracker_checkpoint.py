@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import event_bus
+from card_cache import load_card_database
+from deck_tracker import DeckTracker
+from log_generator import generate_log
+from log_index import find_game_offsets
+from tracker_checkpoint import checkpoint_path, load_checkpoint
+
+ROOT = Path(__file__).resolve().parent.parent
+DECKS_PATH = str(ROOT / "meta_decks2.json")
+
+
+@pytest.fixture(scope="module")
+def cards():
+    return load_card_database(str(ROOT / "card_cache.bin"))[0]
+
+
+@pytest.fixture
+def log_lines(tmp_path, cards):
+    source = tmp_path / "source.log"
+    generate_log(source, games=3, decks_path=DECKS_PATH, seed=7, cards=cards)
+    return source.read_bytes().splitlines(keepends=True)
+
+
+def _without_time(events):
+    return [{key: value for key, value in event.items() if key != "time"} for event in events]
+
+
+def _run_tracker(log_path):
+    events = event_bus.EventList()
+    tracker = DeckTracker(str(log_path), DECKS_PATH, events=events, watch_decks_db=False)
+    tracker.run(follow=False)
+    return tracker, events
+
+
+def _middle_of_second_game(lines):
+    data = b"".join(lines)
+    second, third = find_game_offsets(data)[1:3]
+    offset = 0
+    for i, line in enumerate(lines):
+        offset += len(line)
+        if offset >= (second + third) // 2:
+            return i + 1
+
+
+def test_resume_replays_current_game(tmp_path, log_lines):
+    log_path = tmp_path / "Power.log"
+    cut = _middle_of_second_game(log_lines)
+    log_path.write_bytes(b"".join(log_lines[:cut]))
+
+    first, first_events = _run_tracker(log_path)
+    with open(checkpoint_path(log_path), "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert set(saved) == {"version", "inode", "offset", "fingerprint", "tail_hash",
+                          "game_offset", "game_id", "cards_seen"}
+    assert saved["offset"] == log_path.stat().st_size
+    assert saved["game_id"] == first.game_id
+
+    with open(log_path, "ab") as f:
+        f.write(b"".join(log_lines[cut:]))
+    second, second_events = _run_tracker(log_path)
+
+    # Referência: um único tracker lendo o log inteiro a partir de onde o primeiro começou
+    # (sem checkpoint, no início da partida em andamento no log cortado, a 2ª)
+    second_start = find_game_offsets(b"".join(log_lines[:cut]))[-1]
+    reference = DeckTracker(str(log_path), DECKS_PATH, events=event_bus.EventList(), watch_decks_db=False)
+    offset = 0
+    for line in log_lines:
+        if offset >= second_start:
+            reference.process_line(line.decode("utf-8"))
+        offset += len(line)
+
+    assert _without_time(first_events + second_events) == _without_time(reference.events)
+    assert second.game_id == reference.game_id
+
+
+def test_resume_ignores_tampered_checkpoint(tmp_path, log_lines):
+    log_path = tmp_path / "Power.log"
+    log_path.write_bytes(b"".join(log_lines[:_middle_of_second_game(log_lines)]))
+    _run_tracker(log_path)
+    path = checkpoint_path(log_path)
+    saved = json.loads(Path(path).read_text(encoding="utf-8"))
+
+    for field, value in (("version", 1), ("offset", "10"), ("game_offset", saved["offset"] + 1),
+                         ("cards_seen", [1, 2]), ("game_id", -1)):
+        Path(path).write_text(json.dumps(dict(saved, **{field: value})), encoding="utf-8")
+        checkpoint, reason = load_checkpoint(log_path)
+        assert checkpoint is None and reason
+
+    Path(path).write_bytes(b"\x80\x04\x95 not json")
+    checkpoint, reason = load_checkpoint(log_path)
+    assert checkpoint is None and reason.startswith("checkpoint ilegível")
+
+    Path(path).write_text(json.dumps(saved), encoding="utf-8")
+    with open(log_path, "r+b") as f:
+        f.write(b"X")
+    assert load_checkpoint(log_path) == (None, "o conteúdo do log mudou")
+
+
+@pytest.mark.parametrize("field, value", [("cards_seen", ["1"]), ("game_offset", 0)])
+def test_resume_starts_clean_when_replay_differs(tmp_path, log_lines, capsys, field, value):
+    log_path = tmp_path / "Power.log"
+    log_path.write_bytes(b"".join(log_lines[:_middle_of_second_game(log_lines)]))
+    _run_tracker(log_path)
+    path = Path(checkpoint_path(log_path))
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    path.write_text(json.dumps(dict(saved, **{field: value})), encoding="utf-8")
+    capsys.readouterr()
+
+    tracker, events = _run_tracker(log_path)
+    assert "AVISO: Checkpoint ignorado" in capsys.readouterr().out
+
+    # Mesmo resultado de um tracker sem checkpoint: do início da partida em andamento
+    path.unlink()
+    reference, reference_events = _run_tracker(log_path)
+    assert _without_time(events) == _without_time(reference_events)
+    assert tracker.game_id == reference.game_id == 1
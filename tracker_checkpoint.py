@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+
+from log_index import FINGERPRINT_SIZE
+
+CHECKPOINT_SUFFIX = ".checkpoint"
+CHECKPOINT_VERSION = 2
+CHECKPOINT_INTERVAL = 5.0  # Segundos entre checkpoints enquanto o log recebe dados
+TAIL_SIZE = 256  # Bytes antes do offset usados para conferir que o log não foi reescrito
+
+
+def checkpoint_path(log_path):
+    return f"{log_path}{CHECKPOINT_SUFFIX}"
+
+
+def _file_marks(f, offset):
+    """Impressão digital do início do arquivo e hash dos bytes logo antes do offset."""
+    f.seek(0)
+    fingerprint = f.read(FINGERPRINT_SIZE).hex()
+    f.seek(max(0, offset - TAIL_SIZE))
+    tail = f.read(offset - max(0, offset - TAIL_SIZE))
+    return fingerprint, hashlib.sha1(tail).hexdigest()
+
+
+def save_checkpoint(log_path, offset, game_offset, game_id, cards_seen):
+    """
+    Grava o checkpoint do tracker ao lado do log (substituição atômica).
+
+    Só o mínimo para retomar: até onde o log foi processado (`offset`), onde
+    começa a partida em andamento (`game_offset`), o número dela e as cartas
+    do oponente já vistas. O estado do parser não é salvo: ao retomar, o
+    tracker relê a partida de `game_offset` até `offset` sem publicar eventos.
+    Retorna o tamanho gravado, ou None se falhar.
+    """
+    path = checkpoint_path(log_path)
+    try:
+        with open(log_path, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            fingerprint, tail_hash = _file_marks(f, offset)
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "inode": inode,
+            "offset": offset,
+            "fingerprint": fingerprint,
+            "tail_hash": tail_hash,
+            "game_offset": game_offset,
+            "game_id": game_id,
+            "cards_seen": sorted(cards_seen),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+    except OSError as e:
+        print(f"AVISO: Não foi possível gravar o checkpoint '{path}'. {e}")
+        return None
+
+
+def _validate(data):
+    """Confere os tipos dos campos lidos do JSON (o arquivo fica num diretório gravável pelo usuário)."""
+    if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION:
+        return "checkpoint de outra versão"
+    for field in ("inode", "offset", "game_offset", "game_id"):
+        if type(data.get(field)) is not int or data[field] < 0:
+            return f"campo '{field}' inválido"
+    if data["game_offset"] > data["offset"]:
+        return "início da partida depois do offset"
+    for field in ("fingerprint", "tail_hash"):
+        if not isinstance(data.get(field), str):
+            return f"campo '{field}' inválido"
+    cards_seen = data.get("cards_seen")
+    if not isinstance(cards_seen, list) or not all(isinstance(card, str) for card in cards_seen):
+        return "campo 'cards_seen' inválido"
+    return None
+
+
+def load_checkpoint(log_path):
+    """
+    Lê e valida o checkpoint do log. Retorna (checkpoint, motivo): o dict do
+    checkpoint, ou None e o motivo de ele não servir (log recriado, truncado
+    ou reescrito, outra versão, campos inválidos...).
+    """
+    path = checkpoint_path(log_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None, "nenhum checkpoint"
+    except (OSError, ValueError) as e:
+        return None, f"checkpoint ilegível ({e})"
+
+    problem = _validate(data)
+    if problem:
+        return None, problem
+    offset = data["offset"]
+    try:
+        with open(log_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != data["inode"]:
+                return None, "o log foi recriado"
+            if stat.st_size < offset:
+                return None, "o log foi truncado"
+            fingerprint, tail_hash = _file_marks(f, offset)
+    except OSError as e:
+        return None, f"log ilegível ({e})"
+    if fingerprint != data["fingerprint"] or tail_hash != data["tail_hash"]:
+        return None, "o conteúdo do log mudou"
+    return data, None
@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import event_bus
+import metrics as stats
+from game_tracker import GameTracker, load_shared_state
+from log_follower import LogFollower, split_lines
+from log_index import load_game_index
+
+# --- CONFIGURAÇÃO ---
+META_DECKS_DB_PATH = "meta_decks.json"
+POLL_INTERVAL = 0.02  # Segundos entre leituras de um log sem dados novos
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)  # Processos de parse; 0 = parse no próprio loop
+
+# Estado de cada log (um GameTracker), no processo (worker) responsável por ele
+_streams = {}
+
+
+def parse_chunk(stream_id, data, decks_path, reset=False):
+    """
+    Executado no worker do log: alimenta o GameTracker dele com um bloco de
+    linhas completas e retorna os eventos (dicts do event_bus) e o nº de linhas.
+    """
+    if reset or stream_id not in _streams:
+        cards, deck_index = load_shared_state(decks_path)
+        _streams[stream_id] = GameTracker(cards, deck_index, event_bus.EventList(), predicted_cards=0)
+    tracker = _streams[stream_id]
+    lines = split_lines(data)
+    tracker.process_lines(lines)
+    events = list(tracker.events)
+    tracker.events.clear()
+    return events, len(lines)
+
+
+def stream_names(log_paths):
+    """Nome curto de cada log (pasta do log; com repetição, o nome do arquivo ou um número)."""
+    names = []
+    for i, path in enumerate(map(Path, log_paths)):
+        name = path.parent.name or path.stem
+        if name in names:
+            name = f"{name}/{path.name}"
+        if name in names:
+            name = f"{name}#{i}"
+        names.append(name)
+    return names
+
+
+class Stream:
+    """Estado de um log no processo principal: follower e worker fixo."""
+    def __init__(self, stream_id, name, path, executor, offset):
+        self.id = stream_id
+        self.name = name
+        self.path = path
+        self.executor = executor
+        self.reset = True
+        self.follower = LogFollower(path, offset=offset, on_rotate=self._on_rotate, use_inotify=False)
+
+    def _on_rotate(self):
+        print(f"[{self.name}] Log recriado ou truncado. Reiniciando a leitura.")
+        self.reset = True
+
+
+class TrackerDaemon:
+    """
+    Acompanha vários Power.log ao mesmo tempo num único loop asyncio.
+
+    Cada log tem uma tarefa que lê os blocos novos (sem bloquear) e os envia
+    ao seu worker: um processo fixo por log (atribuição circular), que guarda
+    o GameTracker daquele log (parser, partida, pontuação dos decks), de modo
+    que a ordem das linhas é preservada e os logs não se misturam. Os workers
+    herdam o banco de cartas e o índice de decks já carregados e devolvem os
+    eventos da partida, que o processo principal mostra. Com `workers=0` o
+    parse roda no próprio loop.
+    """
+    def __init__(self, log_paths, decks_db_path=META_DECKS_DB_PATH, workers=DEFAULT_WORKERS,
+                 poll_interval=POLL_INTERVAL, from_start=False, quiet=False, metrics=None, on_processed=None):
+        self.log_paths = [str(path) for path in log_paths]
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self.quiet = quiet
+        self.metrics = metrics
+        self.on_processed = on_processed  # callback(nome do log, offset processado), usado no teste de carga
+        self.decks_db_path = decks_db_path
+        load_shared_state(decks_db_path)  # Antes dos workers, para que o herdem
+        self.workers = workers
+        self.executors = [ProcessPoolExecutor(max_workers=1) for _ in range(workers)]
+        self.streams = []
+        self._stop = None
+
+    def _print(self, stream, message):
+        if not self.quiet:
+            print(f"[{stream.name}] {message}")
+
+    def _handle_events(self, stream, events):
+        for event in events:
+            kind = event["type"]
+            if kind == event_bus.GAME_START:
+                self._print(stream, "--- Nova Partida Detectada ---")
+            elif kind == event_bus.ARCHETYPE_CHANGED:
+                self._print(stream, f"==> Deck do Oponente: {event['archetype']} ({event['score']} cartas correspondentes)")
+            elif kind == event_bus.GAME_END:
+                self._print(stream, f"--- Partida Encerrada --- {event['opponent_class'] or 'classe desconhecida'}: "
+                                    f"{event['archetype']} ({event['cards_seen']} cartas em {event['turns']} turnos)")
+
+    async def _parse(self, stream, chunk):
+        reset, stream.reset = stream.reset, False
+        if stream.executor is None:
+            return parse_chunk(stream.id, chunk, self.decks_db_path, reset)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(stream.executor, parse_chunk, stream.id, chunk, self.decks_db_path, reset)
+
+    async def _follow(self, stream):
+        metrics = self.metrics
+        while not self._stop.is_set():
+            chunks = stream.follower.poll_chunks()
+            if not chunks:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for chunk in chunks:
+                start = time.perf_counter_ns()
+                events, lines = await self._parse(stream, chunk)
+                self._handle_events(stream, events)
+                if metrics:
+                    metrics.observe("chunk", time.perf_counter_ns() - start)
+                    metrics.count("lines", lines)
+                    metrics.count("events", sum(1 for event in events if event["type"] == event_bus.CARD_PLAYED))
+            if self.on_processed:
+                self.on_processed(stream.name, stream.follower.offset)
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        names = stream_names(self.log_paths)
+        for i, (name, path) in enumerate(zip(names, self.log_paths)):
+            executor = self.executors[i % len(self.executors)] if self.executors else None
+            # Como no deck_tracker: a partir do início da partida em andamento, para não perder o CREATE_GAME
+            offset = 0 if self.from_start else load_game_index(path).current_game_offset()
+            self.streams.append(Stream(i, name, path, executor, offset))
+            if not self.quiet:
+                print(f"[{name}] Monitorando {path}")
+        try:
+            await asyncio.gather(*(self._follow(stream) for stream in self.streams))
+        finally:
+            for stream in self.streams:
+                stream.follower.close()
+
+    def stop(self):
+        if self._stop:
+            self._stop.set()
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def _replay(source_lines, path, batch_lines, batch_interval, pending):
+    """Escreve o log sintético em rajadas, anotando (offset final, instante) de cada uma."""
+    with open(path, "ab", buffering=0) as f:
+        offset = 0
+        for first in range(0, len(source_lines), batch_lines):
+            data = b"".join(source_lines[first:first + batch_lines])
+            f.write(data)
+            offset += len(data)
+            pending.append((offset, time.perf_counter()))
+            await asyncio.sleep(batch_interval)
+
+
+async def _run_load_test(streams, workers, decks_path, source, batch_lines, batch_interval, directory):
+    paths = []
+    for i in range(streams):
+        path = Path(directory) / f"conta{i}" / "Power.log"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+        paths.append(path)
+    pending = {}
+    latencies = []
+
+    def on_processed(name, offset):
+        queue = pending[name]
+        now = time.perf_counter()
+        while queue and queue[0][0] <= offset:
+            latencies.append(now - queue.popleft()[1])
+
+    daemon = TrackerDaemon(paths, decks_path, workers=workers, quiet=True, on_processed=on_processed)
+    for name in stream_names(paths):
+        pending[name] = deque()
+    runner = asyncio.ensure_future(daemon.run())
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    await asyncio.gather(*(_replay(source, path, batch_lines, batch_interval, pending[name])
+                           for name, path in zip(stream_names(paths), paths)))
+    while any(pending.values()) and time.perf_counter() - start < 120:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    daemon.stop()
+    await runner
+    daemon.close()
+    return latencies, elapsed
+
+
+def load_test(stream_counts, workers, decks_path, games=2, batch_lines=40, batch_interval=0.05, seed=0):
+    """
+    Teste de carga: N logs sintéticos escritos em rajadas ao mesmo tempo.
+    Mede, por rajada, o tempo entre a escrita e o processamento pelo daemon.
+    """
+    from log_generator import generate_log
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, "source.log")
+        generate_log(source_path, games=games, decks_path=decks_path, seed=seed, cards=load_shared_state(decks_path)[0])
+        with open(source_path, "rb") as f:
+            source = f.readlines()
+        rate = batch_lines / batch_interval
+        print(f"Log sintético: {len(source)} linhas por conta, {rate:.0f} linhas/s por conta, {workers} worker(s), "
+              f"{os.cpu_count()} CPU(s).")
+        print(f"{'logs':>5s} {'linhas/s':>10s} {'p50 ms':>8s} {'p90 ms':>8s} {'p99 ms':>8s} {'máx ms':>8s}")
+        results = []
+        for count in stream_counts:
+            latencies, elapsed = asyncio.run(_run_load_test(
+                count, workers, decks_path, source, batch_lines, batch_interval, os.path.join(directory, str(count))))
+            row = {
+                "streams": count,
+                "lines_per_s": count * len(source) / elapsed,
+                "p50_ms": _percentile(latencies, 0.5) * 1000,
+                "p90_ms": _percentile(latencies, 0.9) * 1000,
+                "p99_ms": _percentile(latencies, 0.99) * 1000,
+                "max_ms": max(latencies, default=0.0) * 1000,
+            }
+            results.append(row)
+            print(f"{count:5d} {row['lines_per_s']:10,.0f} {row['p50_ms']:8.1f} {row['p90_ms']:8.1f} "
+                  f"{row['p99_ms']:8.1f} {row['max_ms']:8.1f}")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acompanha vários Power.log ao mesmo tempo num único processo.")
+    parser.add_argument("logs", nargs="*", help="Arquivos Power.log (um por cliente)")
+    parser.add_argument("--decks", default=META_DECKS_DB_PATH)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Processos de parse (0 = no próprio loop)")
+    parser.add_argument("--from-start", action="store_true", help="Lê os logs desde o início (padrão: a partir da partida em andamento)")
+    parser.add_argument("--load-test", type=int, nargs="+", metavar="N",
+                        help="Teste de carga com N logs sintéticos simultâneos (aceita vários valores)")
+    args = parser.parse_args()
+
+    if args.load_test:
+        load_test(args.load_test, args.workers, args.decks)
+        return
+    if not args.logs:
+        parser.error("informe ao menos um Power.log (ou --load-test N)")
+    missing = [path for path in args.logs if not os.path.exists(path)]
+    if missing:
+        print(f"ERRO: log(s) não encontrado(s): {', '.join(missing)}")
+        sys.exit(1)
+
+    metrics, stats_writer = stats.start_from_env()
+    daemon = TrackerDaemon(args.logs, args.decks, workers=args.workers, from_start=args.from_start, metrics=metrics)
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        print("\nMonitoramento interrompido pelo usuário.")
+    finally:
+        daemon.close()
+        if stats_writer:
+            stats_writer.stop()
+
+
+if __name__ == "__main__":
+    main()